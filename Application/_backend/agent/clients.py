@@ -0,0 +1,48 @@
+"""
+Process-wide Gemini clients.
+
+Building a genai.Client sets up a fresh HTTP connection pool and SSL
+context, so every agent and endpoint shares one client per API key and
+its keep-alive connections are reused across requests.
+"""
+
+import threading
+
+import httpx
+from google import genai
+from google.genai import types
+
+from config.settings import GEMINI_MAX_CONNECTIONS, GEMINI_MAX_KEEPALIVE, GEMINI_KEEPALIVE_EXPIRY
+
+_clients: dict[str, genai.Client] = {}
+_lock = threading.Lock()
+
+
+def get_client(api_key: str) -> genai.Client:
+    """Return the shared client for api_key, creating it on first use."""
+    client = _clients.get(api_key)
+    if client is None:
+        with _lock:
+            client = _clients.get(api_key)
+            if client is None:
+                client = _clients[api_key] = genai.Client(api_key=api_key, http_options=_http_options())
+    return client
+
+
+async def close_clients():
+    """Close every shared client and its connection pools (at shutdown)."""
+    with _lock:
+        clients = list(_clients.values())
+        _clients.clear()
+    for client in clients:
+        await client.aio.aclose()
+        client.close()
+
+
+def _http_options() -> types.HttpOptions:
+    limits = httpx.Limits(
+        max_connections=GEMINI_MAX_CONNECTIONS,
+        max_keepalive_connections=GEMINI_MAX_KEEPALIVE,
+        keepalive_expiry=GEMINI_KEEPALIVE_EXPIRY,
+    )
+    return types.HttpOptions(client_args={"limits": limits}, async_client_args={"limits": limits})
@@ -1,13 +1,52 @@
+import asyncio
+import json
+from collections.abc import AsyncIterator
+from contextlib import aclosing
+
 from google import genai
 from google.genai import types
-import re
-
-from config.settings import GEMINI_MODEL, SYSTEM_PROMPT_PATH
-from agent.extractor import extract_preferences
-from agent.retriever import build_rag_context, get_recommended_place_names
-from data.mock_partners import PARTNERS_DB
 
+from config.settings import (
+    ADAPTIVE_RECOMMENDATION, GEMINI_MODEL, LOCAL_EXTRACTION_CONFIDENCE, YASMINE_STRUCTURED_OUTPUT,
+)
+from agent.clients import get_client
+from agent.extractor import (
+    PREFERENCES_SCHEMA, aextract_memoized, extract_preferences, is_pending, speculate, validate_preferences,
+)
+from agent.history import window, with_summary
+from agent.local_extractor import (
+    REQUIRED_FIELDS, confident_preferences, extract_local, free_text, overall_confidence,
+)
+from agent.retrieval_table import combination_key
+from agent.retriever import TOP_N, ranking, retrieval_for, retrieve
+from agent.prompts import system_prompt
+from agent.text import StreamCleaner, clean_text
+from catalog.partners import partners_directory
+from catalog.store import current_catalog
+
+# Recommendations come as soon as these slots are confidently known
+# (ADAPTIVE_RECOMMENDATION), and at the latest on this user turn
 EXTRACTION_TURN_THRESHOLD = 5
+RECOMMENDATION_SLOTS = ("style", "companions", "duration_days", "budget")
+
+START_MESSAGE = "The user just said they're ready to start. Greet them warmly as Yasmine and ask your first question."
+
+# Structured mode: before the first recommendations every reply also carries
+# the preferences gathered so far, so the threshold turn needs no extraction call
+STRUCTURED_INSTRUCTION = """
+Answer with a JSON object: "reply" is your next message to the user, exactly as you would write it;
+"preferences" is your best reading so far of their travel preferences (leave out anything they have not told you yet).
+""".strip()
+
+TURN_SCHEMA = types.Schema(
+    type=types.Type.OBJECT,
+    properties={
+        "reply":       types.Schema(type=types.Type.STRING),
+        "preferences": PREFERENCES_SCHEMA,
+    },
+    required=["reply", "preferences"],
+    property_ordering=["reply", "preferences"],
+)
 
 RESUGGESTION_KEYWORDS = [
     "other", "another", "different", "else", "instead",
@@ -17,38 +56,18 @@ RESUGGESTION_KEYWORDS = [
 
 
 def format_partners(place_name: str) -> str:
-    """Build a clean partners block for a single chosen place."""
-    partners = PARTNERS_DB.get(place_name)
-    if not partners:
-        return ""
-
-    lines = ["\n" + "═" * 50]
-    lines.append("WHERE TO STAY & WHERE TO EAT")
-    lines.append("═" * 50)
-    lines.append(f"\n{place_name}")
-    lines.append("─" * 40)
-
-    lines.append("  Hotels:")
-    for h in partners["hotels"]:
-        lines.append(f"     {h['name']} ({h['type']} · {h['price_range']})")
-        lines.append(f"     {h['highlight']}")
-
-    lines.append("\n  Restaurants:")
-    for r in partners["restaurants"]:
-        lines.append(f"     {r['name']} ({r['cuisine']} · {r['price_range']})")
-        lines.append(f"     {r['highlight']}")
-        lines.append(f"     Must try: {r['must_try']}")
-
-    lines.append("\n" + "═" * 50 + "\n")
-    return "\n".join(lines)
+    """The partners block for a single chosen place, rendered once per catalog load (catalog/partners.py)."""
+    listing = partners_directory().get(place_name)
+    return listing.text if listing is not None else ""
 
 
 def _detect_chosen_place(user_message: str, recommended_places: list) -> str | None:
     """Check if the user's message mentions one of the recommended places."""
     msg = user_message.lower().strip()
+    records = current_catalog().records
     for place in recommended_places:
         # Match full name or first word of place name
-        if place.lower() in msg or place.split()[0].lower() in msg:
+        if any(alias in msg for alias in records.aliases(place)):
             return place
     return None
 
@@ -74,32 +93,159 @@ def _detect_first_or_second(user_message: str) -> int | None:
     return None
 
 
+def _parse_structured(text: str) -> tuple[str, dict]:
+    """(reply, preferences) from a structured turn; unparsable output is taken as the reply."""
+    try:
+        data = json.loads(text)
+    except (TypeError, ValueError):
+        return text or "", {}
+    if not isinstance(data, dict) or not isinstance(data.get("reply"), str):
+        return text, {}
+    return data["reply"], validate_preferences(data.get("preferences"))
+
+
+_recommendation_counters = {"recommendations": 0, "early": 0, "user_turns": 0,
+                            "resuggestions_paged": 0, "resuggestions_reextracted": 0}
+_turns_histogram: dict[int, int] = {}
+
+
+def recommendation_stats() -> dict:
+    """
+    How many user answers it took to reach the first recommendations, and
+    how resuggestions were served (next page vs. a new extraction).
+    """
+    count = _recommendation_counters["recommendations"]
+    return {
+        **_recommendation_counters,
+        "avg_turns": _recommendation_counters["user_turns"] / count if count else 0.0,
+        "turns_histogram": dict(sorted(_turns_histogram.items())),
+    }
+
+
 def _is_resuggestion_request(message: str) -> bool:
     message_lower = message.lower()
     return any(kw in message_lower for kw in RESUGGESTION_KEYWORDS)
 
 
+def _local_signature(history: list) -> list:
+    """What the local extractor reads from history, to notice changed preferences (JSON-safe)."""
+    preferences, _ = extract_local(history)
+    return [*combination_key(preferences), *sorted(preferences["interests"])]
+
+
 class TunisiaTourismAgent:
-    def __init__(self, api_key: str):
-        self.client = genai.Client(api_key=api_key)
+    def __init__(self, api_key: str, client: genai.Client | None = None,
+                 structured: bool = YASMINE_STRUCTURED_OUTPUT):
+        # Shared client and cached prompt — the agent itself only holds conversation state
+        self.client = client or get_client(api_key)
         self.history: list = []
         self.preferences: dict = {}
         self.recommendations_given: bool = False
         self.recommended_places: list = []
         self.chosen_place: str | None = None
         self._partners_shown: bool = False
-        self._system_prompt: str = SYSTEM_PROMPT_PATH.read_text(encoding="utf-8")
+        self.structured: bool = structured
+        self.retrieval_query: str = ""  # free user text the current recommendations were retrieved with
+        self.rag_context: str = ""      # context of the current recommendations, reused every turn
+        # Resuggestion cursor: the ranking for the current preferences, the places
+        # shown from it so far and the local reading of the preferences it was built for
+        self.ranking: list = []
+        self.shown_places: list = []
+        self.ranking_signature: list = []
+        # Older turns folded into a running summary (see agent/history.py)
+        self.summary: str = ""
+        self.summarized_upto: int = 0
+        self._system_prompt: str = system_prompt()
 
     # ── Public interface ─────────────────────────────────────────────────────
 
     def start(self) -> tuple:
-        return self.chat("The user just said they're ready to start. Greet them warmly as Yasmine and ask your first question.")
+        return self.chat(START_MESSAGE)
+
+    async def astart(self) -> tuple:
+        return await self.achat(START_MESSAGE)
+
+    def start_with(self, greeting: str) -> tuple:
+        """Open the conversation with a pre-generated greeting instead of calling Gemini."""
+        self._begin_turn(START_MESSAGE)
+        return self._finish_turn(greeting)
 
     def chat(self, user_message: str) -> tuple[str, str | None]:
         """
         Returns (yasmine_reply, partners_block or None).
         Partners shown only when user picks their final place.
         """
+        self._begin_turn(user_message)
+        system_prompt = self._build_system_prompt(user_message)
+        reply = self._generate(system_prompt)
+        return self._finish_turn(reply)
+
+    async def achat(self, user_message: str) -> tuple[str, str | None]:
+        """Async variant of chat() — same turn logic, non-blocking Gemini calls."""
+        self._begin_turn(user_message)
+        system_prompt = await self._abuild_system_prompt(user_message)
+        reply = await self._agenerate(system_prompt)
+        result = self._finish_turn(reply)
+        self._speculate()
+        return result
+
+    async def astream_chat(self, user_message: str) -> AsyncIterator[tuple[str, object]]:
+        """
+        Streaming variant of achat(). Yields ("delta", text) as cleaned reply
+        text arrives, then a final ("done", (yasmine_reply, partners_block or None)).
+        """
+        self._begin_turn(user_message)
+        system_prompt = await self._abuild_system_prompt(user_message)
+
+        stream = await self.client.aio.models.generate_content_stream(**self._generate_request(system_prompt))
+        if self._structured_turn():
+            # JSON can't be shown as it arrives — emit the reply once it is complete
+            async with aclosing(stream):
+                reply = self._read_reply("".join([chunk.text or "" async for chunk in stream]))
+            if reply:
+                yield "delta", reply
+            result = self._finish_turn(reply)
+            self._speculate()
+            yield "done", result
+            return
+
+        cleaner = StreamCleaner()
+        parts = []
+        async with aclosing(stream):
+            async for chunk in stream:
+                delta = cleaner.feed(chunk.text or "")
+                if delta:
+                    parts.append(delta)
+                    yield "delta", delta
+
+        result = self._finish_turn("".join(parts))
+        self._speculate()
+        yield "done", result
+
+    def reset(self):
+        self.history = []
+        self.preferences = {}
+        self.recommendations_given = False
+        self.recommended_places = []
+        self.chosen_place = None
+        self._partners_shown = False
+        self.retrieval_query = ""
+        self.rag_context = ""
+        self.ranking = []
+        self.shown_places = []
+        self.ranking_signature = []
+        self.summary = ""
+        self.summarized_upto = 0
+
+    def get_history(self) -> list:
+        return self.history
+
+    # ── Private helpers ──────────────────────────────────────────────────────
+
+    def __init_subclass__(cls):
+        pass
+
+    def _begin_turn(self, user_message: str):
         self._push_user(user_message)
 
         # Check if user is picking one of the recommended places (by name or "first"/"second"/confirmation)
@@ -112,8 +258,7 @@ class TunisiaTourismAgent:
                 if idx is not None and 0 <= idx < len(self.recommended_places):
                     self.chosen_place = self.recommended_places[idx]
 
-        system_prompt = self._build_system_prompt(user_message)
-        reply = self._generate(system_prompt)
+    def _finish_turn(self, reply: str) -> tuple[str, str | None]:
         self._push_model(reply)
 
         # Show partners only when a place has been chosen
@@ -124,61 +269,216 @@ class TunisiaTourismAgent:
 
         return reply, partners_block
 
-    def reset(self):
-        self.history = []
-        self.preferences = {}
-        self.recommendations_given = False
-        self.recommended_places = []
-        self.chosen_place = None
-        self._partners_shown = False
+    def _extraction_due(self, user_message: str) -> bool:
+        # First recommendations — once the slots are filled, or at the threshold
+        if not self.recommendations_given:
+            user_turns = sum(1 for m in self.history if m.role == "user")
+            return user_turns >= EXTRACTION_TURN_THRESHOLD or self._slots_filled()
+        # User wants different suggestions — re-extract and re-inject
+        return not self.chosen_place and _is_resuggestion_request(user_message)
 
-    def get_history(self) -> list:
-        return self.history
+    def _slots_filled(self) -> bool:
+        """Completeness check, re-run on every user turn before the first recommendations."""
+        if not ADAPTIVE_RECOMMENDATION:
+            return False
+        _, confidence = extract_local(self.history)
+        return overall_confidence(confidence, RECOMMENDATION_SLOTS) >= LOCAL_EXTRACTION_CONFIDENCE
 
-    # ── Private helpers ──────────────────────────────────────────────────────
+    def _build_system_prompt(self, user_message: str) -> str:
+        if not self._extraction_due(user_message):
+            return self._prompt_with_context()
+        if self._can_page():
+            return self._next_page()
+        preferences = self._known_preferences()
+        if preferences is None:
+            preferences = extract_preferences(self.client, GEMINI_MODEL, self.history)
+        return self._apply_preferences(preferences)
+
+    async def _abuild_system_prompt(self, user_message: str) -> str:
+        if not self._extraction_due(user_message):
+            return self._prompt_with_context()
+        if self._can_page():
+            return self._next_page()
+        preferences = self._known_preferences()
+        if preferences is None:
+            history = self._extraction_history()
+            preferences = await aextract_memoized(self.client, GEMINI_MODEL, history)
+            if len(history) < len(self.history):
+                preferences = self._with_newest_answer(preferences)
+        return self._apply_preferences(preferences)
+
+    def _can_page(self) -> bool:
+        """A resuggestion with unchanged preferences is served from the ranking cursor."""
+        return (self.recommendations_given and bool(self.ranking)
+                and _local_signature(self.history) == self.ranking_signature)
+
+    def _next_page(self) -> str:
+        """Show the next-best places the user has not seen yet, without re-scoring."""
+        _recommendation_counters["resuggestions_paged"] += 1
+        self._show(self._unseen())
+        return self._system_prompt + "\n\n" + self.rag_context
+
+    def _unseen(self) -> list:
+        if not self.shown_places:
+            # Sessions from before the cursor was stored
+            self.shown_places = list(self.recommended_places)
+        page = [name for name in self.ranking if name not in self.shown_places][:TOP_N]
+        if len(page) < TOP_N:
+            # Ranking exhausted — start over, skipping only the current pair
+            self.shown_places = list(self.recommended_places)
+            page = [name for name in self.ranking if name not in self.shown_places][:TOP_N]
+        return page
+
+    def _show(self, names: list):
+        result = retrieval_for(names)
+        self.rag_context = result.context
+        self.recommended_places = list(result.names)
+        self.shown_places += [name for name in result.names if name not in self.shown_places]
+
+    def _known_preferences(self) -> dict | None:
+        """
+        Preferences available without a Gemini extraction call for the first
+        recommendations: from the structured replies, or from the local
+        extractor when it is confident. Resuggestions with changed
+        preferences always re-extract.
+        """
+        if self.recommendations_given:
+            return None
+        if self._structured_preferences_ready():
+            return self.preferences
+        return confident_preferences(self.history, LOCAL_EXTRACTION_CONFIDENCE)
 
-    def __init_subclass__(cls):
-        pass
+    def _extraction_history(self) -> list:
+        """
+        Conversation to extract preferences from. Before the first
+        recommendations, prefer the speculative extraction of everything
+        before this message (the message itself is merged in by
+        _with_newest_answer() and still reaches the model verbatim);
+        otherwise extract from the full history.
+        """
+        if not self.recommendations_given and is_pending(self.history[:-1]):
+            return self.history[:-1]
+        return self.history
 
-    def _build_system_prompt(self, user_message: str) -> str:
+    def _with_newest_answer(self, preferences: dict) -> dict:
+        """
+        Speculated preferences updated with what the local extractor reads in
+        the message they were extracted without: confident slots override
+        (the latest answer wins), new interests are added.
+        """
+        if not preferences:
+            return preferences
+        newest, confidence = extract_local(self.history[-1:])
+        merged = dict(preferences)
+        for field in (*REQUIRED_FIELDS, "duration_days"):
+            if confidence[field] >= LOCAL_EXTRACTION_CONFIDENCE:
+                merged[field] = newest[field]
+        merged["interests"] = list(dict.fromkeys([*preferences.get("interests", []), *newest["interests"]]))
+        return merged
+
+    def _speculate(self):
+        """
+        From the turn before the threshold on, extract preferences in the
+        background so the threshold turn needs only the reply call.
+        """
+        if self.recommendations_given or self.chosen_place or self.structured:
+            return
         user_turns = sum(1 for m in self.history if m.role == "user")
+        if user_turns >= EXTRACTION_TURN_THRESHOLD - 1:
+            # Not needed if the local extractor will already be confident
+            if overall_confidence(extract_local(self.history)[1]) >= LOCAL_EXTRACTION_CONFIDENCE:
+                return
+            try:
+                asyncio.get_running_loop()
+            except RuntimeError:
+                return
+            speculate(self.client, GEMINI_MODEL, self.history)
+
+    def _structured_turn(self) -> bool:
+        return self.structured and not self.recommendations_given
+
+    def _structured_preferences_ready(self) -> bool:
+        """Threshold turn in structured mode with preferences from the earlier replies."""
+        return self._structured_turn() and bool(self.preferences)
+
+    def _apply_preferences(self, preferences: dict) -> str:
+        self.preferences = preferences
+        if not self.preferences:
+            return self._prompt_with_context()
+        # The user's own words also search the place descriptions, minus what the preferences already say
+        self.retrieval_query = free_text(self._user_text())
+        self.ranking = ranking(self.preferences, self.retrieval_query)
+        self.ranking_signature = _local_signature(self.history)
+        if not self.recommendations_given:
+            result = retrieve(self.preferences, self.retrieval_query)
+            self.rag_context = result.context
+            self.recommended_places = list(result.names)
+            self.shown_places = list(result.names)
+            self._record_recommendation()
+        else:
+            # Changed preferences — still skip what the user has already turned down
+            _recommendation_counters["resuggestions_reextracted"] += 1
+            self._show(self._unseen())
+        self.recommendations_given = True
+        return self._system_prompt + "\n\n" + self.rag_context
+
+    def _user_text(self) -> str:
+        return "\n".join(
+            m.parts[0].text for m in self.history if m.role == "user" and m.parts[0].text != START_MESSAGE
+        )
 
-        # First time reaching threshold — extract + inject RAG
-        if not self.recommendations_given and user_turns >= EXTRACTION_TURN_THRESHOLD:
-            self.preferences = extract_preferences(self.client, GEMINI_MODEL, self.history)
-            if self.preferences:
-                rag_context = build_rag_context(self.preferences)
-                self.recommended_places = get_recommended_place_names(self.preferences)
-                self.recommendations_given = True
-                return self._system_prompt + "\n\n" + rag_context
-
-        # User wants different suggestions — re-extract and re-inject
-        if self.recommendations_given and not self.chosen_place and _is_resuggestion_request(user_message):
-            self.preferences = extract_preferences(self.client, GEMINI_MODEL, self.history)
-            if self.preferences:
-                rag_context = build_rag_context(self.preferences)
-                self.recommended_places = get_recommended_place_names(self.preferences)
-                return self._system_prompt + "\n\n" + rag_context
+    def _record_recommendation(self):
+        # The opening START_MESSAGE is not an answer from the user
+        answers = sum(1 for m in self.history if m.role == "user" and m.parts[0].text != START_MESSAGE)
+        _recommendation_counters["recommendations"] += 1
+        _recommendation_counters["user_turns"] += answers
+        if answers < EXTRACTION_TURN_THRESHOLD - 1:
+            _recommendation_counters["early"] += 1
+        _turns_histogram[answers] = _turns_histogram.get(answers, 0) + 1
 
+    def _prompt_with_context(self) -> str:
         # Keep RAG context active after recommendations given
         if self.recommendations_given and self.preferences:
-            return self._system_prompt + "\n\n" + build_rag_context(self.preferences)
-
+            if not self.rag_context:
+                # Sessions from before the context was stored
+                self.rag_context = retrieve(self.preferences, self.retrieval_query).context
+            return self._system_prompt + "\n\n" + self.rag_context
         return self._system_prompt
 
-    def _generate(self, system_prompt: str) -> str:
-        response = self.client.models.generate_content(
+    def _generate_request(self, system_prompt: str) -> dict:
+        # Summarized turns travel in the system instruction, the rest verbatim
+        system_instruction = with_summary(system_prompt, self.summary)
+        if self._structured_turn():
+            config = types.GenerateContentConfig(
+                system_instruction=system_instruction + "\n\n" + STRUCTURED_INSTRUCTION,
+                response_mime_type="application/json",
+                response_schema=TURN_SCHEMA,
+            )
+        else:
+            config = types.GenerateContentConfig(system_instruction=system_instruction)
+        return dict(
             model=GEMINI_MODEL,
-            contents=self.history,
-            config=types.GenerateContentConfig(system_instruction=system_prompt)
+            contents=window(self.history, self.summary, self.summarized_upto),
+            config=config,
         )
-        return self._clean(response.text)
+
+    def _generate(self, system_prompt: str) -> str:
+        response = self.client.models.generate_content(**self._generate_request(system_prompt))
+        return self._read_reply(response.text)
+
+    async def _agenerate(self, system_prompt: str) -> str:
+        response = await self.client.aio.models.generate_content(**self._generate_request(system_prompt))
+        return self._read_reply(response.text)
+
+    def _read_reply(self, text: str) -> str:
+        if self._structured_turn():
+            text, preferences = _parse_structured(text)
+            if preferences:
+                self.preferences = preferences
+        return self._clean(text)
 
     def _clean(self, text: str) -> str:
-        text = text.replace("*", "")
-        text = re.sub(r"[\U0001F000-\U0001FFFF\U00002700-\U000027BF\U0001F900-\U0001F9FF\u2600-\u26FF]", "", text)
-        text = re.sub(r" {2,}", " ", text)
-        return text.strip()
+        return clean_text(text)
 
     def _push_user(self, text: str):
         self.history.append(types.Content(role="user", parts=[types.Part(text=text)]))
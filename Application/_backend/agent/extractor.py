@@ -1,6 +1,26 @@
+"""
+Preference extraction from a Yasmine conversation.
+
+Extraction is a full Gemini round trip, so results are memoized by a hash
+of the history they were extracted from, and concurrent requests for the
+same history share one call. speculate() starts an extraction in the
+background (e.g. while the user is typing their next answer) so the turn
+that needs the preferences finds them ready.
+
+Both the extraction call and the optional structured Yasmine turns (see
+agent/conversation.py) use PREFERENCES_SCHEMA, and every result goes
+through validate_preferences().
+"""
+
+import asyncio
+import hashlib
 import json
+from collections import OrderedDict
+
 from google.genai import types
 
+MEMO_SIZE = 256
+
 
 EXTRACTION_PROMPT = """
 Based on this conversation, extract the user's travel preferences as JSON.
@@ -18,6 +38,64 @@ Use exactly these keys:
 If a value is unknown, use "" for strings, 7 for duration_days, and [] for interests.
 """
 
+STYLES = ("adventure", "beach", "culture", "history", "nature", "mix")
+COMPANIONS = ("solo", "couple", "family", "friends")
+BUDGETS = ("budget", "mid-range", "luxury")
+DEFAULT_DURATION_DAYS = 7
+
+# Unknown fields are simply left out; validate_preferences() fills the defaults
+PREFERENCES_SCHEMA = types.Schema(
+    type=types.Type.OBJECT,
+    properties={
+        "style":         types.Schema(type=types.Type.STRING, enum=list(STYLES)),
+        "companions":    types.Schema(type=types.Type.STRING, enum=list(COMPANIONS)),
+        "budget":        types.Schema(type=types.Type.STRING, enum=list(BUDGETS)),
+        "duration_days": types.Schema(type=types.Type.INTEGER, minimum=1, maximum=60),
+        "interests":     types.Schema(type=types.Type.ARRAY, items=types.Schema(type=types.Type.STRING)),
+    },
+    property_ordering=["style", "companions", "budget", "duration_days", "interests"],
+)
+
+EXTRACTION_CONFIG = types.GenerateContentConfig(
+    system_instruction=EXTRACTION_PROMPT,
+    response_mime_type="application/json",
+    response_schema=PREFERENCES_SCHEMA,
+)
+
+
+def validate_preferences(raw) -> dict:
+    """
+    Coerce model output into the preferences dict the retriever expects.
+    Returns {} if raw is not a non-empty object.
+    """
+    if not isinstance(raw, dict) or not raw:
+        return {}
+    interests = raw.get("interests")
+    return {
+        "style":         _choice(raw.get("style"), STYLES),
+        "companions":    _choice(raw.get("companions"), COMPANIONS),
+        "budget":        _choice(raw.get("budget"), BUDGETS),
+        "duration_days": _duration(raw.get("duration_days")),
+        "interests":     [i.strip().lower() for i in interests if isinstance(i, str) and i.strip()]
+                         if isinstance(interests, list) else [],
+    }
+
+
+def _choice(value, choices: tuple) -> str:
+    # Keep combined answers like "beach|culture" — the retriever matches by substring
+    if not isinstance(value, str):
+        return ""
+    value = value.strip().lower()
+    return value if any(c in value for c in choices) else ""
+
+
+def _duration(value) -> int:
+    try:
+        days = int(value)
+    except (TypeError, ValueError):
+        return DEFAULT_DURATION_DAYS
+    return days if days > 0 else DEFAULT_DURATION_DAYS
+
 
 def extract_preferences(client, model: str, history: list) -> dict:
     """
@@ -28,9 +106,94 @@ def extract_preferences(client, model: str, history: list) -> dict:
         response = client.models.generate_content(
             model=model,
             contents=history,
-            config=types.GenerateContentConfig(system_instruction=EXTRACTION_PROMPT)
+            config=EXTRACTION_CONFIG,
         )
-        raw = response.text.strip().replace("```json", "").replace("```", "").strip()
-        return json.loads(raw)
+        return _parse(response.text)
     except Exception:
-        return {}
\ No newline at end of file
+        return {}
+
+
+async def aextract_preferences(client, model: str, history: list) -> dict:
+    """Async variant of extract_preferences()."""
+    try:
+        response = await client.aio.models.generate_content(
+            model=model,
+            contents=history,
+            config=EXTRACTION_CONFIG,
+        )
+        return _parse(response.text)
+    except Exception:
+        return {}
+
+
+_memo: OrderedDict[str, dict] = OrderedDict()  # history key -> preferences
+_inflight: dict[str, asyncio.Task] = {}
+_counters = {"speculated": 0, "memo_hits": 0, "joined": 0, "extracted": 0}
+
+
+def history_key(history: list) -> str:
+    """Stable hash of a conversation (list of types.Content)."""
+    digest = hashlib.blake2b(digest_size=16)
+    for content in history:
+        digest.update(f"{content.role}\x00{content.parts[0].text}\x01".encode())
+    return digest.hexdigest()
+
+
+def is_pending(history: list) -> bool:
+    """Whether preferences for history are memoized or already being extracted."""
+    key = history_key(history)
+    return key in _memo or key in _inflight
+
+
+def speculate(client, model: str, history: list):
+    """Start extracting preferences for history in the background (no-op if known)."""
+    key = history_key(history)
+    if key in _memo or key in _inflight:
+        return
+    _counters["speculated"] += 1
+    _launch(client, model, history, key)
+
+
+async def aextract_memoized(client, model: str, history: list) -> dict:
+    """aextract_preferences() that never runs twice for the same history."""
+    key = history_key(history)
+    if key in _memo:
+        _memo.move_to_end(key)
+        _counters["memo_hits"] += 1
+        return _memo[key]
+    task = _inflight.get(key)
+    if task is not None:
+        _counters["joined"] += 1
+    else:
+        task = _launch(client, model, history, key)
+    # shield: a cancelled request must not cancel an extraction others may join
+    return await asyncio.shield(task)
+
+
+def stats() -> dict:
+    return {**_counters, "memoized": len(_memo), "in_flight": len(_inflight)}
+
+
+def _launch(client, model: str, history: list, key: str) -> asyncio.Task:
+    task = asyncio.create_task(_extract(client, model, list(history), key))
+    _inflight[key] = task
+    return task
+
+
+async def _extract(client, model: str, history: list, key: str) -> dict:
+    try:
+        preferences = await aextract_preferences(client, model, history)
+    finally:
+        _inflight.pop(key, None)
+    _counters["extracted"] += 1
+    # Failures ({}) are not memoized so the next attempt retries
+    if preferences:
+        _memo[key] = preferences
+        while len(_memo) > MEMO_SIZE:
+            _memo.popitem(last=False)
+    return preferences
+
+
+def _parse(text: str) -> dict:
+    raw = text.strip().replace("```json", "").replace("```", "").strip()
+    return validate_preferences(json.loads(raw))
\ No newline at end of file
@@ -0,0 +1,88 @@
+"""
+Pool of pre-generated Yasmine greetings.
+
+Opening a session used to cost a full Gemini call just to say hello. The
+pool keeps a handful of greetings generated in the background; each one
+is served up to max_uses times in rotation, then retired and replaced.
+When the pool is empty callers fall back to live generation.
+
+Greetings are tied to the system prompt they were generated with and are
+dropped as soon as the prompt file changes.
+"""
+
+import asyncio
+import logging
+from collections import deque
+from collections.abc import Awaitable, Callable
+
+from agent.prompts import system_prompt
+
+log = logging.getLogger(__name__)
+
+
+class GreetingPool:
+    def __init__(self, generate: Callable[[], Awaitable[str]], size: int = 12, max_uses: int = 5,
+                 retry_delay: float = 30.0):
+        self._generate = generate
+        self.size = size
+        self.max_uses = max_uses
+        self.retry_delay = retry_delay
+        self._items: deque[list] = deque()  # [greeting, uses_left, prompt]
+        self._wanted: asyncio.Event | None = None  # created in start(), on the serving loop
+        self._task: asyncio.Task | None = None
+        self._counters = {"hits": 0, "misses": 0, "generated": 0, "failures": 0}
+
+    def take(self) -> str | None:
+        """A ready greeting, or None if the caller has to generate one live."""
+        prompt = system_prompt()
+        while self._items:
+            item = self._items.popleft()
+            if item[2] != prompt:
+                continue
+            item[1] -= 1
+            if item[1] > 0:
+                self._items.append(item)
+            self._counters["hits"] += 1
+            self._refill()
+            return item[0]
+        self._counters["misses"] += 1
+        self._refill()
+        return None
+
+    def start(self):
+        if self.size > 0:
+            self._wanted = asyncio.Event()
+            self._wanted.set()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        return {**self._counters, "size": len(self._items), "target_size": self.size}
+
+    def _refill(self):
+        if self._wanted is not None and len(self._items) < self.size:
+            self._wanted.set()
+
+    async def _run(self):
+        while True:
+            await self._wanted.wait()
+            self._wanted.clear()
+            while len(self._items) < self.size:
+                prompt = system_prompt()
+                try:
+                    greeting = await self._generate()
+                except Exception:
+                    self._counters["failures"] += 1
+                    log.exception("Greeting generation failed")
+                    await asyncio.sleep(self.retry_delay)
+                    continue
+                self._items.append([greeting, self.max_uses, prompt])
+                self._counters["generated"] += 1
@@ -0,0 +1,125 @@
+"""
+Rolling summarization of long conversations.
+
+Every turn used to send the whole conversation to Gemini, so long Q&A
+sessions got slower and more expensive with each message. Instead we send:
+
+  - a running summary of the older turns (in the system instruction)
+  - the turns after summarized_upto, verbatim
+
+The stored history is never shortened; the session only records the
+summary text and the index it covers. Once the verbatim part grows past
+token_budget (and keep_last messages), HistoryCompactor folds everything
+but the last keep_last messages into the summary. The fold is a separate
+Gemini call that runs alongside the reply, so it adds no latency; its
+result is used from the next turn on.
+
+Token counts are estimated at 4 characters per token.
+"""
+
+import asyncio
+import logging
+
+from google.genai import types
+
+from agent.text import clean_text
+
+log = logging.getLogger(__name__)
+
+SUMMARY_PROMPT = """
+You maintain a running summary of a conversation between a traveller and a Tunisia travel assistant.
+You get the current summary (possibly empty) and the turns that happened after it.
+Return an updated summary in plain prose, at most 150 words.
+Keep every fact the assistant will need later: the traveller's preferences, companions, budget,
+trip length, places suggested or chosen, questions already answered and promises made.
+Do not use markdown, asterisks, or emojis.
+"""
+
+_SUMMARY_HEADER = "SUMMARY OF THE EARLIER CONVERSATION (older turns are not repeated below):"
+
+_counters = {"requests": 0, "tokens_full": 0, "tokens_sent": 0, "folds": 0, "fold_failures": 0}
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + 3) // 4
+
+
+def _text(turn) -> str:
+    """Text of a history entry — a session dict or a types.Content."""
+    return turn["text"] if isinstance(turn, dict) else turn.parts[0].text
+
+
+def _tokens(turns: list) -> int:
+    return sum(estimate_tokens(_text(t)) for t in turns)
+
+
+def window(history: list, summary: str, summarized_upto: int) -> list:
+    """The turns to send verbatim, recording how many tokens the summary saves."""
+    upto = summarized_upto if summary and 0 < summarized_upto < len(history) else 0
+    recent = history[upto:]
+    _counters["requests"] += 1
+    _counters["tokens_full"] += _tokens(history)
+    _counters["tokens_sent"] += _tokens(recent) + (estimate_tokens(summary) if upto else 0)
+    return recent
+
+
+def with_summary(system_prompt: str, summary: str) -> str:
+    if not summary:
+        return system_prompt
+    return f"{system_prompt}\n\n{_SUMMARY_HEADER}\n{summary}"
+
+
+def stats() -> dict:
+    return {**_counters, "tokens_saved": _counters["tokens_full"] - _counters["tokens_sent"]}
+
+
+class HistoryCompactor:
+    def __init__(self, client, model: str, keep_last: int = 8, token_budget: int = 1500):
+        self.client = client
+        self.model = model
+        self.keep_last = keep_last
+        self.token_budget = token_budget
+
+    def fold_point(self, history: list, summarized_upto: int) -> int | None:
+        """
+        Index up to which history should be summarized now, or None.
+        The verbatim part always restarts on a user turn.
+        """
+        if self.token_budget <= 0:
+            return None
+        recent = history[summarized_upto:]
+        if len(recent) <= self.keep_last or _tokens(recent) <= self.token_budget:
+            return None
+        cut = len(history) - self.keep_last
+        while cut > summarized_upto and history[cut]["role"] != "user":
+            cut -= 1
+        return cut if cut > summarized_upto else None
+
+    def start(self, history: list, summary: str, summarized_upto: int) -> asyncio.Task | None:
+        """Begin folding in the background; the task returns (summary, summarized_upto) or None."""
+        cut = self.fold_point(history, summarized_upto)
+        if cut is None:
+            return None
+        return asyncio.create_task(self._fold(history[summarized_upto:cut], summary, cut))
+
+    async def _fold(self, turns: list, summary: str, cut: int) -> tuple[str, int] | None:
+        transcript = "\n".join(
+            f"{'Traveller' if t['role'] == 'user' else 'Assistant'}: {t['text']}" for t in turns
+        )
+        prompt = f"Current summary:\n{summary or '(none)'}\n\nNew turns:\n{transcript}"
+        try:
+            response = await self.client.aio.models.generate_content(
+                model=self.model,
+                contents=[types.Content(role="user", parts=[types.Part(text=prompt)])],
+                config=types.GenerateContentConfig(system_instruction=SUMMARY_PROMPT),
+            )
+            new_summary = clean_text(response.text or "")
+        except Exception:
+            _counters["fold_failures"] += 1
+            log.exception("History summarization failed")
+            return None
+        if not new_summary:
+            _counters["fold_failures"] += 1
+            return None
+        _counters["folds"] += 1
+        return new_summary, cut
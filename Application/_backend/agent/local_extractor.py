@@ -0,0 +1,330 @@
+"""
+Rule-based preference extraction — the fast path before Gemini.
+
+Most answers to Yasmine's questions are a handful of words ("couple",
+"mid range", "Beach & relaxation", "just 1 day"). The user turns are
+scanned with one compiled regex built from the catalog's vocabularies
+(styles, interests, and the best_for and budget tags that name one of
+the extractor's COMPANIONS or BUDGETS) plus a synonym table, and the
+matches vote for each field (ambiguous single words at reduced weight). Every field gets a confidence in [0, 1];
+callers only fall back to the Gemini extractor when a required field is
+below their threshold.
+
+free_text() is what is left of the user's words once the vocabulary is
+taken out; retrieval searches only that part semantically.
+
+The output has the same shape as extract_preferences(): style is one of
+the extractor's STYLES (catalog styles such as "relaxation" count towards
+the closest one), interests are catalog terms so they line up with the
+retriever's exact matching.
+
+Benchmark against the preferences Gemini extracted in recorded sessions:
+    python -m agent.local_extractor chouchane_sessions.json [--gemini]
+"""
+
+import re
+from collections import Counter
+from collections.abc import Callable, Mapping
+
+from agent.extractor import BUDGETS, COMPANIONS, DEFAULT_DURATION_DAYS, STYLES
+from catalog.store import Catalog, current_catalog, on_reload
+
+# Fields that must be confident before the local result is used
+REQUIRED_FIELDS = ("style", "companions", "budget")
+
+# Catalog styles outside the extractor's STYLES vote for the closest one
+_STYLE_GROUPS = {
+    "relaxation": "beach", "food": "culture", "photography": "culture", "music": "culture",
+    "religion": "history", "hiking": "adventure", "nightlife": "mix", "entertainment": "mix",
+}
+
+_SYNONYMS = {
+    ("style", "beach"):        ["beaches", "sea", "seaside", "sun", "swim", "swimming", "coast",
+                                "relax", "relaxing", "chill", "calm", "peaceful", "spa"],
+    ("style", "adventure"):    ["adventurous", "thrill", "thrills", "extreme", "off the beaten path"],
+    ("style", "culture"):      ["cultural", "local life", "locals", "traditions", "traditional",
+                                "medina", "medinas", "museums", "museum", "foodie", "cuisine", "gastronomy"],
+    ("style", "history"):      ["historical", "historic", "ancient", "ruins", "roman", "heritage"],
+    ("style", "nature"):       ["mountains", "forest", "forests", "outdoors", "landscapes",
+                                "nature lover", "nature lovers"],
+    ("style", "mix"):          ["mixed", "a bit of everything", "everything", "a little of everything",
+                                "night life", "nighlife", "party", "parties", "partying", "clubbing"],
+    ("companions", "solo"):    ["solo", "alone", "by myself", "on my own", "just me"],
+    ("companions", "couple"):  ["couple", "wife", "husband", "girlfriend", "boyfriend", "partner", "fiance",
+                                "fiancee", "honeymoon", "spouse", "two of us", "my love", "my partner"],
+    ("companions", "family"):  ["family", "kids", "children", "my son", "my daughter", "parents", "baby"],
+    ("companions", "friends"): ["friends", "buddies", "mates", "group", "my friend"],
+    ("budget", "budget"):      ["cheap", "low budget", "tight budget", "small budget", "on a budget",
+                                "budget travel", "budget friendly", "backpacking", "backpacker", "affordable",
+                                "economical", "low cost"],
+    ("budget", "mid-range"):   ["mid range", "midrange", "mid budget", "mid level", "medium", "moderate",
+                                "comfort", "comfortable", "average", "normal budget", "reasonable"],
+    ("budget", "luxury"):      ["luxury", "luxurious", "high end", "upscale", "five star", "5 star",
+                                "premium", "splurge", "big budget", "high budget", "lavish"],
+    ("interests", "desert"):   ["desert", "sahara", "dunes", "camel"],
+    ("interests", "diving"):   ["diving", "dive", "scuba", "snorkeling", "snorkelling"],
+    ("interests", "stargazing"): ["stargazing", "stars", "night sky"],
+    ("interests", "shopping"): ["shopping", "souk", "souks", "markets", "market"],
+    ("interests", "nightlife"): ["nightlife", "night life", "nighlife", "party", "parties", "clubbing"],
+    ("interests", "hiking"):   ["hiking", "hike", "trekking", "trek", "walks"],
+}
+
+# Phrases that contain vocabulary words but mean something else
+_STOP_PHRASES = ["couple of", "few", "not sure", "no idea", "budget", "business partner"]
+
+# Single words that often mean something else ("partner" at work, "sun" cream,
+# "everything" ready) vote at this weight; alone they stay below a confident answer
+_WEAK_WORDS = {"partner": 0.5, "sun": 0.5, "everything": 0.5}
+
+# Conversational words free_text() drops; they say nothing about a place
+_FILLERS = re.compile(
+    r"\b(?:hi|hello|hey|ok|okay|yes|yeah|yep|sure|maybe|hmm+|um+|uh+|well|please|thanks|thank|"
+    r"think|guess|say|probably|really|definitely|sounds|perfect|great|fine)\b"
+)
+
+_NEGATIONS = {"no", "not", "dont", "never", "without", "hate", "nothing", "avoid"}
+
+# A negation does not reach past the end of its clause ("no idea, couple")
+_CLAUSE_END = re.compile(r"[,;.!?]")
+
+_NUMBERS = {"a": 1, "an": 1, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6,
+            "seven": 7, "eight": 8, "nine": 9, "ten": 10, "couple of": 2}
+
+# "a few days" stays unknown (the default), as Gemini reads it
+_DURATION = re.compile(
+    r"\b(\d{1,2}|a|an|one|two|three|four|five|six|seven|eight|nine|ten|couple of)\s+"
+    r"(day|days|night|nights|week|weeks)\b"
+    r"|\b(weekend|fortnight)\b"
+)
+
+
+def _normalize(text: str) -> str:
+    text = text.lower().replace("’", "").replace("'", "").replace("&", " and ").replace("-", " ")
+    return " ".join(text.split())
+
+
+def _vocabulary(places: Mapping) -> dict[str, list[tuple[str, str]]]:
+    """phrase -> [(field, value), ...] for every term the automaton knows."""
+    phrases: dict[str, list[tuple[str, str]]] = {}
+
+    def add(phrase: str, field: str, value: str):
+        targets = phrases.setdefault(_normalize(phrase), [])
+        if (field, value) not in targets:
+            targets.append((field, value))
+
+    for place in places.values():
+        for style in place["styles"]:
+            add(style, "style", _STYLE_GROUPS.get(style, style))
+        for interest in place["interests"]:
+            add(interest, "interests", interest)
+        # Other best_for tags ("photographer", "nature lovers") are not a kind of company
+        for companions in place["best_for"]:
+            if companions.lower() in COMPANIONS:
+                add(companions, "companions", companions.lower())
+        for budget in place["budget"]:
+            if budget.lower() in BUDGETS:
+                add(budget, "budget", budget.lower())
+    for style in STYLES:
+        add(style, "style", style)
+    for (field, value), words in _SYNONYMS.items():
+        for word in words:
+            add(word, field, value)
+    # Stop phrases never vote, even when the catalog uses them as a tag ("budget")
+    for phrase in _STOP_PHRASES:
+        phrases[_normalize(phrase)] = []
+    return phrases
+
+
+def _compile(catalog: Catalog) -> Callable[[], None]:
+    """Build the phrase table and automaton for catalog; the returned commit swaps them in."""
+    phrases = _vocabulary(catalog.places)
+    # Longest phrases first so "beach parties" wins over "beach" and "mid range budget" over "budget"
+    automaton = re.compile(
+        r"\b(?:" + "|".join(re.escape(p) for p in sorted(phrases, key=len, reverse=True)) + r")\b"
+    )
+
+    def commit():
+        global _matcher
+        _matcher = (phrases, automaton)
+    return commit
+
+
+_compile(current_catalog())()
+on_reload(_compile)
+
+_counters = {"confident": 0, "fallback": 0}
+
+
+def _text(turn) -> str:
+    return turn["text"] if isinstance(turn, dict) else turn.parts[0].text
+
+
+def _role(turn) -> str:
+    return turn["role"] if isinstance(turn, dict) else turn.role
+
+
+def _negated(text: str, start: int) -> bool:
+    clause = _CLAUSE_END.split(text[:start])[-1]
+    return any(word in _NEGATIONS for word in clause.split()[-3:])
+
+
+def _duration(texts: list[str]) -> tuple[int, float]:
+    days, confidence = DEFAULT_DURATION_DAYS, 0.0
+    for text in texts:
+        for match in _DURATION.finditer(text):
+            count, unit, named = match.groups()
+            if named:
+                days, confidence = (2, 0.8) if named == "weekend" else (14, 0.8)
+                continue
+            n = int(count) if count.isdigit() else _NUMBERS[count]
+            if n <= 0:
+                continue
+            days = n * 7 if unit.startswith("week") else n
+            confidence = 0.9
+    return days, confidence
+
+
+def _vote(counts: Counter, last_seen: dict) -> tuple[str, float]:
+    """Winner of a field's mentions (ties go to the latest one) and its confidence."""
+    if not counts:
+        return "", 0.0
+    winner = max(counts, key=lambda v: (counts[v], last_seen[v]))
+    share = counts[winner] / sum(counts.values())
+    strength = counts[winner]
+    return winner, share * (0.95 if strength > 1 else 0.8 if strength == 1 else 0.8 * strength)
+
+
+def extract_local(history: list) -> tuple[dict, dict]:
+    """
+    (preferences, confidence) from the user turns of history (types.Content
+    or session dicts). Confidence is per field, 0.0 when nothing was said.
+    """
+    phrases, automaton = _matcher
+    texts = [_normalize(_text(t)) for t in history if _role(t) == "user"]
+    counts = {"style": Counter(), "companions": Counter(), "budget": Counter()}
+    last_seen = {field: {} for field in counts}
+    interests: list[str] = []
+    position = 0
+
+    for text in texts:
+        for match in automaton.finditer(text):
+            if _negated(text, match.start()):
+                continue
+            position += 1
+            for field, value in phrases[match.group()]:
+                if field == "interests":
+                    if value not in interests:
+                        interests.append(value)
+                else:
+                    counts[field][value] += _WEAK_WORDS.get(match.group(), 1)
+                    last_seen[field][value] = position
+
+    preferences, confidence = {}, {}
+    for field in ("style", "companions", "budget"):
+        preferences[field], confidence[field] = _vote(counts[field], last_seen[field])
+    preferences["duration_days"], confidence["duration_days"] = _duration(texts)
+    preferences["interests"] = interests
+    confidence["interests"] = 1.0 if interests else 0.0
+    return preferences, confidence
+
+
+def free_text(text: str) -> str:
+    """
+    The part of text the preferences do not capture, line by line: every
+    phrase the extractor scores, trip length and filler word removed. Retrieval
+    searches only this, since the rest is already scored by the tags.
+    """
+    _, automaton = _matcher
+    lines = (" ".join(_FILLERS.sub(" ", automaton.sub(" ", _DURATION.sub(" ", _normalize(line)))).split())
+             for line in text.split("\n"))
+    return "\n".join(line for line in lines if line)
+
+
+def overall_confidence(confidence: dict, fields: tuple = REQUIRED_FIELDS) -> float:
+    return min(confidence[field] for field in fields)
+
+
+def confident_preferences(history: list, threshold: float) -> dict | None:
+    """Local preferences if every required field reaches threshold, else None."""
+    preferences, confidence = extract_local(history)
+    if overall_confidence(confidence) >= threshold:
+        _counters["confident"] += 1
+        return preferences
+    _counters["fallback"] += 1
+    return None
+
+
+def stats() -> dict:
+    return dict(_counters)
+
+
+# ── Benchmark ────────────────────────────────────────────────────────────────
+
+def _recorded(path: str, threshold_turns: int) -> list[tuple[list, dict]]:
+    """(user turns up to the extraction turn, Gemini preferences) per recorded session."""
+    import json
+
+    with open(path, encoding="utf-8") as f:
+        sessions = json.load(f)
+    cases = []
+    for session in sessions.values():
+        prefs = session.get("yasmine_prefs")
+        if not prefs:
+            continue
+        turns = [h for h in session.get("yasmine_history", []) if h["role"] == "user"][:threshold_turns]
+        cases.append((turns, prefs))
+    return cases
+
+
+def benchmark(path: str, threshold: float, gemini: bool = False):
+    import time
+
+    from agent.conversation import EXTRACTION_TURN_THRESHOLD
+
+    cases = _recorded(path, EXTRACTION_TURN_THRESHOLD)
+    fields = ("style", "companions", "budget", "duration_days")
+    agree = Counter()
+    confident = confident_agree = 0
+    start = time.perf_counter()
+    for turns, expected in cases:
+        preferences, confidence = extract_local(turns)
+        for field in fields:
+            agree[field] += preferences[field] == expected.get(field)
+        if overall_confidence(confidence) >= threshold:
+            confident += 1
+            confident_agree += all(preferences[f] == expected.get(f) for f in REQUIRED_FIELDS)
+    local_ms = (time.perf_counter() - start) * 1000 / max(len(cases), 1)
+
+    print(f"{len(cases)} recorded sessions with Gemini-extracted preferences")
+    for field in fields:
+        print(f"  {field:<14} agreement {agree[field] / max(len(cases), 1):6.1%}")
+    print(f"  confident (>= {threshold}) {confident}/{len(cases)}, "
+          f"all required fields agree in {confident_agree}/{confident}")
+    print(f"  local extraction  {local_ms:8.3f} ms per conversation")
+
+    if gemini:
+        from google.genai import types
+
+        from agent.clients import get_client
+        from agent.extractor import extract_preferences
+        from config.settings import API_KEY, GEMINI_MODEL
+
+        client = get_client(API_KEY)
+        start = time.perf_counter()
+        for turns, _ in cases:
+            contents = [types.Content(role="user", parts=[types.Part(text=t["text"])]) for t in turns]
+            extract_preferences(client, GEMINI_MODEL, contents)
+        print(f"  Gemini extraction {(time.perf_counter() - start) * 1000 / max(len(cases), 1):8.1f} ms per conversation")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from config.settings import LOCAL_EXTRACTION_CONFIDENCE
+
+    parser = argparse.ArgumentParser(description="Compare local preference extraction with recorded Gemini results.")
+    parser.add_argument("sessions", help="sessions JSON (e.g. chouchane_sessions.json)")
+    parser.add_argument("--threshold", type=float, default=LOCAL_EXTRACTION_CONFIDENCE)
+    parser.add_argument("--gemini", action="store_true", help="also time live Gemini extraction")
+    args = parser.parse_args()
+    benchmark(args.sessions, args.threshold, gemini=args.gemini)
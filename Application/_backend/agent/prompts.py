@@ -0,0 +1,37 @@
+"""
+Cached prompt assets.
+
+The system prompt is read once and kept in memory; its modification time
+is checked on access so edits to system_prompt.txt are picked up without
+a restart.
+"""
+
+import threading
+from pathlib import Path
+
+from config.settings import SYSTEM_PROMPT_PATH
+
+
+class PromptFile:
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._mtime: float | None = None
+        self._text = ""
+
+    def text(self) -> str:
+        mtime = self.path.stat().st_mtime
+        if mtime != self._mtime:
+            with self._lock:
+                if mtime != self._mtime:
+                    self._text = self.path.read_text(encoding="utf-8")
+                    self._mtime = mtime
+        return self._text
+
+
+_system_prompt = PromptFile(SYSTEM_PROMPT_PATH)
+
+
+def system_prompt() -> str:
+    """Yasmine's system prompt, reloaded whenever the file changes."""
+    return _system_prompt.text()
@@ -0,0 +1,158 @@
+"""
+Response cache for the Tunisia Q&A phase.
+
+Tourists keep asking the same things ("what is lablabi?", "best time to
+visit Djerba?"). Replies are cached under the normalized question (and
+optionally the chosen place) with a TTL and LRU eviction.
+
+Only questions that do not lean on the conversation are served from the
+cache: the first question of a Q&A session, or a later one without
+follow-up words such as "it", "there" or "more".
+
+With similarity > 0 a miss also looks for a near-duplicate question: an
+inverted index from content words to cached keys finds candidates, and
+the best one is used if its cosine similarity reaches the threshold.
+
+The cache is used from the event loop only and is not thread-safe.
+"""
+
+import math
+import re
+import time
+from collections import Counter, OrderedDict
+
+_WORD = re.compile(r"\w+")
+
+_STOPWORDS = frozenset("""
+a an the is are was were be been am do does did can could should would will shall may might
+i me my we our you your to of in on at for from with about into by and or as so than
+what whats which who whom how when where why tell please
+""".split())
+
+# Words that point back into the conversation — their answer depends on history
+_FOLLOW_UP = frozenset("""
+it its there that this these those they them their he she him her his
+more else also again too another other same previous above earlier then
+""".split())
+
+
+def normalize_question(text: str) -> str:
+    return " ".join(_WORD.findall(text.lower().replace("'", "")))
+
+
+def is_self_contained(question: str) -> bool:
+    return not any(word in _FOLLOW_UP for word in normalize_question(question).split())
+
+
+def _vector(normalized: str) -> Counter:
+    return Counter(w for w in normalized.split() if w not in _STOPWORDS)
+
+
+def _cosine(a: Counter, b: Counter) -> float:
+    dot = sum(count * b[word] for word, count in a.items())
+    if not dot:
+        return 0.0
+    return dot / (math.sqrt(sum(c * c for c in a.values())) * math.sqrt(sum(c * c for c in b.values())))
+
+
+class _Entry:
+    __slots__ = ("reply", "expires_at", "vector")
+
+    def __init__(self, reply: str, expires_at: float, vector: Counter):
+        self.reply = reply
+        self.expires_at = expires_at
+        self.vector = vector
+
+
+class QACache:
+    def __init__(self, max_size: int = 2048, ttl: float = 86400.0, similarity: float = 0.0,
+                 by_place: bool = False):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.similarity = similarity
+        self.by_place = by_place
+        self._entries: OrderedDict[tuple[str, str], _Entry] = OrderedDict()
+        self._index: dict[str, set[tuple[str, str]]] = {}  # content word -> keys
+        self._counters = {"hits": 0, "near_hits": 0, "misses": 0, "bypassed": 0,
+                          "evictions": 0, "expirations": 0}
+
+    def cacheable(self, question: str, history: list) -> bool:
+        ok = self.max_size > 0 and (not history or is_self_contained(question))
+        if not ok:
+            self._counters["bypassed"] += 1
+        return ok
+
+    def get(self, question: str, place: str | None = None) -> str | None:
+        key = self._key(question, place)
+        entry = self._live(key)
+        if entry is not None:
+            self._counters["hits"] += 1
+            return entry.reply
+
+        if self.similarity > 0:
+            match = self._nearest(key)
+            if match is not None:
+                self._counters["near_hits"] += 1
+                return match.reply
+
+        self._counters["misses"] += 1
+        return None
+
+    def put(self, question: str, reply: str, place: str | None = None):
+        if self.max_size <= 0:
+            return
+        key = self._key(question, place)
+        if key in self._entries:
+            self._remove(key)
+        vector = _vector(key[0])
+        self._entries[key] = _Entry(reply, time.monotonic() + self.ttl, vector)
+        for word in vector:
+            self._index.setdefault(word, set()).add(key)
+        while len(self._entries) > self.max_size:
+            self._remove(next(iter(self._entries)))
+            self._counters["evictions"] += 1
+
+    def stats(self) -> dict:
+        served = self._counters["hits"] + self._counters["near_hits"]
+        lookups = served + self._counters["misses"]
+        return {
+            **self._counters,
+            "size": len(self._entries),
+            "hit_rate": served / lookups if lookups else 0.0,
+        }
+
+    def _key(self, question: str, place: str | None) -> tuple[str, str]:
+        return normalize_question(question), (place or "") if self.by_place else ""
+
+    def _live(self, key: tuple[str, str]) -> _Entry | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at < time.monotonic():
+            self._remove(key)
+            self._counters["expirations"] += 1
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _nearest(self, key: tuple[str, str]) -> _Entry | None:
+        vector = _vector(key[0])
+        candidates = set()
+        for word in vector:
+            candidates |= {k for k in self._index.get(word, ()) if k[1] == key[1]}
+
+        best, best_score = None, self.similarity
+        for candidate in candidates:
+            score = _cosine(vector, self._entries[candidate].vector)
+            if score >= best_score:
+                best, best_score = candidate, score
+        return self._live(best) if best is not None else None
+
+    def _remove(self, key: tuple[str, str]):
+        entry = self._entries.pop(key)
+        for word in entry.vector:
+            keys = self._index.get(word)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._index[word]
@@ -0,0 +1,105 @@
+"""
+Precomputed tag scores for every enumerable preference combination.
+
+style, companions and budget are small closed enums (plus "" for unknown)
+and the scorer only distinguishes three duration buckets, so there are
+just 7 × 5 × 4 × 3 = 420 different tag-score vectors. The table holds all
+of them (int16, combinations × places) plus each combination's top
+places. At query time only interests and the semantic query are added
+on top; without them a retrieval is a plain lookup.
+
+The table is saved as .npy files that workers memory-map instead of
+scoring, so they share one copy through the page cache:
+    python -m agent.retrieval_table
+"""
+
+import hashlib
+import itertools
+import json
+import pathlib
+from collections.abc import Callable, Mapping
+
+import numpy as np
+
+from agent.extractor import BUDGETS, COMPANIONS, STYLES
+from catalog.compiled import plain
+
+# A representative trip length per bucket the scorer distinguishes
+DURATION_BUCKETS = {"short": 3, "mid": 5, "long": 7}
+
+
+def duration_bucket(days) -> str:
+    return "short" if days <= 3 else "long" if days >= 7 else "mid"
+
+
+def combination_key(preferences: dict) -> tuple[str, str, str, str]:
+    return (
+        preferences.get("style", "").lower(),
+        preferences.get("companions", "").lower(),
+        preferences.get("budget", "").lower(),
+        duration_bucket(preferences.get("duration_days", 7)),
+    )
+
+
+def catalog_fingerprint(places: Mapping) -> str:
+    encoded = json.dumps(places, sort_keys=True, ensure_ascii=False, default=plain)
+    return hashlib.blake2b(encoded.encode(), digest_size=16).hexdigest()
+
+
+class RetrievalTable:
+    def __init__(self, keys: list[tuple], scores: np.ndarray, top: np.ndarray, fingerprint: str):
+        self.keys = keys
+        self.scores = scores   # combinations × places, tag scores
+        self.top = top         # combinations × top_n, place indices best first
+        self.fingerprint = fingerprint
+        self.rows = {key: i for i, key in enumerate(keys)}
+
+    @classmethod
+    def build(cls, tag_scores: Callable[[dict], np.ndarray], rank: Callable[[np.ndarray, int], list[int]],
+              top_n: int, fingerprint: str) -> "RetrievalTable":
+        keys, rows, tops = [], [], []
+        for style, companions, budget, bucket in itertools.product(
+            ("",) + STYLES, ("",) + COMPANIONS, ("",) + BUDGETS, DURATION_BUCKETS
+        ):
+            preferences = {"style": style, "companions": companions, "budget": budget,
+                           "duration_days": DURATION_BUCKETS[bucket]}
+            scores = tag_scores(preferences)
+            keys.append((style, companions, budget, bucket))
+            rows.append(scores.astype(np.int16))
+            tops.append(rank(scores, top_n))
+        return cls(keys, np.stack(rows), np.array(tops, dtype=np.int32), fingerprint)
+
+    def row(self, preferences: dict) -> int | None:
+        """Table row for preferences, or None if they are outside the enums."""
+        return self.rows.get(combination_key(preferences))
+
+    def save(self, directory: pathlib.Path):
+        directory.mkdir(parents=True, exist_ok=True)
+        np.save(directory / "scores.npy", self.scores)
+        np.save(directory / "top.npy", self.top)
+        (directory / "meta.json").write_text(
+            json.dumps({"fingerprint": self.fingerprint, "keys": self.keys}, ensure_ascii=False),
+            encoding="utf-8",
+        )
+
+    @classmethod
+    def load(cls, directory: pathlib.Path, fingerprint: str) -> "RetrievalTable | None":
+        """Memory-map a saved table; None if it is missing or was built for another catalog."""
+        try:
+            meta = json.loads((directory / "meta.json").read_text(encoding="utf-8"))
+            if meta.get("fingerprint") != fingerprint:
+                return None
+            scores = np.load(directory / "scores.npy", mmap_mode="r")
+            top = np.load(directory / "top.npy", mmap_mode="r")
+            return cls([tuple(key) for key in meta["keys"]], scores, top, fingerprint)
+        except (OSError, KeyError, TypeError, ValueError):
+            return None
+
+
+if __name__ == "__main__":
+    from agent.retriever import build_table
+    from config.settings import RETRIEVAL_TABLE_DIR
+
+    table = build_table()
+    table.save(RETRIEVAL_TABLE_DIR)
+    print(f"Precomputed {len(table.keys)} combinations × {table.scores.shape[1]} places into {RETRIEVAL_TABLE_DIR}")
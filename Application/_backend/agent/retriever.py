@@ -1,11 +1,342 @@
-from data.places_db import PLACES_DB
+"""
+Tag-based place retrieval.
 
+The catalog is compiled once into count matrices (one column per style,
+best_for, budget and interest value) so scoring a preference dict is a
+few matrix-vector products and top-k is an argpartition, instead of a
+Python loop over every place. Scores and rankings are exactly those of
+the original loop:
 
-def retrieve_top_places(preferences: dict, top_n: int = 2) -> list:
+  +3 per place style contained in the preferred style string
+  +2 per best_for value contained in the companions string
+  +2 per budget value contained in the budget string
+  +4 per preferred interest listed in the place's interests
+  +2 for 1-day places on trips of 3 days or less, +1 for every place on trips of 7+ days
+
+Ties keep catalog order.
+
+With a free-text query (the user's own words), the cosine similarity from
+the semantic index over place descriptions (agent/semantic_index.py),
+times SEMANTIC_WEIGHT, is added on top.
+
+retrieve() returns the ranked names together with the rendered RAG
+context and memoizes both in an LRU keyed by the canonical preferences
+(duration reduced to the three buckets the scorer distinguishes) and the
+query's semantic terms, so conversations that differ only in wording
+the index cannot match share an entry. Tag
+scores for every enum combination come precomputed from the
+RetrievalTable (agent/retrieval_table.py); for those combinations without
+interests or a query the result itself is precomputed. ranking() gives
+the deeper order a session's resuggestion cursor pages through.
+
+Place profiles come from the catalog's records (catalog/records.py).
+All of this is derived from the live catalog (catalog/store.py) and is
+rebuilt, then swapped in as one _State, when the catalog is reloaded.
+
+Benchmark against the original loop on synthetic catalogs:
+    python -m agent.retriever 1000 10000 100000
+"""
+
+import logging
+from collections import OrderedDict
+from collections.abc import Callable, Mapping
+from typing import NamedTuple
+
+import numpy as np
+
+from agent.retrieval_table import RetrievalTable, catalog_fingerprint, combination_key
+from agent.semantic_index import SemanticIndex, load_or_build
+from catalog.records import Place
+from catalog.store import Catalog, current_catalog, on_reload
+from config.settings import RETRIEVAL_CACHE_SIZE, RETRIEVAL_TABLE_DIR, SEMANTIC_INDEX_DIR, SEMANTIC_WEIGHT
+
+log = logging.getLogger(__name__)
+
+STYLE_WEIGHT = 3
+COMPANION_WEIGHT = 2
+BUDGET_WEIGHT = 2
+INTEREST_WEIGHT = 4
+SHORT_TRIP_WEIGHT = 2
+LONG_TRIP_WEIGHT = 1
+TOP_N = 2
+# How deep a session's resuggestion cursor pages through the ranking
+RANKING_DEPTH = 10
+
+
+class Retrieval(NamedTuple):
+    names: tuple[str, ...]   # best first
+    context: str             # RAG context for the system prompt
+
+
+def _counts(places: list, field: str) -> tuple[list[str], np.ndarray]:
+    """(vocabulary, places × vocabulary matrix of how often each value is listed)."""
+    vocab = sorted({value for place in places for value in place[field]})
+    column = {value: j for j, value in enumerate(vocab)}
+    matrix = np.zeros((len(places), len(vocab)), dtype=np.int32)
+    for i, place in enumerate(places):
+        for value in place[field]:
+            matrix[i, column[value]] += 1
+    return vocab, matrix
+
+
+class PlaceIndex:
+    """A place catalog compiled for vectorized scoring."""
+
+    def __init__(self, places: Mapping, semantic: SemanticIndex | None = None):
+        self.names = list(places)
+        self.semantic = semantic if semantic is not None and semantic.names == self.names else None
+        self.places = places
+        rows = [places[name] for name in self.names]
+        self.style_vocab, self.styles = _counts(rows, "styles")
+        self.companion_vocab, self.best_for = _counts(rows, "best_for")
+        self.budget_vocab, self.budgets = _counts(rows, "budget")
+        self.interest_vocab, interests = _counts(rows, "interests")
+        # Interests score by membership, however often a place lists them
+        self.interests = (interests > 0).astype(np.int32)
+        self.interest_column = {value: j for j, value in enumerate(self.interest_vocab)}
+        self.one_day = np.array([place["duration_days"] <= 1 for place in rows], dtype=np.int32)
+        # Breaks ties in catalog order: earlier places get the larger bonus
+        self._tiebreak = np.arange(len(rows) - 1, -1, -1, dtype=np.int64)
+
+    def scores(self, preferences: dict) -> np.ndarray:
+        return self.tag_scores(preferences) + self.interest_scores(preferences.get("interests", []))
+
+    def tag_scores(self, preferences: dict) -> np.ndarray:
+        """Score from style, companions, budget and duration (everything but interests)."""
+        style      = preferences.get("style", "").lower()
+        companions = preferences.get("companions", "").lower()
+        budget     = preferences.get("budget", "").lower()
+        duration   = preferences.get("duration_days", 7)
+
+        scores = np.zeros(len(self.names), dtype=np.int64)
+        if style:
+            scores += STYLE_WEIGHT * (self.styles @ _contained(self.style_vocab, style))
+        if companions:
+            scores += COMPANION_WEIGHT * (self.best_for @ _contained(self.companion_vocab, companions))
+        if budget:
+            scores += BUDGET_WEIGHT * (self.budgets @ _contained(self.budget_vocab, budget))
+        if duration <= 3:
+            scores += SHORT_TRIP_WEIGHT * self.one_day
+        elif duration >= 7:
+            scores += LONG_TRIP_WEIGHT
+        return scores
+
+    def interest_scores(self, interests: list[str]) -> np.ndarray:
+        scores = np.zeros(len(self.names), dtype=np.int64)
+        if interests:
+            wanted = np.zeros(len(self.interest_vocab), dtype=np.int32)
+            for interest in interests:
+                j = self.interest_column.get(interest.lower())
+                if j is not None:
+                    wanted[j] += 1
+            scores += INTEREST_WEIGHT * (self.interests @ wanted)
+        return scores
+
+    def query_terms(self, query: str | tuple) -> tuple:
+        """The semantic terms query contributes (SemanticIndex.query_terms), () if none."""
+        if not query or self.semantic is None or SEMANTIC_WEIGHT <= 0:
+            return ()
+        return self.semantic.query_terms(query) if isinstance(query, str) else query
+
+    def top(self, preferences: dict, k: int, query: str | tuple = "",
+            tag_scores: np.ndarray | None = None) -> list[int]:
+        """
+        Indices of the k best places, best first. query is free text or its
+        query_terms(). tag_scores, if given, are precomputed
+        tag_scores(preferences) (see agent/retrieval_table.py).
+        """
+        n = len(self.names)
+        k = min(k, n)
+        if k <= 0:
+            return []
+        if tag_scores is None:
+            tag_scores = self.tag_scores(preferences)
+        scores = tag_scores + self.interest_scores(preferences.get("interests", []))
+        query_terms = self.query_terms(query)
+        if query_terms:
+            return _top_k(scores + SEMANTIC_WEIGHT * self.semantic.similarities(query_terms), k)
+        return self.rank(scores, k)
+
+    def rank(self, scores: np.ndarray, k: int) -> list[int]:
+        """Indices of the k highest integer scores, ties in catalog order."""
+        n = len(self.names)
+        k = min(k, n)
+        # score and catalog position folded into one unique key, so ties rank exactly like a stable sort
+        keys = scores.astype(np.int64) * n + self._tiebreak
+        best = np.argpartition(-keys, k - 1)[:k] if k < n else np.arange(n)
+        return best[np.argsort(-keys[best])].tolist()
+
+
+def _top_k(values: np.ndarray, k: int) -> list[int]:
+    """Indices of the k largest values, ties in index order."""
+    if k < len(values):
+        kth = np.partition(values, len(values) - k)[len(values) - k]
+        candidates = np.flatnonzero(values >= kth)
+    else:
+        candidates = np.arange(len(values))
+    order = np.lexsort((candidates, -values[candidates]))
+    return candidates[order[:k]].tolist()
+
+
+def _contained(vocab: list[str], text: str) -> np.ndarray:
+    """1 for every vocabulary value that occurs in text (substring match)."""
+    return np.fromiter((value in text for value in vocab), dtype=np.int32, count=len(vocab))
+
+
+class _State(NamedTuple):
+    """Everything retrieval derives from one catalog, swapped as a whole on reload."""
+    index: PlaceIndex
+    places: Mapping[str, Place]
+    table: RetrievalTable
+    precomputed: list      # finished Retrieval per table row (no interests, no query)
+    memo: OrderedDict      # preferences_key() → Retrieval
+
+
+def build_table(index: PlaceIndex | None = None) -> RetrievalTable:
+    index = index or _state.index
+    return RetrievalTable.build(index.tag_scores, index.rank, TOP_N, catalog_fingerprint(index.places))
+
+
+def _load_table(index: PlaceIndex) -> RetrievalTable:
+    table = RetrievalTable.load(RETRIEVAL_TABLE_DIR, catalog_fingerprint(index.places))
+    if table is None:
+        log.info("Retrieval table at %s is missing or stale; precomputing it in memory "
+                 "(python -m agent.retrieval_table)", RETRIEVAL_TABLE_DIR)
+        table = build_table(index)
+    return table
+
+
+def _load(catalog: Catalog) -> Callable[[], None]:
+    """Build retrieval state for catalog; the returned commit swaps it in."""
+    index = PlaceIndex(catalog.places, load_or_build(catalog.places, SEMANTIC_INDEX_DIR))
+    table = _load_table(index)
+    places = catalog.records.places
+    precomputed = [_retrieval(places, [index.names[i] for i in top]) for top in table.top.tolist()]
+    state = _State(index, places, table, precomputed, OrderedDict())
+
+    def commit():
+        global _state
+        _state = state
+    return commit
+
+
+def retrieve_top_places(preferences: dict, top_n: int = 2, query: str = "") -> list[Place]:
+    """
+    Score every place in the catalog against user preferences (and the
+    free-text query, if any). Returns the top_n best-matching place records.
     """
-    Score every place in PLACES_DB against user preferences.
-    Returns the top_n best-matching place dicts.
+    state = _state
+    return [state.places[state.index.names[i]] for i in state.index.top(preferences, top_n, query)]
+
+
+def preferences_key(preferences: dict, query: str = "") -> tuple:
     """
+    Canonical form of everything that can change a retrieval result: the
+    enum combination, the interests and the semantic terms of the query
+    (not its text, which differs between any two conversations).
+    """
+    return (
+        *combination_key(preferences),
+        tuple(sorted(i.lower() for i in preferences.get("interests", []))),
+        _state.index.query_terms(query),
+    )
+
+
+_counters = {"hits": 0, "misses": 0, "precomputed": 0, "table": 0, "full": 0}
+
+
+def retrieve(preferences: dict, query: str = "") -> Retrieval:
+    """Top places and their RAG context, memoized by preferences_key()."""
+    state = _state
+    key = preferences_key(preferences, query)
+    result = state.memo.get(key)
+    if result is not None:
+        state.memo.move_to_end(key)
+        _counters["hits"] += 1
+        return result
+    _counters["misses"] += 1
+    result = _retrieve(state, preferences, key[-1])
+    if RETRIEVAL_CACHE_SIZE > 0:
+        state.memo[key] = result
+        while len(state.memo) > RETRIEVAL_CACHE_SIZE:
+            state.memo.popitem(last=False)
+    return result
+
+
+def _retrieve(state: _State, preferences: dict, query_terms: tuple) -> Retrieval:
+    index, table = state.index, state.table
+    row = table.row(preferences)
+    if row is None:
+        _counters["full"] += 1
+        indices = index.top(preferences, TOP_N, query_terms)
+    elif not preferences.get("interests") and not query_terms:
+        _counters["precomputed"] += 1
+        return state.precomputed[row]
+    else:
+        _counters["table"] += 1
+        indices = index.top(preferences, TOP_N, query_terms, tag_scores=table.scores[row])
+    return _retrieval(state.places, [index.names[i] for i in indices])
+
+
+def ranking(preferences: dict, query: str = "", depth: int = RANKING_DEPTH) -> list[str]:
+    """Names of the depth best places, best first; retrieve() returns its first TOP_N."""
+    index, table = _state.index, _state.table
+    row = table.row(preferences)
+    tag_scores = table.scores[row] if row is not None else None
+    return [index.names[i] for i in index.top(preferences, depth, query, tag_scores=tag_scores)]
+
+
+def retrieval_for(names: list[str]) -> Retrieval:
+    """Retrieval (and RAG context) for places already picked, e.g. from ranking()."""
+    return _retrieval(_state.places, names)
+
+
+def _retrieval(places: Mapping[str, Place], names: list[str]) -> Retrieval:
+    # Names from before a catalog reload may be gone
+    found = [places[name] for name in names if name in places]
+    return Retrieval(tuple(p.name for p in found), _render_context(found))
+
+
+def stats() -> dict:
+    return {**_counters, "size": len(_state.memo), "max_size": RETRIEVAL_CACHE_SIZE,
+            "table_combinations": len(_state.table.keys)}
+
+
+def build_rag_context(preferences: dict, query: str = "") -> str:
+    """Build the RAG context string — place profiles only."""
+    return retrieve(preferences, query).context
+
+
+def _render_context(places: list[Place]) -> str:
+    lines = ["RETRIEVED PLACE PROFILES (recommend ONLY these 2 places):\n"]
+
+    for p in places:
+        lines.append(f"""
+PLACE: {p.name} — {p.region}
+Vibe: {p.vibe}
+Description: {p.description}
+Top Activities: {', '.join(p.top_activities)}
+Insider Tip: {p.insider_tip}
+Best Season: {p.season}
+Tunisian Word: {p.tunisian_word}
+{"─" * 60}""")
+
+    return "\n".join(lines)
+
+
+def get_recommended_place_names(preferences: dict, query: str = "") -> list[str]:
+    """Return just the names of the top 2 recommended places."""
+    return list(retrieve(preferences, query).names)
+
+
+_load(current_catalog())()
+on_reload(_load)
+
+
+# ── Benchmark ────────────────────────────────────────────────────────────────
+
+def _loop_ranking(places: dict, preferences: dict, top_n: int) -> list[str]:
+    """The original pure-Python scorer, kept as the reference for the benchmark."""
     style      = preferences.get("style", "").lower()
     companions = preferences.get("companions", "").lower()
     budget     = preferences.get("budget", "").lower()
@@ -13,56 +344,101 @@ def retrieve_top_places(preferences: dict, top_n: int = 2) -> list:
     duration   = preferences.get("duration_days", 7)
 
     scores = {}
-
-    for name, place in PLACES_DB.items():
+    for name, place in places.items():
         score = 0
-
         for s in place["styles"]:
             if style and s in style:
                 score += 3
-
         for b in place["best_for"]:
             if companions and b in companions:
                 score += 2
-
         for b in place["budget"]:
             if budget and b in budget:
                 score += 2
-
         for interest in interests:
             if interest in place["interests"]:
                 score += 4
-
         if duration <= 3 and place["duration_days"] <= 1:
             score += 2
         elif duration >= 7:
             score += 1
-
         scores[name] = score
 
     ranked = sorted(scores.items(), key=lambda x: x[1], reverse=True)
-    return [PLACES_DB[name] | {"name": name} for name, _ in ranked[:top_n]]
+    return [name for name, _ in ranked[:top_n]]
 
 
-def build_rag_context(preferences: dict) -> str:
-    """Build the RAG context string — place profiles only."""
-    places = retrieve_top_places(preferences)
-    lines = ["RETRIEVED PLACE PROFILES (recommend ONLY these 2 places):\n"]
+def _synthetic_catalog(size: int, seed: int = 7) -> dict:
+    import random
 
-    for p in places:
-        lines.append(f"""
-PLACE: {p['name']} — {p['region']}
-Vibe: {p['vibe']}
-Description: {p['description']}
-Top Activities: {', '.join(p['top_activities'])}
-Insider Tip: {p['insider_tip']}
-Best Season: {p['season']}
-Tunisian Word: {p['tunisian_word']}
-{"─" * 60}""")
+    rng = random.Random(seed)
+    places = current_catalog().places
+    fields = {field: sorted({v for p in places.values() for v in p[field]})
+              for field in ("styles", "best_for", "budget", "interests")}
+    return {
+        f"place-{i}": {
+            "styles":        rng.sample(fields["styles"], rng.randint(1, 3)),
+            "best_for":      rng.sample(fields["best_for"], rng.randint(1, 3)),
+            "budget":        rng.sample(fields["budget"], rng.randint(1, 2)),
+            "interests":     rng.sample(fields["interests"], rng.randint(2, 6)),
+            "duration_days": rng.randint(1, 7),
+        }
+        for i in range(size)
+    }
 
-    return "\n".join(lines)
 
+def _sample_preferences(count: int, seed: int = 11) -> list[dict]:
+    import random
 
-def get_recommended_place_names(preferences: dict) -> list[str]:
-    """Return just the names of the top 2 recommended places."""
-    return [p["name"] for p in retrieve_top_places(preferences)]
\ No newline at end of file
+    from agent.extractor import BUDGETS, COMPANIONS, STYLES
+
+    rng = random.Random(seed)
+    interests = sorted({v for p in current_catalog().places.values() for v in p["interests"]})
+    return [
+        {
+            "style":         rng.choice(STYLES + ("", "beach|culture")),
+            "companions":    rng.choice(COMPANIONS + ("",)),
+            "budget":        rng.choice(BUDGETS + ("",)),
+            "duration_days": rng.choice((1, 2, 3, 4, 5, 7, 10, 14)),
+            "interests":     rng.sample(interests, rng.randint(0, 3)),
+        }
+        for _ in range(count)
+    ]
+
+
+def benchmark(sizes: list[int], queries: int = 20):
+    import time
+
+    samples = _sample_preferences(200)
+    index = _state.index
+    mismatches = sum(
+        _loop_ranking(index.places, prefs, len(index.names))
+        != [index.names[i] for i in index.top(prefs, len(index.names))]
+        for prefs in samples
+    )
+    print(f"Catalog: full rankings differ for {mismatches}/{len(samples)} preference samples")
+
+    for size in sizes:
+        catalog = _synthetic_catalog(size)
+        start = time.perf_counter()
+        index = PlaceIndex(catalog)
+        build_ms = (time.perf_counter() - start) * 1000
+        prefs = samples[:queries]
+
+        start = time.perf_counter()
+        loop = [_loop_ranking(catalog, p, 10) for p in prefs]
+        loop_ms = (time.perf_counter() - start) * 1000 / len(prefs)
+
+        start = time.perf_counter()
+        vectorized = [[index.names[i] for i in index.top(p, 10)] for p in prefs]
+        vec_ms = (time.perf_counter() - start) * 1000 / len(prefs)
+
+        same = sum(a == b for a, b in zip(loop, vectorized))
+        print(f"{size:>8} places: build {build_ms:8.1f} ms | loop {loop_ms:8.2f} ms/query | "
+              f"vectorized {vec_ms:7.2f} ms/query | identical top-10 {same}/{len(prefs)}")
+
+
+if __name__ == "__main__":
+    import sys
+
+    benchmark([int(arg) for arg in sys.argv[1:]] or [1_000, 10_000, 100_000])
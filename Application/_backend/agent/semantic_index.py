@@ -0,0 +1,184 @@
+"""
+Local semantic index over the free text of the catalog's places.
+
+The tag scorer only sees styles, budgets and interest tags, so a request
+like "Star Wars film sets" or "canyon oases" never matches the
+description, top_activities or insider_tip that actually mention it.
+
+This index embeds those fields with the hashing trick: words and word
+pairs are lightly stemmed, hashed (crc32) into DIM buckets and weighted
+by TF-IDF. Rows are L2-normalized, so a query is a sparse dot product
+giving the cosine similarity. No model or network access is needed.
+
+A query is reduced to query_terms(): the buckets some place contains,
+weighted, normalized, with the faint ones dropped and the rest rounded.
+Similarities are computed from exactly those terms, so two queries with
+equal terms score the same and can share a cache entry.
+
+Build it offline; the server memory-maps it at startup and rebuilds in
+memory (with a warning) if it is missing or stale for the catalog:
+    python -m agent.semantic_index
+"""
+
+import hashlib
+import json
+import logging
+import math
+import pathlib
+import re
+import zlib
+from collections import Counter
+from collections.abc import Mapping
+
+import numpy as np
+
+log = logging.getLogger(__name__)
+
+TEXT_FIELDS = ("description", "top_activities", "insider_tip")
+DIM = 4096
+# Query terms below this normalized weight are dropped, the rest rounded to
+# QUERY_WEIGHT_DIGITS, so near-identical queries reduce to the same terms
+MIN_QUERY_WEIGHT = 0.05
+QUERY_WEIGHT_DIGITS = 2
+
+_WORD = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset("""
+a an the and or of to in on at for from with by is are was were be been it its this that these those
+you your we our i me my they them their there here as so but if than then into over under about
+just very more most some any all can will would should could do does did not no also only
+want like love see visit go get
+""".split())
+_SUFFIXES = ("ing", "ed", "es", "s")
+
+
+def _stem(word: str) -> str:
+    for suffix in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 4:
+            return word[: -len(suffix)]
+    return word
+
+
+def terms(text: str) -> list[str]:
+    """Stemmed content words plus adjacent word pairs ("star wars")."""
+    words = [_stem(w) for w in _WORD.findall(text.lower()) if w not in _STOPWORDS]
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+def _bucket(term: str) -> int:
+    return zlib.crc32(term.encode()) % DIM
+
+
+def _place_text(place: Mapping) -> str:
+    parts = []
+    for field in TEXT_FIELDS:
+        value = place.get(field, "")
+        parts.append(value if isinstance(value, str) else " ".join(value))
+    return "\n".join(parts)
+
+
+def catalog_fingerprint(places: Mapping) -> str:
+    """Changes whenever a place or its indexed text changes."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(str(DIM).encode())
+    for name, place in places.items():
+        digest.update(f"{name}\x00{_place_text(place)}\x01".encode())
+    return digest.hexdigest()
+
+
+class SemanticIndex:
+    def __init__(self, names: list[str], vectors: np.ndarray, idf: np.ndarray, fingerprint: str):
+        self.names = names
+        self.vectors = vectors   # places × DIM, rows L2-normalized (possibly memory-mapped)
+        self.idf = idf
+        self.fingerprint = fingerprint
+        # Buckets no place contains have the largest idf, log(1 + n) + 1; contained ones are at least log 2 lower
+        self.contained = idf < math.log(1 + len(names)) + 1.0 - 0.5
+
+    @classmethod
+    def build(cls, places: Mapping) -> "SemanticIndex":
+        counts = [Counter(_bucket(t) for t in terms(_place_text(place))) for place in places.values()]
+        df = np.zeros(DIM, dtype=np.float64)
+        for row in counts:
+            df[list(row)] += 1
+        idf = np.log((1 + len(counts)) / (1 + df)) + 1.0
+
+        vectors = np.zeros((len(counts), DIM), dtype=np.float32)
+        for i, row in enumerate(counts):
+            for bucket, count in row.items():
+                vectors[i, bucket] = (1.0 + math.log(count)) * idf[bucket]
+            norm = np.linalg.norm(vectors[i])
+            if norm:
+                vectors[i] /= norm
+        return cls(list(places), vectors, idf.astype(np.float32), catalog_fingerprint(places))
+
+    def save(self, directory: pathlib.Path):
+        directory.mkdir(parents=True, exist_ok=True)
+        np.save(directory / "vectors.npy", self.vectors)
+        np.save(directory / "idf.npy", self.idf)
+        (directory / "meta.json").write_text(
+            json.dumps({"dim": DIM, "fingerprint": self.fingerprint, "names": self.names}, ensure_ascii=False),
+            encoding="utf-8",
+        )
+
+    @classmethod
+    def load(cls, directory: pathlib.Path, places: Mapping) -> "SemanticIndex | None":
+        """Memory-map a saved index; None if it is missing or was built for another catalog."""
+        try:
+            meta = json.loads((directory / "meta.json").read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if meta.get("dim") != DIM or meta.get("fingerprint") != catalog_fingerprint(places):
+            return None
+        vectors = np.load(directory / "vectors.npy", mmap_mode="r")
+        idf = np.load(directory / "idf.npy")
+        return cls(meta["names"], vectors, idf, meta["fingerprint"])
+
+    def query_terms(self, query: str) -> tuple[tuple[int, float], ...]:
+        """
+        Sorted (bucket, weight) pairs for query. Buckets no place contains
+        cannot match and are left out before normalizing.
+        """
+        row = Counter(_bucket(t) for t in terms(query))
+        weights = {b: (1.0 + math.log(c)) * float(self.idf[b]) for b, c in row.items() if self.contained[b]}
+        norm = math.sqrt(sum(w * w for w in weights.values()))
+        if not norm:
+            return ()
+        return tuple(sorted(
+            (b, round(w / norm, QUERY_WEIGHT_DIGITS)) for b, w in weights.items() if w / norm >= MIN_QUERY_WEIGHT
+        ))
+
+    def similarities(self, query: str | tuple) -> np.ndarray:
+        """Similarity of query (text or its query_terms()) to every place, in index order."""
+        query_terms = self.query_terms(query) if isinstance(query, str) else query
+        if not query_terms:
+            return np.zeros(len(self.names), dtype=np.float32)
+        buckets = np.fromiter((b for b, _ in query_terms), dtype=np.int64, count=len(query_terms))
+        weights = np.fromiter((w for _, w in query_terms), dtype=np.float32, count=len(query_terms))
+        return self.vectors[:, buckets] @ weights
+
+    def top(self, query: str, k: int = 5) -> list[tuple[str, float]]:
+        sims = self.similarities(query)
+        order = np.argsort(-sims, kind="stable")[:k]
+        return [(self.names[i], float(sims[i])) for i in order]
+
+
+def load_or_build(places: Mapping, directory: pathlib.Path) -> SemanticIndex:
+    index = SemanticIndex.load(directory, places)
+    if index is None:
+        log.warning("Semantic index at %s is missing or stale; building it in memory "
+                    "(run python -m agent.semantic_index)", directory)
+        index = SemanticIndex.build(places)
+    return index
+
+
+if __name__ == "__main__":
+    import sys
+
+    from catalog.store import current_catalog
+    from config.settings import SEMANTIC_INDEX_DIR
+
+    index = SemanticIndex.build(current_catalog().places)
+    index.save(SEMANTIC_INDEX_DIR)
+    print(f"Indexed {len(index.names)} places into {SEMANTIC_INDEX_DIR}")
+    for query in sys.argv[1:]:
+        print(query, "→", index.top(query, 3))
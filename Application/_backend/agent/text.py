@@ -0,0 +1,39 @@
+import re
+
+_UNWANTED = re.compile(r"[\U0001F000-\U0001FFFF\U00002700-\U000027BF\U0001F900-\U0001F9FF\u2600-\u26FF]")
+_SPACES = re.compile(r" {2,}")
+
+
+def clean_text(text: str) -> str:
+    """Strip asterisks and emojis, collapse repeated spaces and trim."""
+    text = text.replace("*", "")
+    text = _UNWANTED.sub("", text)
+    text = _SPACES.sub(" ", text)
+    return text.strip()
+
+
+class StreamCleaner:
+    """
+    Incremental clean_text() for streamed replies.
+
+    feed() takes raw chunks and returns the cleaned text that is safe to
+    emit so far; whitespace at the end of a chunk is held back until we
+    know whether more text follows it. Joining every feed() result gives
+    exactly clean_text() of the joined chunks.
+    """
+
+    def __init__(self):
+        self._started = False
+        self._pending = ""
+
+    def feed(self, chunk: str) -> str:
+        text = _UNWANTED.sub("", chunk.replace("*", ""))
+        if not self._started:
+            text = text.lstrip()
+            if not text:
+                return ""
+            self._started = True
+        text = self._pending + text
+        body = text.rstrip()
+        self._pending = text[len(body):]
+        return _SPACES.sub(" ", body)
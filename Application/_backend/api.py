@@ -13,38 +13,87 @@ State flags:
 
 Endpoints:
   GET  /health               — health check
-  GET  /places               — all places from RAG db (for frontend)
+  GET  /metrics              — runtime counters (caches, tokens saved, extraction, ...)
+  GET  /places               — all places from RAG db (for frontend); fields=, cursor=/limit=, ETag/304, gzip/br
+  GET  /places/nearby        — places, hotels and restaurants near a point, nearest first
+  GET  /places/{name}/partners — a place's hotels and restaurants; filter/sort by price_range, type, cuisine
   POST /session/start        — start session, get WELCOMING + Yasmine greeting
   POST /session/reset        — reset everything back to Phase 1
   GET  /session/{session_id} — inspect session state (debug)
   POST /yasmine              — chat with Yasmine (while yasmine_done = False)
   POST /qa                   — ask anything about Tunisia (open once yasmine_done)
+  POST /yasmine/stream       — /yasmine with the reply streamed over SSE
+  POST /qa/stream            — /qa with the reply streamed over SSE
+
+Long conversations are sent as a running summary plus the latest turns
+(agent/history.py); the stored history itself is never shortened.
+
+Sessions live in an SQLite database (see storage/sessions.py), fronted by an
+in-process LRU cache with write-behind (storage/cache.py). Idle sessions are
+expired in the background; finished ones go to compressed archive segments
+(storage/archive.py) and stay readable. Import a legacy
+chouchane_sessions.json with:  python -m storage.migrate chouchane_sessions.json
+
+Places, partners and quiz questions come from the compiled, memory-mapped
+catalog (catalog/store.py; python -m catalog.store build). SIGHUP reloads
+it and everything derived from it without a restart.
+
+Concurrent throughput against a stubbed Gemini:  python -m loadtest 400 0.5
 """
 
+import asyncio
 import json
+import logging
+import signal
 import uuid
-import re
-from pathlib import Path
+from contextlib import aclosing, asynccontextmanager
 from typing import Optional
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel
 
-from google import genai
 from google.genai import types
 
-from agent.conversation import TunisiaTourismAgent
-from config.settings import API_KEY, GEMINI_MODEL
+from agent.clients import close_clients, get_client
+from agent.conversation import TunisiaTourismAgent, recommendation_stats
+from agent.extractor import stats as extraction_stats
+from agent.greetings import GreetingPool
+from agent.local_extractor import stats as local_extraction_stats
+from agent.retriever import stats as retrieval_stats
+from agent.history import HistoryCompactor, window, with_summary
+from agent.history import stats as history_stats
+from agent.prompts import system_prompt
+from agent.qa_cache import QACache
+from agent.text import StreamCleaner, clean_text
+from catalog.geo import GeoIndex, catalog_points
+from catalog.listing import InvalidRequest, Payload, PlacesListing
+from catalog.partners import partners_directory
+from catalog.store import Catalog, current_catalog, on_reload, reload as reload_catalog
+from catalog.store import stats as catalog_stats
+from config.settings import (
+    API_KEY, GEMINI_MODEL, SESSIONS_DB_PATH, SESSION_LOCK_TIMEOUT, SESSION_COMPACT_AFTER,
+    SESSION_CACHE_SIZE, SESSION_CACHE_TTL, SESSION_FLUSH_INTERVAL,
+    SESSION_IDLE_TTL, SESSION_ARCHIVE_AFTER, SESSION_SWEEP_INTERVAL, SESSION_ARCHIVE_DIR,
+    GREETING_POOL_SIZE, GREETING_MAX_USES,
+    QA_CACHE_SIZE, QA_CACHE_TTL, QA_CACHE_SIMILARITY, QA_CACHE_BY_PLACE,
+    HISTORY_KEEP_MESSAGES, HISTORY_TOKEN_BUDGET, HISTORY_FOLD_LOCK_TIMEOUT,
+    PLACES_PAGE_LIMIT, PLACES_RESPONSE_CACHE_SIZE,
+)
 from config.content import WELCOMING
-from data.places_db import PLACES_DB
+from storage.archive import SessionArchive
+from storage.cache import CachedSessionStore
+from storage.expiry import SessionExpiry
+from storage.locks import SessionBusy, SessionLocks
+from storage.sessions import SessionStore, SQLiteSessionStore, VersionConflict
+
+log = logging.getLogger(__name__)
 
 # ─────────────────────────────────────────────────────────────────
 # CONFIG
 # ─────────────────────────────────────────────────────────────────
 
-SESSIONS_FILE = Path("chouchane_sessions.json")
-
 QA_SYSTEM_PROMPT = """
 You are a knowledgeable and enthusiastic Tunisia travel expert working within Chouchane,
 a Tunisia tourism AI experience.
@@ -58,34 +107,66 @@ Do not use markdown, asterisks, or emojis.
 """.strip()
 
 # ─────────────────────────────────────────────────────────────────
-# SESSION STORAGE  (JSON file)
+# SESSION STORAGE  (LRU cache → SQLite, one row per session)
 # ─────────────────────────────────────────────────────────────────
 
-def _load_sessions() -> dict:
-    if SESSIONS_FILE.exists():
-        return json.loads(SESSIONS_FILE.read_text(encoding="utf-8"))
-    return {}
+session_store: SessionStore = SQLiteSessionStore(SESSIONS_DB_PATH, compact_after=SESSION_COMPACT_AFTER)
+if SESSION_CACHE_SIZE > 0:
+    session_store = CachedSessionStore(
+        session_store,
+        max_size=SESSION_CACHE_SIZE,
+        ttl=SESSION_CACHE_TTL,
+        flush_interval=SESSION_FLUSH_INTERVAL,
+    )
+session_locks = SessionLocks(timeout=SESSION_LOCK_TIMEOUT)
+session_archive = SessionArchive(SESSION_ARCHIVE_DIR)
+session_expiry = SessionExpiry(
+    session_store, session_archive, session_locks,
+    idle_ttl=SESSION_IDLE_TTL,
+    archive_after=SESSION_ARCHIVE_AFTER,
+    sweep_interval=SESSION_SWEEP_INTERVAL,
+)
 
-def _save_sessions(sessions: dict):
-    SESSIONS_FILE.write_text(json.dumps(sessions, indent=2, ensure_ascii=False), encoding="utf-8")
+@asynccontextmanager
+async def _session_turn(session_id: str):
+    """Hold the session's lock for a whole load → LLM → persist cycle."""
+    try:
+        async with session_locks.ahold(session_id):
+            yield
+    except SessionBusy:
+        raise _session_busy(session_id) from None
+
+def _session_busy(session_id: str) -> HTTPException:
+    return HTTPException(
+        status_code=409,
+        detail=f"Session '{session_id}' is already handling a message. Retry once it completes.",
+    )
 
-def _get_session(session_id: str) -> dict:
-    sessions = _load_sessions()
-    if session_id not in sessions:
-        raise HTTPException(status_code=404, detail=f"Session '{session_id}' not found. Call /session/start first.")
-    return sessions[session_id]
+async def _get_session(session_id: str, restore: bool = True) -> dict:
+    """
+    Load a live session, falling back to the cold archive.
+    With restore=True an archived session is moved back into the live store.
+    """
+    session = await session_store.aget(session_id)
+    if session is None:
+        session = await asyncio.to_thread(session_archive.get, session_id)
+        if session is None:
+            raise HTTPException(status_code=404, detail=f"Session '{session_id}' not found. Call /session/start first.")
+        if restore:
+            await session_store.aput(session_id, session)
+    return session
 
-def _update_session(session_id: str, data: dict):
-    sessions = _load_sessions()
-    sessions[session_id] = data
-    _save_sessions(sessions)
+async def _update_session(session_id: str, data: dict):
+    """Persist data; fails with 409 if the session changed since data was loaded."""
+    try:
+        await session_store.aput(session_id, data, expected_version=data.get("version"))
+    except VersionConflict as e:
+        raise HTTPException(status_code=409, detail=str(e)) from None
 
-def _delete_session(session_id: str):
-    sessions = _load_sessions()
-    sessions.pop(session_id, None)
-    _save_sessions(sessions)
+async def _delete_session(session_id: str):
+    await session_store.adelete(session_id)
 
-def _new_session(session_id: str) -> dict:
+async def _new_session(session_id: str) -> dict:
     data = {
         "session_id": session_id,
         "workflow":   "chouchane",
@@ -100,11 +181,20 @@ def _new_session(session_id: str) -> dict:
         "yasmine_recommended_places":    [],
         "yasmine_chosen_place":          None,
         "yasmine_partners_shown":        False,
+        "yasmine_retrieval_query":       "",  # user text the recommendations were retrieved with
+        "yasmine_rag_context":           "",  # their rendered place profiles
+        "yasmine_ranking":               [],  # resuggestion cursor: ranked place names,
+        "yasmine_shown_places":          [],  # the ones recommended so far,
+        "yasmine_ranking_signature":     [],  # and the preferences they were ranked for
+        "yasmine_summary":               "",  # older turns, summarized
+        "yasmine_summarized_upto":       0,   # history index the summary covers
 
         # ── Phase 2: Q&A ──────────────────────────────────────────
         "qa_history":     [],
+        "qa_summary":     "",
+        "qa_summarized_upto": 0,
     }
-    _update_session(session_id, data)
+    await _update_session(session_id, data)
     return data
 
 # ─────────────────────────────────────────────────────────────────
@@ -115,10 +205,16 @@ def _normalize(text: str) -> str:
     return text.strip().lower().replace("'", "").replace("-", " ")
 
 def _clean_text(text: str) -> str:
-    text = text.replace("*", "")
-    text = re.sub(r"[\U0001F000-\U0001FFFF\U00002700-\U000027BF\U0001F900-\U0001F9FF\u2600-\u26FF]", "", text)
-    text = re.sub(r" {2,}", " ", text)
-    return text.strip()
+    return clean_text(text)
+
+def _sse(event: str, data: dict) -> str:
+    """Format one Server-Sent Event."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+def _sse_failure(session_id: str) -> str:
+    """The error event for a stream that broke after the response started (e.g. Gemini dropped it)."""
+    log.exception("Streaming reply for session %s failed", session_id)
+    return _sse("error", {"status_code": 502, "detail": "The reply could not be completed. Please send your message again."})
 
 def _history_to_contents(history: list) -> list:
     return [
@@ -126,6 +222,48 @@ def _history_to_contents(history: list) -> list:
         for h in history
     ]
 
+# Folds in progress, by (session_id, phase)
+_history_folds: dict[tuple[str, str], asyncio.Task] = {}
+
+def _fold_history(session: dict, phase: str):
+    """
+    Start folding old turns of session[f"{phase}_history"] into its running
+    summary. The fold runs alongside the reply and saves the new summary
+    itself once done, so no request waits for it.
+    """
+    key = (session["session_id"], phase)
+    if key in _history_folds:
+        return
+    history = list(session.get(f"{phase}_history", []))
+    summary = session.get(f"{phase}_summary", "")
+    upto = session.get(f"{phase}_summarized_upto", 0)
+    fold = history_compactor.start(history, summary, upto)
+    if fold is None:
+        return
+    task = _history_folds[key] = asyncio.create_task(_save_history_fold(key, fold, history, summary, upto))
+    task.add_done_callback(lambda _: _history_folds.pop(key, None))
+
+async def _save_history_fold(key: tuple[str, str], fold: asyncio.Task, history: list, summary: str, upto: int):
+    """Store a finished fold on the session, unless the conversation was reset or folded since."""
+    session_id, phase = key
+    folded = await fold
+    if folded is None:
+        return
+    new_summary, cut = folded
+    try:
+        async with session_locks.ahold(session_id, timeout=HISTORY_FOLD_LOCK_TIMEOUT):
+            session = await session_store.aget(session_id)
+            if (session is None
+                    or session.get(f"{phase}_summary", "") != summary
+                    or session.get(f"{phase}_summarized_upto", 0) != upto
+                    or session.get(f"{phase}_history", [])[:cut] != history[:cut]):
+                return
+            session[f"{phase}_summary"], session[f"{phase}_summarized_upto"] = new_summary, cut
+            await session_store.aput(session_id, session, expected_version=session["version"])
+    except (SessionBusy, VersionConflict):
+        # The next turn over the budget folds again
+        log.warning("Dropped the %s history summary of session %s", phase, session_id)
+
 def _active_phases(session: dict) -> list[str]:
     """Compute which phases are open — used in every response."""
     if not session["yasmine_done"]:
@@ -156,8 +294,31 @@ def _build_yasmine_agent(session: dict) -> TunisiaTourismAgent:
     agent.recommended_places    = session["yasmine_recommended_places"]
     agent.chosen_place          = session["yasmine_chosen_place"]
     agent._partners_shown       = session["yasmine_partners_shown"]
+    agent.retrieval_query       = session.get("yasmine_retrieval_query", "")
+    agent.rag_context           = session.get("yasmine_rag_context", "")
+    agent.ranking               = session.get("yasmine_ranking", [])
+    agent.shown_places          = session.get("yasmine_shown_places", [])
+    agent.ranking_signature     = session.get("yasmine_ranking_signature", [])
+    agent.summary               = session.get("yasmine_summary", "")
+    agent.summarized_upto       = session.get("yasmine_summarized_upto", 0)
     return agent
 
+async def _start_yasmine_agent() -> tuple[TunisiaTourismAgent, str]:
+    """New agent with its opening greeting — from the pool when one is ready."""
+    agent    = TunisiaTourismAgent(api_key=API_KEY)
+    greeting = greeting_pool.take()
+    if greeting is not None:
+        agent.start_with(greeting)
+    else:
+        greeting, _ = await agent.astart()
+    return agent, greeting
+
+async def _generate_greeting() -> str:
+    greeting, _ = await TunisiaTourismAgent(api_key=API_KEY).astart()
+    return greeting
+
+greeting_pool = GreetingPool(_generate_greeting, size=GREETING_POOL_SIZE, max_uses=GREETING_MAX_USES)
+
 def _persist_yasmine_agent(agent: TunisiaTourismAgent, session: dict) -> dict:
     session["yasmine_history"] = [
         {"role": c.role, "text": c.parts[0].text}
@@ -168,13 +329,64 @@ def _persist_yasmine_agent(agent: TunisiaTourismAgent, session: dict) -> dict:
     session["yasmine_recommended_places"]     = agent.recommended_places
     session["yasmine_chosen_place"]           = agent.chosen_place
     session["yasmine_partners_shown"]         = agent._partners_shown
+    session["yasmine_retrieval_query"]        = agent.retrieval_query
+    session["yasmine_rag_context"]            = agent.rag_context
+    session["yasmine_ranking"]                = agent.ranking
+    session["yasmine_shown_places"]           = agent.shown_places
+    session["yasmine_ranking_signature"]      = agent.ranking_signature
     return session
 
+# ─────────────────────────────────────────────────────────────────
+# CATALOG  (precomputed /places bodies, spatial index for /places/nearby;
+#          rebuilt when the catalog is reloaded — kill -HUP <pid>)
+# ─────────────────────────────────────────────────────────────────
+
+NEARBY_KINDS = {"place", "hotel", "restaurant"}
+
+def _load_catalog_views(catalog: Catalog):
+    listing = PlacesListing(catalog.places, memo_size=PLACES_RESPONSE_CACHE_SIZE)
+    geo = GeoIndex(catalog_points(catalog.places, catalog.partners))
+
+    def commit():
+        global places_listing, geo_index
+        places_listing, geo_index = listing, geo
+    return commit
+
+_load_catalog_views(current_catalog())()
+on_reload(_load_catalog_views)
+
+def _install_catalog_reload():
+    """Reload the catalog on SIGHUP, off the event loop."""
+    if not hasattr(signal, "SIGHUP"):
+        return
+    loop = asyncio.get_running_loop()
+    try:
+        loop.add_signal_handler(signal.SIGHUP, lambda: loop.run_in_executor(None, reload_catalog))
+    except (NotImplementedError, RuntimeError, ValueError):
+        pass  # not the main thread (e.g. under a test client)
+
 # ─────────────────────────────────────────────────────────────────
 # FASTAPI APP
 # ─────────────────────────────────────────────────────────────────
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    system_prompt()  # load prompt assets before the first request
+    _install_catalog_reload()
+    session_expiry.start()
+    greeting_pool.start()
+    yield
+    await greeting_pool.stop()
+    for task in list(_history_folds.values()):
+        task.cancel()
+    session_expiry.stop()
+    # Flush write-behind sessions before the process exits
+    session_store.close()
+    await close_clients()
+
+
 app = FastAPI(
+    lifespan=lifespan,
     title="Chouchane API",
     description=(
         "Chouchane — Tunisia Tourism AI Workflow\n\n"
@@ -192,7 +404,12 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-gemini_client = genai.Client(api_key=API_KEY)
+gemini_client = get_client(API_KEY)
+history_compactor = HistoryCompactor(
+    gemini_client, GEMINI_MODEL,
+    keep_last=HISTORY_KEEP_MESSAGES,
+    token_budget=HISTORY_TOKEN_BUDGET,
+)
 
 # ─────────────────────────────────────────────────────────────────
 # REQUEST / RESPONSE MODELS
@@ -202,6 +419,9 @@ class MessageRequest(BaseModel):
     session_id: str
     message:    str
 
+# Keep proxies from buffering the event stream
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
 class ChouchaneResponse(BaseModel):
     session_id:      str
     workflow:        str        = "chouchane"
@@ -217,47 +437,131 @@ class ChouchaneResponse(BaseModel):
 # ─────────────────────────────────────────────────────────────────
 
 @app.get("/health")
-def health():
+async def health():
     return {"status": "ok", "workflow": "chouchane"}
 
 
+@app.get("/metrics")
+async def metrics():
+    """Runtime counters for scraping (session cache hit/miss/eviction, ...)."""
+    data = {}
+    if isinstance(session_store, CachedSessionStore):
+        data["session_cache"] = session_store.stats()
+    data["session_expiry"] = session_expiry.stats()
+    data["greeting_pool"] = greeting_pool.stats()
+    data["qa_cache"] = qa_cache.stats()
+    data["history"] = history_stats()
+    data["extraction"] = extraction_stats() | {"local": local_extraction_stats()}
+    data["recommendations"] = recommendation_stats()
+    data["retrieval_cache"] = retrieval_stats()
+    data["catalog"] = catalog_stats()
+    return data
+
+
 @app.get("/places")
-def get_places():
+async def get_places(
+    request: Request,
+    fields: Optional[str] = Query(None, description="comma-separated subset, e.g. name,region,lat,lon"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    limit: Optional[int] = Query(None, ge=1, le=PLACES_PAGE_LIMIT),
+):
     """
     Return all places from the RAG database for the frontend.
     Each place includes name, region, description, and metadata.
+
+    Bodies are serialized once and memoized (catalog/listing.py): clients
+    revalidate with If-None-Match and get 304 while the catalog is unchanged.
+    With limit, the response also carries next_cursor (null on the last page).
+    """
+    try:
+        payload = places_listing.page(fields, cursor, limit)
+    except InvalidRequest as e:
+        raise HTTPException(status_code=422, detail=str(e)) from None
+    return _payload_response(request, payload)
+
+
+def _payload_response(request: Request, payload: Payload) -> Response:
+    """A precomputed body, compressed as the client accepts, or 304 if its ETag still matches."""
+    encoding = payload.choose_encoding(request.headers.get("accept-encoding"))
+    headers = {"ETag": payload.etag_for(encoding), "Vary": "Accept-Encoding", "Cache-Control": "no-cache"}
+    if payload.matches(request.headers.get("if-none-match")):
+        return Response(status_code=304, headers=headers)
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return Response(payload.encoded(encoding), media_type="application/json", headers=headers)
+
+
+@app.get("/places/nearby")
+async def places_nearby(
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180),
+    radius: float = Query(25.0, gt=0, le=2000, description="km"),
+    k: int = Query(10, ge=1, le=100),
+    kind: Optional[str] = Query(None, description="place, hotel or restaurant (comma-separated)"),
+):
+    """Catalog entries within radius km of (lat, lon), nearest first."""
+    kinds = None
+    if kind:
+        kinds = {value.strip() for value in kind.split(",") if value.strip()}
+        unknown = kinds - NEARBY_KINDS
+        if unknown:
+            raise HTTPException(status_code=422, detail=f"Unknown kind(s): {', '.join(sorted(unknown))}")
+    results = geo_index.nearby(lat, lon, radius, k, kinds)
+    return {
+        "results": [
+            {
+                "kind":        point.kind,
+                "name":        point.name,
+                "place":       point.place,
+                "lat":         point.lat,
+                "lon":         point.lon,
+                "distance_km": round(distance, 3),
+            }
+            for point, distance in results
+        ]
+    }
+
+
+@app.get("/places/{name:path}/partners")
+async def place_partners(
+    request: Request,
+    name: str,
+    kind: Optional[str] = Query(None, description="hotel or restaurant (comma-separated)"),
+    price_range: Optional[str] = Query(None, description="e.g. $$ or $,$$"),
+    type_: Optional[str] = Query(None, alias="type", description="hotel type, e.g. Boutique Riad (comma-separated)"),
+    cuisine: Optional[str] = Query(None, description="restaurant cuisine (comma-separated)"),
+    sort: Optional[str] = Query(None, description="name, price_range, type or cuisine; prefix - for descending"),
+    limit: Optional[int] = Query(None, ge=1, description="at most this many hotels and restaurants each"),
+):
     """
-    places = []
-    for name, data in PLACES_DB.items():
-        place = {
-            "name":           name,
-            "region":         data.get("region", ""),
-            "vibe":           data.get("vibe", ""),
-            "description":    data.get("description", ""),
-            "top_activities": data.get("top_activities", []),
-            "insider_tip":    data.get("insider_tip", ""),
-            "season":         data.get("season", ""),
-        }
-        places.append(place)
-    return {"places": places}
+    A place's partner hotels and restaurants as JSON. Filters use the
+    inverted indexes built at catalog load and bodies are pre-rendered
+    (catalog/partners.py), so this stays fast with thousands of partners.
+    """
+    try:
+        payload = partners_directory().query(name, kind, price_range, type_, cuisine, sort, limit)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown place: {name!r}") from None
+    except InvalidRequest as e:
+        raise HTTPException(status_code=422, detail=str(e)) from None
+    return _payload_response(request, payload)
 
 
 @app.post("/session/start", response_model=ChouchaneResponse)
-def session_start():
+async def session_start():
     """
     Start a new Chouchane session.
     Returns the WELCOMING message + Yasmine's opening greeting.
     active_phases = ["yasmine"]
     """
     session_id = str(uuid.uuid4())
-    session    = _new_session(session_id)
+    session    = await _new_session(session_id)
 
-    agent = TunisiaTourismAgent(api_key=API_KEY)
-    yasmine_greeting, _ = agent.start()
+    agent, yasmine_greeting = await _start_yasmine_agent()
     reply = f"{WELCOMING}\n\n{_clean_text(yasmine_greeting)}"
 
     session = _persist_yasmine_agent(agent, session)
-    _update_session(session_id, session)
+    await _update_session(session_id, session)
 
     return ChouchaneResponse(
         session_id=session_id,
@@ -268,20 +572,20 @@ def session_start():
 
 
 @app.post("/session/reset", response_model=ChouchaneResponse)
-def session_reset(body: MessageRequest):
+async def session_reset(body: MessageRequest):
     """
     Reset a Chouchane session back to Phase 1 (Yasmine).
     active_phases = ["yasmine"]
     """
-    _delete_session(body.session_id)
-    session = _new_session(body.session_id)
+    async with _session_turn(body.session_id):
+        await _delete_session(body.session_id)
+        session = await _new_session(body.session_id)
 
-    agent = TunisiaTourismAgent(api_key=API_KEY)
-    yasmine_greeting, _ = agent.start()
-    reply = f"{WELCOMING}\n\n{_clean_text(yasmine_greeting)}"
+        agent, yasmine_greeting = await _start_yasmine_agent()
+        reply = f"{WELCOMING}\n\n{_clean_text(yasmine_greeting)}"
 
-    session = _persist_yasmine_agent(agent, session)
-    _update_session(body.session_id, session)
+        session = _persist_yasmine_agent(agent, session)
+        await _update_session(body.session_id, session)
 
     return ChouchaneResponse(
         session_id=body.session_id,
@@ -292,9 +596,9 @@ def session_reset(body: MessageRequest):
 
 
 @app.get("/session/{session_id}")
-def session_inspect(session_id: str):
-    """Inspect the full state of a Chouchane session (debug)."""
-    session = _get_session(session_id)
+async def session_inspect(session_id: str):
+    """Inspect the full state of a Chouchane session (debug). Archived sessions are read in place."""
+    session = await _get_session(session_id, restore=False)
     # Mirror the shape expected by the frontend (adds a synthetic `phase` field).
     return {
         **session,
@@ -304,34 +608,16 @@ def session_inspect(session_id: str):
 
 # ── Phase 1: Yasmine ─────────────────────────────────────────────
 
-@app.post("/yasmine", response_model=ChouchaneResponse)
-def yasmine_chat(body: MessageRequest):
-    """
-    Phase 1 — Chat with Yasmine.
-    When a place is chosen, yasmine_done flips to True and
-    active_phases becomes ["qa"].
-    """
-    session = _get_session(body.session_id)
-
+def _require_yasmine_open(session: dict):
     if session["yasmine_done"]:
         raise HTTPException(
             status_code=400,
             detail="Yasmine phase is complete. Use /qa for questions about Tunisia."
         )
 
-    agent           = _build_yasmine_agent(session)
-    reply, partners = agent.chat(body.message)
-    reply           = _clean_text(reply)
-    session         = _persist_yasmine_agent(agent, session)
-
-    # Place chosen → unlock QA
-    if partners:
-        session["yasmine_done"] = True
-
-    _update_session(body.session_id, session)
-
+def _yasmine_response(session: dict, reply: str, partners: Optional[str]) -> ChouchaneResponse:
     return ChouchaneResponse(
-        session_id=body.session_id,
+        session_id=session["session_id"],
         phase=_primary_phase(session),
         active_phases=_active_phases(session),
         reply=reply,
@@ -339,43 +625,188 @@ def yasmine_chat(body: MessageRequest):
         chosen_place=session["yasmine_chosen_place"],
     )
 
+async def _finish_yasmine_turn(agent: TunisiaTourismAgent, session: dict, partners: Optional[str]) -> dict:
+    session = _persist_yasmine_agent(agent, session)
 
-# ── Phase 2: Tunisia Q&A ─────────────────────────────────────────
+    # Place chosen → unlock QA
+    if partners:
+        session["yasmine_done"] = True
 
-@app.post("/qa", response_model=ChouchaneResponse)
-def qa_chat(body: MessageRequest):
+    await _update_session(session["session_id"], session)
+    return session
+
+
+@app.post("/yasmine", response_model=ChouchaneResponse)
+async def yasmine_chat(body: MessageRequest):
     """
-    Tunisia Q&A — open as soon as Yasmine ends.
-    Ask anything about Tunisia. Multi-turn context is preserved.
+    Phase 1 — Chat with Yasmine.
+    When a place is chosen, yasmine_done flips to True and
+    active_phases becomes ["qa"].
+    """
+    async with _session_turn(body.session_id):
+        session = await _get_session(body.session_id)
+        _require_yasmine_open(session)
+
+        agent = _build_yasmine_agent(session)
+        _fold_history(session, "yasmine")
+        reply, partners = await agent.achat(body.message)
+        reply   = _clean_text(reply)
+        session = await _finish_yasmine_turn(agent, session, partners)
+
+    return _yasmine_response(session, reply, partners)
+
+
+@app.post("/yasmine/stream")
+async def yasmine_chat_stream(body: MessageRequest):
+    """
+    Phase 1 — Chat with Yasmine, streamed as Server-Sent Events:
+      event: token  data: {"text": "..."}      (repeated, cleaned reply text)
+      event: done   data: <ChouchaneResponse>  (full reply, partners, chosen_place)
+      event: error  data: {"status_code", "detail"}
+    The session is persisted once the reply is complete.
     """
-    session = _get_session(body.session_id)
+    # Fail fast with a plain 4xx before the stream starts. An archived session
+    # is only read here; it is restored under the lock inside events().
+    session = await _get_session(body.session_id, restore=False)
+    _require_yasmine_open(session)
+    if session_locks.busy(body.session_id):
+        raise _session_busy(body.session_id)
+
+    async def events():
+        try:
+            async with _session_turn(body.session_id):
+                session = await _get_session(body.session_id)
+                _require_yasmine_open(session)
+
+                agent = _build_yasmine_agent(session)
+                _fold_history(session, "yasmine")
+                async with aclosing(agent.astream_chat(body.message)) as stream:
+                    async for kind, payload in stream:
+                        if kind == "delta":
+                            yield _sse("token", {"text": payload})
+                        else:
+                            reply, partners = payload
+                session = await _finish_yasmine_turn(agent, session, partners)
+
+            yield _sse("done", _yasmine_response(session, reply, partners).model_dump())
+        except HTTPException as e:
+            yield _sse("error", {"status_code": e.status_code, "detail": e.detail})
+        except Exception:
+            # The session lock and the Gemini stream were released on the way out
+            yield _sse_failure(body.session_id)
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+# ── Phase 2: Tunisia Q&A ─────────────────────────────────────────
 
+def _require_qa_open(session: dict):
     if not session["yasmine_done"]:
         raise HTTPException(
             status_code=400,
             detail="Complete the Yasmine phase first — Q&A opens once you pick a destination."
         )
 
-    qa_history = session.get("qa_history", [])
-    contents   = _history_to_contents(qa_history)
-    contents.append(types.Content(role="user", parts=[types.Part(text=body.message)]))
+qa_cache = QACache(
+    max_size=QA_CACHE_SIZE,
+    ttl=QA_CACHE_TTL,
+    similarity=QA_CACHE_SIMILARITY,
+    by_place=QA_CACHE_BY_PLACE,
+)
 
-    response = gemini_client.models.generate_content(
+def _qa_cached(session: dict, message: str) -> tuple[bool, Optional[str]]:
+    """
+    (cacheable, reply) for a Q&A message. Only first questions and
+    self-contained follow-ups may be answered from / stored in the cache.
+    """
+    if not qa_cache.cacheable(message, session.get("qa_history", [])):
+        return False, None
+    return True, qa_cache.get(message, session.get("yasmine_chosen_place"))
+
+def _qa_request(session: dict, message: str) -> dict:
+    """Keyword arguments for the Q&A generate_content call."""
+    summary  = session.get("qa_summary", "")
+    history  = session.get("qa_history", []) + [{"role": "user", "text": message}]
+    contents = _history_to_contents(window(history, summary, session.get("qa_summarized_upto", 0)))
+    return dict(
         model=GEMINI_MODEL,
         contents=contents,
-        config=types.GenerateContentConfig(system_instruction=QA_SYSTEM_PROMPT),
+        config=types.GenerateContentConfig(system_instruction=with_summary(QA_SYSTEM_PROMPT, summary)),
     )
-    reply = _clean_text(response.text)
 
-    session["qa_history"] = qa_history + [
-        {"role": "user",  "text": body.message},
+async def _finish_qa_turn(session: dict, message: str, reply: str) -> ChouchaneResponse:
+    session["qa_history"] = session.get("qa_history", []) + [
+        {"role": "user",  "text": message},
         {"role": "model", "text": reply},
     ]
-    _update_session(body.session_id, session)
+    await _update_session(session["session_id"], session)
 
     return ChouchaneResponse(
-        session_id=body.session_id,
+        session_id=session["session_id"],
         phase=_primary_phase(session),
         active_phases=_active_phases(session),
         reply=reply,
-    )
\ No newline at end of file
+    )
+
+
+@app.post("/qa", response_model=ChouchaneResponse)
+async def qa_chat(body: MessageRequest):
+    """
+    Tunisia Q&A — open as soon as Yasmine ends.
+    Ask anything about Tunisia. Multi-turn context is preserved.
+    """
+    async with _session_turn(body.session_id):
+        session = await _get_session(body.session_id)
+        _require_qa_open(session)
+
+        cacheable, reply = _qa_cached(session, body.message)
+        if reply is None:
+            _fold_history(session, "qa")
+            response = await gemini_client.aio.models.generate_content(**_qa_request(session, body.message))
+            reply = _clean_text(response.text)
+            if cacheable and reply:
+                qa_cache.put(body.message, reply, session.get("yasmine_chosen_place"))
+        return await _finish_qa_turn(session, body.message, reply)
+
+
+@app.post("/qa/stream")
+async def qa_chat_stream(body: MessageRequest):
+    """Tunisia Q&A streamed as Server-Sent Events (same events as /yasmine/stream)."""
+    session = await _get_session(body.session_id, restore=False)
+    _require_qa_open(session)
+    if session_locks.busy(body.session_id):
+        raise _session_busy(body.session_id)
+
+    async def events():
+        try:
+            async with _session_turn(body.session_id):
+                session = await _get_session(body.session_id)
+                _require_qa_open(session)
+
+                cacheable, reply = _qa_cached(session, body.message)
+                if reply is not None:
+                    yield _sse("token", {"text": reply})
+                else:
+                    cleaner = StreamCleaner()
+                    parts = []
+                    _fold_history(session, "qa")
+                    stream = await gemini_client.aio.models.generate_content_stream(**_qa_request(session, body.message))
+                    async with aclosing(stream):
+                        async for chunk in stream:
+                            delta = cleaner.feed(chunk.text or "")
+                            if delta:
+                                parts.append(delta)
+                                yield _sse("token", {"text": delta})
+                    reply = "".join(parts)
+                    if cacheable and reply:
+                        qa_cache.put(body.message, reply, session.get("yasmine_chosen_place"))
+                response = await _finish_qa_turn(session, body.message, reply)
+
+            yield _sse("done", response.model_dump())
+        except HTTPException as e:
+            yield _sse("error", {"status_code": e.status_code, "detail": e.detail})
+        except Exception:
+            # The session lock and the Gemini stream were released on the way out
+            yield _sse_failure(body.session_id)
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
@@ -0,0 +1,307 @@
+"""
+Compiled, memory-mapped catalog format.
+
+The catalog (places, partners, quiz) is JSON-shaped data. compile_catalog()
+flattens it into a few arrays so a worker can mmap the file instead of
+importing dict literals; every worker maps the same pages.
+
+Layout (little-endian, sections 8-byte aligned):
+
+    header        magic, version, section counts and offsets, fingerprint
+    str_offsets   uint32[n_strings + 1]   byte ranges into str_blob
+    str_blob      utf-8 bytes of every distinct string, stored once
+    tags          uint8[n_nodes]          NULL, FALSE, TRUE, INT, FLOAT, STR, LIST, DICT
+    node_a        uint32[n_nodes]         STR: string id · INT/FLOAT: numbers index · LIST/DICT: start in children
+    node_b        uint32[n_nodes]         LIST/DICT: length
+    children      uint32[n_children]      LIST: node ids · DICT: key ids, value ids, hash slots
+    numbers       float64[n_numbers]
+
+A DICT of n entries owns 2n + _slots(n) children: its keys (string ids,
+in source order), its values (node ids) and an open-addressing hash table
+(crc32 of the key's utf-8, linear probing; slot = position + 1, 0 empty) —
+the prebuilt index that finds a key with one string comparison, without
+building a Python dict.
+
+MappedDict / MappedList are read-only Mapping / Sequence views that
+decode on access; plain() materializes a view as dicts and lists.
+"""
+
+import hashlib
+import json
+import mmap
+import struct
+import sys
+import zlib
+from collections.abc import Mapping, Sequence
+
+import numpy as np
+
+MAGIC = b"CHCATLG\x00"
+FORMAT_VERSION = 1
+
+NULL, FALSE, TRUE, INT, FLOAT, STR, LIST, DICT = range(8)
+
+# magic, version, n_strings, n_nodes, n_children, n_numbers, root, fingerprint, 6 section offsets
+_HEADER = struct.Struct("<8sIIIIII16s6Q")
+
+
+def _slots(size: int) -> int:
+    """Hash table size for a dict of size keys: a power of two, at most half full."""
+    return 1 << (2 * size - 1).bit_length() if size else 0
+
+
+class CatalogFormatError(ValueError):
+    """The file is not a compiled catalog this code can read."""
+
+
+def fingerprint(content: dict) -> str:
+    """Hash of the canonical JSON of content; the same for compiled and module catalogs."""
+    encoded = json.dumps(content, sort_keys=True, ensure_ascii=False, default=plain)
+    return hashlib.blake2b(encoded.encode(), digest_size=16).hexdigest()
+
+
+def plain(value):
+    """A view (or anything JSON-shaped) as plain dicts and lists."""
+    if isinstance(value, Mapping):
+        return {key: plain(item) for key, item in value.items()}
+    if isinstance(value, Sequence) and not isinstance(value, (str, bytes)):
+        return [plain(item) for item in value]
+    return value
+
+
+# ── Writer ───────────────────────────────────────────────────────────────────
+
+class _Builder:
+    def __init__(self):
+        self.strings: dict[str, int] = {}
+        self.tags: list[int] = []
+        self.a: list[int] = []
+        self.b: list[int] = []
+        self.children: list[int] = []
+        self.numbers: list[float] = []
+
+    def string(self, text: str) -> int:
+        sid = self.strings.get(text)
+        if sid is None:
+            sid = self.strings[text] = len(self.strings)
+        return sid
+
+    def node(self, tag: int, a: int = 0, b: int = 0) -> int:
+        self.tags.append(tag)
+        self.a.append(a)
+        self.b.append(b)
+        return len(self.tags) - 1
+
+    def add(self, value) -> int:
+        if value is None:
+            return self.node(NULL)
+        if value is True or value is False:
+            return self.node(TRUE if value else FALSE)
+        if isinstance(value, int):
+            self.numbers.append(float(value))
+            return self.node(INT, len(self.numbers) - 1)
+        if isinstance(value, float):
+            self.numbers.append(value)
+            return self.node(FLOAT, len(self.numbers) - 1)
+        if isinstance(value, str):
+            return self.node(STR, self.string(value))
+        if isinstance(value, Mapping):
+            keys = [str(key) for key in value]
+            values = [self.add(item) for item in value.values()]
+            slots = [0] * _slots(len(keys))
+            for position, key in enumerate(keys):
+                h = zlib.crc32(key.encode()) & (len(slots) - 1)
+                while slots[h]:
+                    h = (h + 1) & (len(slots) - 1)
+                slots[h] = position + 1
+            start = len(self.children)
+            self.children += [self.string(key) for key in keys] + values + slots
+            return self.node(DICT, start, len(keys))
+        if isinstance(value, (list, tuple)):
+            items = [self.add(item) for item in value]
+            start = len(self.children)
+            self.children += items
+            return self.node(LIST, start, len(items))
+        raise TypeError(f"Cannot compile {type(value).__name__} into a catalog")
+
+
+def _pad(buffer: bytearray):
+    buffer += b"\x00" * (-len(buffer) % 8)
+
+
+def compile_catalog(content: dict) -> bytes:
+    """The compiled form of content (a JSON-shaped dict, e.g. {"places": ..., "partners": ..., "quiz": ...})."""
+    builder = _Builder()
+    root = builder.add(content)
+
+    blobs = [text.encode() for text in builder.strings]
+    offsets = np.zeros(len(blobs) + 1, dtype="<u4")
+    np.cumsum([len(blob) for blob in blobs], out=offsets[1:])
+    sections = [
+        offsets.tobytes(),
+        b"".join(blobs),
+        np.array(builder.tags, dtype="u1").tobytes(),
+        np.array(builder.a, dtype="<u4").tobytes() + np.array(builder.b, dtype="<u4").tobytes(),
+        np.array(builder.children, dtype="<u4").tobytes(),
+        np.array(builder.numbers, dtype="<f8").tobytes(),
+    ]
+
+    body = bytearray()
+    positions = []
+    for section in sections:
+        _pad(body)
+        positions.append(_HEADER.size + len(body))
+        body += section
+    header = _HEADER.pack(
+        MAGIC, FORMAT_VERSION, len(blobs), len(builder.tags), len(builder.children), len(builder.numbers),
+        root, bytes.fromhex(fingerprint(content)), *positions,
+    )
+    return header + bytes(body)
+
+
+def write_catalog(path, content: dict) -> int:
+    """Compile content into path atomically (write + rename); returns the size in bytes."""
+    import os
+    import pathlib
+
+    path = pathlib.Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = compile_catalog(content)
+    temporary = path.with_name(path.name + ".tmp")
+    temporary.write_bytes(data)
+    os.replace(temporary, path)
+    return len(data)
+
+
+# ── Reader ───────────────────────────────────────────────────────────────────
+
+class CompiledCatalog:
+    """
+    A memory-mapped compiled catalog; root is a MappedDict. The file is
+    unmapped once the catalog and every view into it are garbage.
+    """
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        buffer = self._mmap
+        if len(buffer) < _HEADER.size:
+            raise CatalogFormatError(f"{path}: too short for a catalog")
+        (magic, version, n_strings, n_nodes, n_children, n_numbers, root, digest,
+         o_offsets, o_blob, o_tags, o_nodes, o_children, o_numbers) = _HEADER.unpack_from(buffer)
+        if magic != MAGIC or version != FORMAT_VERSION or sys.byteorder != "little":
+            raise CatalogFormatError(f"{path}: not a version {FORMAT_VERSION} catalog")
+        self.path = path
+        self.fingerprint = digest.hex()
+        # Zero-copy views into the mapping (memoryviews index to plain ints, unlike NumPy scalars)
+        view = memoryview(buffer)
+        self._blob = view[o_blob:o_tags]
+        self._offsets = view[o_offsets:o_offsets + 4 * (n_strings + 1)].cast("I")
+        self._tags = view[o_tags:o_tags + n_nodes]
+        self._a = view[o_nodes:o_nodes + 4 * n_nodes].cast("I")
+        self._b = view[o_nodes + 4 * n_nodes:o_nodes + 8 * n_nodes].cast("I")
+        self._children = view[o_children:o_children + 4 * n_children].cast("I")
+        self._numbers = view[o_numbers:o_numbers + 8 * n_numbers].cast("d")
+        self.root = self.value(root)
+
+    def equals(self, sid: int, data: bytes) -> bool:
+        """Whether string sid is data (utf-8), without decoding it."""
+        start, end = self._offsets[sid], self._offsets[sid + 1]
+        return end - start == len(data) and self._blob[start:end] == data
+
+    def string(self, sid: int) -> str:
+        return str(self._blob[self._offsets[sid]:self._offsets[sid + 1]], "utf-8")
+
+    def value(self, node: int):
+        tag = self._tags[node]
+        if tag == STR:
+            return self.string(self._a[node])
+        if tag == DICT:
+            return MappedDict(self, self._a[node], self._b[node])
+        if tag == LIST:
+            return MappedList(self, self._a[node], self._b[node])
+        if tag == INT:
+            return int(self._numbers[self._a[node]])
+        if tag == FLOAT:
+            return self._numbers[self._a[node]]
+        return None if tag == NULL else tag == TRUE
+
+
+class MappedDict(Mapping):
+    __slots__ = ("_catalog", "_start", "_size")
+
+    def __init__(self, catalog: CompiledCatalog, start: int, size: int):
+        self._catalog = catalog
+        self._start = start
+        self._size = size
+
+    def _key(self, i: int) -> str:
+        return self._catalog.string(self._catalog._children[self._start + i])
+
+    def _position(self, key) -> int:
+        """Source position of key via the dict's hash slots, or -1."""
+        if not isinstance(key, str) or not self._size:
+            return -1
+        catalog, start, n = self._catalog, self._start, self._size
+        children, mask = catalog._children, _slots(n) - 1
+        target = key.encode()
+        h = zlib.crc32(target) & mask
+        while slot := children[start + 2 * n + h]:
+            if catalog.equals(children[start + slot - 1], target):
+                return slot - 1
+            h = (h + 1) & mask
+        return -1
+
+    def __getitem__(self, key):
+        i = self._position(key)
+        if i < 0:
+            raise KeyError(key)
+        return self._catalog.value(self._catalog._children[self._start + self._size + i])
+
+    def __contains__(self, key) -> bool:
+        return self._position(key) >= 0
+
+    def __iter__(self):
+        return (self._key(i) for i in range(self._size))
+
+    def __len__(self) -> int:
+        return self._size
+
+    def items(self):
+        children, n, start = self._catalog._children, self._size, self._start
+        return [(self._key(i), self._catalog.value(children[start + n + i])) for i in range(n)]
+
+    def values(self):
+        return [value for _, value in self.items()]
+
+    def __repr__(self) -> str:
+        return f"MappedDict({len(self)} keys)"
+
+
+class MappedList(Sequence):
+    __slots__ = ("_catalog", "_start", "_size")
+
+    def __init__(self, catalog: CompiledCatalog, start: int, size: int):
+        self._catalog = catalog
+        self._start = start
+        self._size = size
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._size))]
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError(index)
+        return self._catalog.value(self._catalog._children[self._start + index])
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (list, tuple, MappedList)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"MappedList({len(self)} items)"
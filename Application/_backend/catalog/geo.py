@@ -0,0 +1,159 @@
+"""
+Spatial index over everything in the catalog that has coordinates.
+
+Points (places, partner hotels and restaurants) are bucketed into a grid
+of cell_deg × cell_deg cells. The cell codes are sorted once, so every
+grid row's cells form one contiguous run of the point arrays: a radius
+query is one searchsorted per grid row covering the radius' bounding
+box, then a vectorized haversine over those candidates and an
+argpartition for the k nearest.
+
+Longitudes do not wrap at the antimeridian — the catalog is Tunisia.
+
+Benchmark on synthetic catalogs spread over Tunisia:
+    python -m catalog.geo 100000
+"""
+
+import math
+from collections.abc import Mapping
+from typing import NamedTuple
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+DEFAULT_CELL_DEG = 0.05   # ≈ 5.5 km north-south
+
+
+class Point(NamedTuple):
+    kind: str    # "place", "hotel" or "restaurant"
+    name: str
+    place: str   # the destination it belongs to (its own name for places)
+    lat: float
+    lon: float
+
+
+def catalog_points(places: Mapping, partners: Mapping) -> list[Point]:
+    points = [Point("place", name, name, p["lat"], p["lon"]) for name, p in places.items() if "lat" in p]
+    for place, groups in partners.items():
+        for group, kind in (("hotels", "hotel"), ("restaurants", "restaurant")):
+            points += [Point(kind, e["name"], place, e["lat"], e["lon"]) for e in groups.get(group, []) if "lat" in e]
+    return points
+
+
+def haversine_km(lat: float, lon: float, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """Great-circle distance from (lat, lon) to every (lats, lons), all in degrees."""
+    lat, lon = math.radians(lat), math.radians(lon)
+    lats, lons = np.radians(lats), np.radians(lons)
+    a = np.sin((lats - lat) / 2) ** 2 + math.cos(lat) * np.cos(lats) * np.sin((lons - lon) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+class GeoIndex:
+    def __init__(self, points: list[Point], cell_deg: float = DEFAULT_CELL_DEG):
+        self.cell_deg = cell_deg
+        self.columns = math.ceil(360 / cell_deg)
+        lats = np.array([p.lat for p in points], dtype=np.float64)
+        lons = np.array([p.lon for p in points], dtype=np.float64)
+        codes = self._rows(lats) * self.columns + self._columns(lons)
+        order = np.argsort(codes, kind="stable")
+        # Everything in cell order; contiguous runs per grid row
+        self.points = [points[i] for i in order.tolist()]
+        self.lats, self.lons, self.codes = lats[order], lons[order], codes[order]
+        self.kinds = np.array([p.kind for p in self.points])
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+    def _rows(self, lats):
+        return np.floor((np.asarray(lats) + 90) / self.cell_deg).astype(np.int64)
+
+    def _columns(self, lons):
+        return np.floor((np.asarray(lons) + 180) / self.cell_deg).astype(np.int64)
+
+    def candidates(self, lat: float, lon: float, radius_km: float) -> np.ndarray:
+        """Indices of the points in the cells of radius_km's bounding box around (lat, lon)."""
+        dlat = radius_km / KM_PER_DEGREE
+        # Widest longitude span at the box's edge closest to a pole
+        edge = min(abs(lat) + dlat, 89.9)
+        dlon = min(dlat / math.cos(math.radians(edge)), 180.0)
+        rows = np.arange(int(self._rows(lat - dlat)), int(self._rows(lat + dlat)) + 1)
+        first, last = int(self._columns(max(lon - dlon, -180.0))), int(self._columns(min(lon + dlon, 179.999999)))
+        starts = np.searchsorted(self.codes, rows * self.columns + first, side="left")
+        ends = np.searchsorted(self.codes, rows * self.columns + last, side="right")
+        lengths = ends - starts
+        total = int(lengths.sum())
+        if total == 0:
+            return np.empty(0, dtype=np.int64)
+        # Concatenate the runs [start, end) without a Python loop
+        offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+        return offsets + np.arange(total)
+
+    def nearby(self, lat: float, lon: float, radius_km: float, k: int, kinds: set[str] | None = None
+               ) -> list[tuple[Point, float]]:
+        """Up to k points within radius_km of (lat, lon), nearest first, with their distance in km."""
+        if k <= 0:
+            return []
+        found = self.candidates(lat, lon, radius_km)
+        if kinds is not None:
+            found = found[np.isin(self.kinds[found], list(kinds))]
+        distances = haversine_km(lat, lon, self.lats[found], self.lons[found])
+        inside = distances <= radius_km
+        found, distances = found[inside], distances[inside]
+        if k < len(found):
+            best = np.argpartition(distances, k - 1)[:k]
+            found, distances = found[best], distances[best]
+        order = np.lexsort((found, distances))
+        return [(self.points[i], float(d)) for i, d in zip(found[order].tolist(), distances[order].tolist())]
+
+
+# ── Benchmark ────────────────────────────────────────────────────────────────
+
+# Rough bounding box of Tunisia
+_LAT_RANGE = (30.2, 37.5)
+_LON_RANGE = (7.5, 11.6)
+
+
+def _synthetic_points(size: int, seed: int = 5) -> list[Point]:
+    rng = np.random.default_rng(seed)
+    lats = rng.uniform(*_LAT_RANGE, size)
+    lons = rng.uniform(*_LON_RANGE, size)
+    kinds = rng.choice(["place", "hotel", "restaurant"], size)
+    return [Point(str(kind), f"poi-{i}", f"poi-{i}", float(la), float(lo))
+            for i, (kind, la, lo) in enumerate(zip(kinds, lats, lons))]
+
+
+def benchmark(sizes: list[int], queries: int = 200, k: int = 10, radii: tuple = (5, 25, 100)):
+    import time
+
+    rng = np.random.default_rng(9)
+    centers = list(zip(rng.uniform(*_LAT_RANGE, queries).tolist(), rng.uniform(*_LON_RANGE, queries).tolist()))
+    for size in sizes:
+        points = _synthetic_points(size)
+        start = time.perf_counter()
+        index = GeoIndex(points)
+        build_ms = (time.perf_counter() - start) * 1000
+        lats = np.array([p.lat for p in points])
+        lons = np.array([p.lon for p in points])
+        print(f"{size:>8} points: build {build_ms:7.1f} ms")
+        for radius in radii:
+            start = time.perf_counter()
+            results = [index.nearby(lat, lon, radius, k) for lat, lon in centers]
+            index_us = (time.perf_counter() - start) * 1e6 / queries
+
+            start = time.perf_counter()
+            identical = 0
+            for (lat, lon), got in zip(centers, results):
+                # Brute force: every point, stable sort by distance
+                distances = haversine_km(lat, lon, lats, lons)
+                order = [i for i in np.argsort(distances, kind="stable")[:k].tolist() if distances[i] <= radius]
+                identical += [points[i].name for i in order] == [p.name for p, _ in got]
+            scan_us = (time.perf_counter() - start) * 1e6 / queries
+            print(f"    radius {radius:>4} km: index {index_us:8.1f} µs/query | full scan {scan_us:8.1f} µs/query"
+                  f" | identical {identical}/{queries}")
+
+
+if __name__ == "__main__":
+    import sys
+
+    benchmark([int(arg) for arg in sys.argv[1:]] or [1000, 10000, 100000])
@@ -0,0 +1,178 @@
+"""
+Precomputed /places responses.
+
+The catalog only changes between deploys, so the listing is serialized
+once: every place is rendered to JSON bytes per requested field set, and
+a response body is those rows joined. Each body carries a strong ETag
+(hash of the bytes) and its gzip — and, when the optional brotli package
+is installed, br — variant, compressed once and kept.
+
+The full listing is built at startup; projections (fields=) and pages
+(cursor=, limit=) are rendered on first request and memoized.
+"""
+
+import base64
+import gzip
+import hashlib
+import json
+from collections import OrderedDict
+from collections.abc import Mapping
+
+from catalog.compiled import plain
+
+try:
+    import brotli
+except ImportError:   # optional: gzip only
+    brotli = None
+
+# Fields of a place in /places, in response order
+PLACE_FIELDS = ("name", "region", "lat", "lon", "vibe", "description", "top_activities", "insider_tip", "season")
+_DEFAULTS = {"lat": None, "lon": None, "top_activities": []}
+
+# Bodies smaller than this are sent uncompressed
+MIN_COMPRESS_SIZE = 512
+
+
+class InvalidRequest(ValueError):
+    """Unknown field or cursor in a /places request."""
+
+
+class Payload:
+    """A response body with its ETag and lazily compressed variants."""
+
+    def __init__(self, body: bytes):
+        self.body = body
+        self.etag = '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+        self._encoded: dict[str, bytes] = {}
+
+    def encoded(self, encoding: str) -> bytes:
+        """The body in encoding ("gzip", "br" or "identity")."""
+        if encoding == "identity":
+            return self.body
+        data = self._encoded.get(encoding)
+        if data is None:
+            if encoding == "br":
+                data = brotli.compress(self.body, quality=11)
+            else:
+                data = gzip.compress(self.body, compresslevel=9, mtime=0)
+            self._encoded[encoding] = data
+        return data
+
+    def choose_encoding(self, accept_encoding: str | None) -> str:
+        """Best encoding the client accepts (br > gzip > identity)."""
+        if len(self.body) < MIN_COMPRESS_SIZE or not accept_encoding:
+            return "identity"
+        accepted = set()
+        for part in accept_encoding.split(","):
+            coding, *params = part.split(";")
+            if not any(_quality(param) == 0 for param in params):
+                accepted.add(coding.strip().lower())
+        if brotli is not None and ("br" in accepted or "*" in accepted):
+            return "br"
+        if "gzip" in accepted or "*" in accepted:
+            return "gzip"
+        return "identity"
+
+    def etag_for(self, encoding: str) -> str:
+        """Strong ETag of the body as sent; each content-coding gets its own."""
+        return self.etag if encoding == "identity" else f'{self.etag[:-1]}-{encoding}"'
+
+    def matches(self, if_none_match: str | None) -> bool:
+        """True if If-None-Match names this body in any encoding, i.e. a 304 will do."""
+        if not if_none_match:
+            return False
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        # If-None-Match uses weak comparison
+        return "*" in tags or any(self.etag_for(e) in tags for e in ("identity", "gzip", "br"))
+
+
+def _quality(param: str) -> float | None:
+    name, _, value = param.strip().partition("=")
+    if name.strip().lower() != "q":
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def encode_cursor(name: str) -> str:
+    return base64.urlsafe_b64encode(name.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> str:
+    try:
+        return base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+    except (ValueError, UnicodeDecodeError):
+        raise InvalidRequest(f"Invalid cursor: {cursor!r}") from None
+
+
+class PlacesListing:
+    def __init__(self, places: Mapping, memo_size: int = 256):
+        self.names = list(places)
+        self.positions = {name: i for i, name in enumerate(self.names)}
+        self.records = [
+            {field: name if field == "name" else plain(data.get(field, _DEFAULTS.get(field, ""))) for field in PLACE_FIELDS}
+            for name, data in places.items()
+        ]
+        self.memo_size = memo_size
+        self._rows: dict[tuple, list[bytes]] = {}
+        self._pages: OrderedDict[tuple, Payload] = OrderedDict()
+        # The common case, ready before the first request and never evicted
+        self.full = self._render(PLACE_FIELDS, 0, None)
+        for encoding in ("gzip", "br") if brotli is not None else ("gzip",):
+            self.full.encoded(encoding)
+
+    def fields(self, fields: str | None) -> tuple[str, ...]:
+        """Validated field set from a comma-separated fields= value (None: all)."""
+        if not fields:
+            return PLACE_FIELDS
+        wanted = {f.strip() for f in fields.split(",") if f.strip()}
+        unknown = wanted - set(PLACE_FIELDS)
+        if unknown:
+            raise InvalidRequest(f"Unknown field(s): {', '.join(sorted(unknown))}")
+        # Response order stays fixed so equal projections share one rendering
+        return tuple(f for f in PLACE_FIELDS if f in wanted)
+
+    def _rendered(self, fields: tuple[str, ...]) -> list[bytes]:
+        rows = self._rows.get(fields)
+        if rows is None:
+            rows = [
+                json.dumps({f: record[f] for f in fields}, ensure_ascii=False, separators=(",", ":")).encode()
+                for record in self.records
+            ]
+            self._rows[fields] = rows
+        return rows
+
+    def page(self, fields: str | None, cursor: str | None, limit: int | None) -> Payload:
+        """
+        The /places body for a projection and page. cursor is the opaque
+        next_cursor of the previous page; without limit everything from
+        the cursor on is returned.
+        """
+        selected = self.fields(fields)
+        start = 0
+        if cursor:
+            start = self.positions.get(decode_cursor(cursor), -1)
+            if start < 0:
+                raise InvalidRequest(f"Invalid cursor: {cursor!r}")
+        if (selected, start, limit) == (PLACE_FIELDS, 0, None):
+            return self.full
+        key = (selected, start, limit)
+        payload = self._pages.get(key)
+        if payload is not None:
+            self._pages.move_to_end(key)
+            return payload
+        payload = self._render(selected, start, limit)
+        self._pages[key] = payload
+        while len(self._pages) > self.memo_size:
+            self._pages.popitem(last=False)
+        return payload
+
+    def _render(self, selected: tuple[str, ...], start: int, limit: int | None) -> Payload:
+        end = len(self.names) if limit is None else min(start + limit, len(self.names))
+        body = b'{"places":[' + b",".join(self._rendered(selected)[start:end]) + b"]"
+        if limit is not None:
+            next_cursor = encode_cursor(self.names[end]) if end < len(self.names) else None
+            body += b',"next_cursor":' + json.dumps(next_cursor).encode()
+        return Payload(body + b"}")
@@ -0,0 +1,300 @@
+"""
+Partner hotels and restaurants per place, pre-rendered and indexed.
+
+Every catalog load renders each place's partners once: every hotel and
+restaurant to JSON bytes, the whole listing to a JSON body and to the
+text block shown when a place is chosen. Inverted indexes (price range,
+hotel type, restaurant cuisine → positions) and sort permutations are
+built at the same time, so a filtered, sorted /places/{name}/partners is
+a few vectorized mask operations and a join of pre-rendered rows however
+many partners a city has. Filtered bodies are memoized.
+
+Filters: price_range applies to both sections and matches exactly; type
+(hotels) and cuisine (restaurants) match case-insensitively. Several
+comma-separated values match any of them. Sorting is stable, so ties
+keep catalog order; price ranges order by length ("$" < "$$" < "$$$").
+
+Benchmark with thousands of partners per place:
+    python -m catalog.partners 1000 10000
+"""
+
+import json
+from collections import OrderedDict, defaultdict
+from collections.abc import Callable, Iterable, Mapping, Sequence
+
+import numpy as np
+
+from catalog.listing import InvalidRequest, Payload
+from catalog.records import Hotel, Partners, Restaurant
+from catalog.store import Catalog, current_catalog, on_reload
+from config.settings import PARTNERS_RESPONSE_CACHE_SIZE
+
+# kind= value → response section, in response order
+KINDS = {"hotel": "hotels", "restaurant": "restaurants"}
+SORTS = ("name", "price_range", "type", "cuisine")
+
+_ALL_SECTIONS = tuple(KINDS.values())
+_NO_PARTNERS = Partners((), ())
+_EMPTY = np.empty(0, dtype=np.int64)
+_ENCODER = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+_HOTEL_FIELDS = ("name", "type", "price_range", "highlight", "address", "lat", "lon")
+_RESTAURANT_FIELDS = ("name", "cuisine", "price_range", "highlight", "must_try", "lat", "lon")
+
+# Filter and sort keys per section; a section ignores filters and sorts it has no key for
+_HOTEL_FILTERS = {"price_range": lambda h: h.price_range, "type": lambda h: h.type_key}
+_RESTAURANT_FILTERS = {"price_range": lambda r: r.price_range, "cuisine": lambda r: r.cuisine_key}
+_HOTEL_SORTS = {"name": lambda h: h.name.lower(), "price_range": lambda h: len(h.price_range.strip()),
+                "type": lambda h: h.type_key}
+_RESTAURANT_SORTS = {"name": lambda r: r.name.lower(), "price_range": lambda r: len(r.price_range.strip()),
+                     "cuisine": lambda r: r.cuisine_key}
+
+
+def render_text(place: str, partners: Partners) -> str:
+    """The partners block shown in the conversation once place is chosen."""
+    lines = ["\n" + "═" * 50]
+    lines.append("WHERE TO STAY & WHERE TO EAT")
+    lines.append("═" * 50)
+    lines.append(f"\n{place}")
+    lines.append("─" * 40)
+
+    lines.append("  Hotels:")
+    for h in partners.hotels:
+        lines.append(f"     {h.name} ({h.type} · {h.price_range})")
+        lines.append(f"     {h.highlight}")
+
+    lines.append("\n  Restaurants:")
+    for r in partners.restaurants:
+        lines.append(f"     {r.name} ({r.cuisine} · {r.price_range})")
+        lines.append(f"     {r.highlight}")
+        lines.append(f"     Must try: {r.must_try}")
+
+    lines.append("\n" + "═" * 50 + "\n")
+    return "\n".join(lines)
+
+
+def _row(entry: Hotel | Restaurant, fields: tuple[str, ...]) -> bytes:
+    return _ENCODER.encode({f: getattr(entry, f) for f in fields}).encode()
+
+
+class PartnerSection:
+    """One place's hotels or restaurants: rendered rows, inverted indexes and sort orders."""
+
+    def __init__(self, entries: Sequence, fields: tuple[str, ...], filters: Mapping[str, Callable],
+                 sorts: Mapping[str, Callable]):
+        self.rows = [_row(entry, fields) for entry in entries]
+        self.postings: dict[str, dict[str, np.ndarray]] = {}
+        for field, key in filters.items():
+            groups = defaultdict(list)
+            for i, entry in enumerate(entries):
+                groups[key(entry)].append(i)
+            self.postings[field] = {value: np.array(positions, dtype=np.int64) for value, positions in groups.items()}
+        self.orders: dict[tuple[str | None, bool], np.ndarray] = {(None, False): np.arange(len(entries), dtype=np.int64)}
+        for field, key in sorts.items():
+            keys = [key(entry) for entry in entries]
+            for descending in (False, True):
+                # sorted() is stable in both directions: ties keep catalog order
+                order = sorted(range(len(entries)), key=keys.__getitem__, reverse=descending)
+                self.orders[field, descending] = np.array(order, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def select(self, filters: Mapping[str, frozenset], sort: str | None, descending: bool,
+               limit: int | None) -> np.ndarray:
+        """Positions of the matching entries in the requested order, at most limit of them."""
+        mask = None
+        for field, wanted in filters.items():
+            postings = self.postings.get(field)
+            if postings is None:
+                continue
+            hit = np.zeros(len(self.rows), dtype=bool)
+            for value in wanted:
+                hit[postings.get(value, _EMPTY)] = True
+            mask = hit if mask is None else mask & hit
+        order = self.orders.get((sort, descending), self.orders[None, False])
+        if mask is not None:
+            order = order[mask[order]]
+        return order if limit is None else order[:limit]
+
+    def body(self, positions: Iterable[int]) -> bytes:
+        rows = self.rows
+        return b"[" + b",".join([rows[i] for i in positions]) + b"]"
+
+
+class PlacePartners:
+    """A place's partners with everything a request or the conversation needs pre-rendered."""
+
+    def __init__(self, place: str, partners: Partners | None):
+        self.place = place
+        self.sections = {
+            "hotels": PartnerSection((partners or _NO_PARTNERS).hotels, _HOTEL_FIELDS, _HOTEL_FILTERS, _HOTEL_SORTS),
+            "restaurants": PartnerSection((partners or _NO_PARTNERS).restaurants, _RESTAURANT_FIELDS,
+                                          _RESTAURANT_FILTERS, _RESTAURANT_SORTS),
+        }
+        self.text = render_text(place, partners) if partners else ""
+        self.full = self.render(_ALL_SECTIONS, {}, None, False, None)
+
+    def render(self, sections: tuple[str, ...], filters: Mapping[str, frozenset], sort: str | None,
+               descending: bool, limit: int | None) -> Payload:
+        body = b'{"place":' + json.dumps(self.place, ensure_ascii=False).encode()
+        for name in sections:
+            section = self.sections[name]
+            body += f',"{name}":'.encode() + section.body(section.select(filters, sort, descending, limit))
+        return Payload(body + b"}")
+
+
+def _values(text: str | None) -> frozenset[str]:
+    return frozenset(value.strip() for value in (text or "").split(",") if value.strip())
+
+
+class PartnersDirectory:
+    def __init__(self, places: Iterable[str], partners: Mapping[str, Partners], memo_size: int = 1024):
+        names = list(dict.fromkeys([*places, *partners]))
+        self.listings = {name: PlacePartners(name, partners.get(name)) for name in names}
+        self.memo_size = memo_size
+        self._memo: OrderedDict[tuple, Payload] = OrderedDict()
+
+    def get(self, place: str) -> PlacePartners | None:
+        return self.listings.get(place)
+
+    def query(self, place: str, kind: str | None = None, price_range: str | None = None, type_: str | None = None,
+              cuisine: str | None = None, sort: str | None = None, limit: int | None = None) -> Payload:
+        """
+        The /places/{place}/partners body; KeyError for an unknown place,
+        InvalidRequest for an unknown kind or sort. Without kind, a type
+        filter alone selects hotels and a cuisine filter alone restaurants.
+        """
+        listing = self.listings[place]
+        if kind:
+            kinds = _values(kind)
+            unknown = kinds - set(KINDS)
+            if unknown:
+                raise InvalidRequest(f"Unknown kind(s): {', '.join(sorted(unknown))}")
+        elif bool(type_) != bool(cuisine):
+            kinds = {"hotel"} if type_ else {"restaurant"}
+        else:
+            kinds = set(KINDS)
+        sections = tuple(section for k, section in KINDS.items() if k in kinds)
+
+        descending = bool(sort) and sort.startswith("-")
+        field = sort.removeprefix("-") if sort else None
+        if field is not None and field not in SORTS:
+            raise InvalidRequest(f"Unknown sort: {sort!r} (one of {', '.join(SORTS)}, '-' for descending)")
+
+        filters = {
+            name: values
+            for name, values in (("price_range", _values(price_range)),
+                                 ("type", frozenset(v.lower() for v in _values(type_))),
+                                 ("cuisine", frozenset(v.lower() for v in _values(cuisine))))
+            if values
+        }
+        if not filters and field is None and limit is None and sections == _ALL_SECTIONS:
+            return listing.full
+        key = (place, sections, tuple(sorted(filters.items())), field, descending, limit)
+        payload = self._memo.get(key)
+        if payload is not None:
+            self._memo.move_to_end(key)
+            return payload
+        payload = listing.render(sections, filters, field, descending, limit)
+        self._memo[key] = payload
+        while len(self._memo) > self.memo_size:
+            self._memo.popitem(last=False)
+        return payload
+
+
+def _load(catalog: Catalog) -> Callable[[], None]:
+    """Index and render the partners of catalog; the returned commit swaps them in."""
+    directory = PartnersDirectory(catalog.places, catalog.records.partners, PARTNERS_RESPONSE_CACHE_SIZE)
+
+    def commit():
+        global _directory
+        _directory = directory
+    return commit
+
+
+_load(current_catalog())()
+on_reload(_load)
+
+
+def partners_directory() -> PartnersDirectory:
+    return _directory
+
+
+# ── Benchmark ────────────────────────────────────────────────────────────────
+
+def _synthetic_partners(size: int, seed: int = 3) -> Partners:
+    import random
+
+    rng = random.Random(seed)
+    types = ["Boutique Riad", "Heritage Hotel", "Resort", "Guesthouse", "Desert Camp", "Historic Hotel"]
+    cuisines = ["Traditional Tunisian", "Seafood", "Tunisian café", "Mediterranean", "Street food", "French"]
+    prices = ["$", "$$", "$$$", "$$$$"]
+    hotels = tuple(
+        Hotel(f"Hotel {i}", t, t.lower(), rng.choice(prices), f"Highlight of hotel {i}", f"Street {i}", 36.8, 10.2)
+        for i, t in enumerate(rng.choice(types) for _ in range(size))
+    )
+    restaurants = tuple(
+        Restaurant(f"Restaurant {i}", c, c.lower(), rng.choice(prices), f"Highlight of restaurant {i}",
+                   f"Dish {i}", 36.8, 10.2)
+        for i, c in enumerate(rng.choice(cuisines) for _ in range(size))
+    )
+    return Partners(hotels, restaurants)
+
+
+def _scan(place: str, partners: Partners, price_range: set, cuisine: set, sort: str) -> bytes:
+    """The same query answered per request from the records: filter, sort, serialize."""
+    restaurants = [r for r in partners.restaurants if r.price_range in price_range and r.cuisine_key in cuisine]
+    restaurants.sort(key=lambda r: len(r.price_range.strip()) if sort == "price_range" else r.name.lower())
+    rows = [{f: getattr(r, f) for f in _RESTAURANT_FIELDS} for r in restaurants]
+    return json.dumps({"place": place, "restaurants": rows}, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def benchmark(sizes: list[int], queries: int = 50):
+    import time
+    import tracemalloc
+
+    for size in sizes:
+        partners = _synthetic_partners(size)
+        start = time.perf_counter()
+        listing = PlacePartners("Benchmark", partners)
+        build_ms = (time.perf_counter() - start) * 1000
+        tracemalloc.start()
+        listing = PlacePartners("Benchmark", partners)
+        heap = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        directory = PartnersDirectory([], {}, memo_size=0)
+        directory.listings["Benchmark"] = listing
+        query = {"cuisine": "seafood,french", "price_range": "$$,$$$", "sort": "price_range"}
+
+        start = time.perf_counter()
+        for _ in range(queries):
+            text = render_text("Benchmark", partners)
+        text_us = (time.perf_counter() - start) * 1e6 / queries
+        assert text == listing.text
+
+        start = time.perf_counter()
+        for _ in range(queries):
+            indexed = directory.query("Benchmark", **query)
+        index_us = (time.perf_counter() - start) * 1e6 / queries
+        start = time.perf_counter()
+        for _ in range(queries):
+            scanned = _scan("Benchmark", partners, {"$$", "$$$"}, {"seafood", "french"}, "price_range")
+        scan_us = (time.perf_counter() - start) * 1e6 / queries
+        assert json.loads(indexed.body) == json.loads(scanned)
+        directory.memo_size = 1
+        directory.query("Benchmark", **query)
+        start = time.perf_counter()
+        for _ in range(queries):
+            directory.query("Benchmark", **query)
+        memo_us = (time.perf_counter() - start) * 1e6 / queries
+
+        print(f"{size:>6} hotels + {size} restaurants: build {build_ms:7.1f} ms, {heap / 1024:7.0f} KiB | "
+              f"text block {text_us:8.1f} µs → precomputed | filtered+sorted: index {index_us:7.1f} µs "
+              f"({memo_us:.1f} µs memoized), scan {scan_us:8.1f} µs")
+
+
+if __name__ == "__main__":
+    import sys
+
+    benchmark([int(arg) for arg in sys.argv[1:]] or [10, 1000, 10000])
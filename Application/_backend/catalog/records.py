@@ -0,0 +1,346 @@
+"""
+Typed, validated records for the catalog.
+
+The catalog sections (catalog/store.py) are JSON-shaped: nested dicts
+from the data modules, or views that decode from the memory-mapped file
+on every access. build_records() turns them, once per load, into
+immutable NamedTuples with every normalized form the hot paths need
+precomputed: lowercase keys, tag sets, the aliases a user may call a
+place by, and the quiz question matched to every place. Short repeated
+strings (tags, regions, price ranges, hotel types, cuisines) are
+interned, so a large catalog stores each of them once.
+
+Malformed entries raise CatalogRecordError when the catalog is loaded,
+not halfway through a conversation.
+
+Memory and lookup latency against the plain catalog:
+    python -m catalog.records 1 100
+"""
+
+import sys
+from collections.abc import Mapping, Sequence
+from typing import NamedTuple
+
+
+class CatalogRecordError(ValueError):
+    """A catalog entry is missing a field or has one of the wrong type."""
+
+
+class Place(NamedTuple):
+    name: str
+    key: str                      # name.lower()
+    aliases: frozenset[str]       # lowercase forms that pick this place in a message
+    region: str
+    lat: float | None
+    lon: float | None
+    vibe: str
+    description: str
+    top_activities: tuple[str, ...]
+    insider_tip: str
+    season: str
+    tunisian_word: str
+    duration_days: float
+    styles: frozenset[str]        # tag sets, lowercase
+    best_for: frozenset[str]
+    budget: frozenset[str]
+    interests: frozenset[str]
+
+
+class Hotel(NamedTuple):
+    name: str
+    type: str
+    type_key: str                 # type.lower()
+    price_range: str
+    highlight: str
+    address: str
+    lat: float | None
+    lon: float | None
+
+
+class Restaurant(NamedTuple):
+    name: str
+    cuisine: str
+    cuisine_key: str              # cuisine.lower()
+    price_range: str
+    highlight: str
+    must_try: str
+    lat: float | None
+    lon: float | None
+
+
+class Partners(NamedTuple):
+    hotels: tuple[Hotel, ...]
+    restaurants: tuple[Restaurant, ...]
+
+
+class QuizQuestion(NamedTuple):
+    destination: str
+    destination_key: str          # destination.lower()
+    question: str
+    hints: tuple[str, ...]
+    answer: str
+
+
+class Records(NamedTuple):
+    places: dict[str, Place]
+    partners: dict[str, Partners]
+    quiz: tuple[QuizQuestion, ...]
+    quiz_by_place: dict[str, QuizQuestion | None]
+
+    def quiz_for(self, place_name: str) -> QuizQuestion | None:
+        """The quiz question for a place; precomputed for every place in the catalog."""
+        if place_name in self.quiz_by_place:
+            return self.quiz_by_place[place_name]
+        return _match_quiz(self.quiz, place_name.lower())
+
+    def aliases(self, place_name: str) -> frozenset[str]:
+        place = self.places.get(place_name)
+        return place.aliases if place is not None else place_aliases(place_name)
+
+
+def place_aliases(name: str) -> frozenset[str]:
+    """The full name and its first word, lowercase."""
+    key = name.lower()
+    return frozenset((key, *key.split()[:1]))
+
+
+def _match_quiz(quiz: Sequence[QuizQuestion], place_key: str) -> QuizQuestion | None:
+    """The first question whose destination and the place name contain each other, else one naming its first word."""
+    for q in quiz:
+        if q.destination_key in place_key or place_key in q.destination_key:
+            return q
+    first_word = place_key.split()[:1]
+    for q in quiz:
+        if first_word and first_word[0] in q.destination_key:
+            return q
+    return None
+
+
+# ── Validation ───────────────────────────────────────────────────────────────
+
+def _field(where: str, data: Mapping, field: str, kind: type | tuple, default=...):
+    if not isinstance(data, Mapping):
+        raise CatalogRecordError(f"{where}: expected an object, got {type(data).__name__}")
+    value = data.get(field, default)
+    if value is ...:
+        raise CatalogRecordError(f"{where}: missing {field!r}")
+    if value is not default and (not isinstance(value, kind) or isinstance(value, bool)):
+        raise CatalogRecordError(f"{where}: {field!r} must be {getattr(kind, '__name__', kind)}, got {value!r}")
+    return value
+
+
+def _strings(where: str, data: Mapping, field: str, default=...) -> tuple[str, ...]:
+    values = _field(where, data, field, Sequence, default)
+    if isinstance(values, str) or not all(isinstance(v, str) for v in values):
+        raise CatalogRecordError(f"{where}: {field!r} must be a list of strings")
+    return tuple(values)
+
+
+def _tags(where: str, data: Mapping, field: str, shared: dict) -> frozenset[str]:
+    """The lowercase tag set; equal sets are shared between places, like interned strings."""
+    tags = frozenset(sys.intern(v.lower()) for v in _strings(where, data, field))
+    return shared.setdefault(tags, tags)
+
+
+def _coordinate(where: str, data: Mapping, field: str) -> float | None:
+    value = _field(where, data, field, (int, float), None)
+    return None if value is None else float(value)
+
+
+def place_record(name: str, data: Mapping, shared: dict | None = None) -> Place:
+    where = f"place {name!r}"
+    shared = {} if shared is None else shared
+    return Place(
+        name=name,
+        key=name.lower(),
+        aliases=place_aliases(name),
+        region=sys.intern(_field(where, data, "region", str)),
+        lat=_coordinate(where, data, "lat"),
+        lon=_coordinate(where, data, "lon"),
+        vibe=_field(where, data, "vibe", str),
+        description=_field(where, data, "description", str),
+        top_activities=_strings(where, data, "top_activities", ()),
+        insider_tip=_field(where, data, "insider_tip", str),
+        season=_field(where, data, "season", str),
+        tunisian_word=_field(where, data, "tunisian_word", str),
+        duration_days=_field(where, data, "duration_days", (int, float)),
+        styles=_tags(where, data, "styles", shared),
+        best_for=_tags(where, data, "best_for", shared),
+        budget=_tags(where, data, "budget", shared),
+        interests=_tags(where, data, "interests", shared),
+    )
+
+
+def hotel_record(where: str, data: Mapping) -> Hotel:
+    where = f"{where} hotel {data.get('name') if isinstance(data, Mapping) else ''!r}"
+    hotel_type = sys.intern(_field(where, data, "type", str))
+    return Hotel(
+        name=_field(where, data, "name", str),
+        type=hotel_type,
+        type_key=sys.intern(hotel_type.lower()),
+        price_range=sys.intern(_field(where, data, "price_range", str)),
+        highlight=_field(where, data, "highlight", str),
+        address=_field(where, data, "address", str, ""),
+        lat=_coordinate(where, data, "lat"),
+        lon=_coordinate(where, data, "lon"),
+    )
+
+
+def restaurant_record(where: str, data: Mapping) -> Restaurant:
+    where = f"{where} restaurant {data.get('name') if isinstance(data, Mapping) else ''!r}"
+    cuisine = sys.intern(_field(where, data, "cuisine", str))
+    return Restaurant(
+        name=_field(where, data, "name", str),
+        cuisine=cuisine,
+        cuisine_key=sys.intern(cuisine.lower()),
+        price_range=sys.intern(_field(where, data, "price_range", str)),
+        highlight=_field(where, data, "highlight", str),
+        must_try=_field(where, data, "must_try", str),
+        lat=_coordinate(where, data, "lat"),
+        lon=_coordinate(where, data, "lon"),
+    )
+
+
+def partners_record(place: str, data: Mapping) -> Partners:
+    where = f"partners of {place!r}"
+    return Partners(
+        hotels=tuple(hotel_record(where, h) for h in _field(where, data, "hotels", Sequence, ())),
+        restaurants=tuple(restaurant_record(where, r) for r in _field(where, data, "restaurants", Sequence, ())),
+    )
+
+
+def quiz_record(i: int, data: Mapping) -> QuizQuestion:
+    where = f"quiz question {i}"
+    destination = _field(where, data, "destination", str)
+    return QuizQuestion(
+        destination=destination,
+        destination_key=destination.lower(),
+        question=_field(where, data, "question", str),
+        hints=_strings(where, data, "hints"),
+        answer=_field(where, data, "answer", str),
+    )
+
+
+def build_records(places: Mapping, partners: Mapping, quiz: Sequence) -> Records:
+    """Validated records for the catalog sections; raises CatalogRecordError."""
+    shared = {}
+    place_records = {name: place_record(name, data, shared) for name, data in places.items()}
+    quiz_records = tuple(quiz_record(i, q) for i, q in enumerate(quiz))
+    return Records(
+        places=place_records,
+        partners={place: partners_record(place, data) for place, data in partners.items()},
+        quiz=quiz_records,
+        quiz_by_place={name: _match_quiz(quiz_records, place.key) for name, place in place_records.items()},
+    )
+
+
+# ── Benchmark ────────────────────────────────────────────────────────────────
+
+def _scaled_content(content: dict, factor: int) -> dict:
+    """content with every place (and its partners and quiz question) repeated factor times."""
+    if factor == 1:
+        return content
+    renamed = [(copy, name, f"{name} {copy}") for copy in range(factor) for name in content["places"]]
+    return {
+        "places": {new: content["places"][name] for _, name, new in renamed},
+        "partners": {new: content["partners"][name] for _, name, new in renamed if name in content["partners"]},
+        "quiz": [{**q, "destination": f"{q['destination']} {copy}"} for copy in range(factor) for q in content["quiz"]],
+    }
+
+
+# What the hot paths did per call before records, kept as the benchmark reference
+
+def _dict_place(sections: tuple, name: str):
+    place = {**sections[0][name], "name": name}
+    return place["description"], place["top_activities"], place["styles"]
+
+
+def _record_place(records: Records, name: str):
+    place = records.places[name]
+    return place.description, place.top_activities, place.styles
+
+
+def _dict_partners(sections: tuple, name: str):
+    partners = sections[1].get(name)
+    return partners and [(h["name"], h["type"], h["price_range"]) for h in partners["hotels"]]
+
+
+def _record_partners(records: Records, name: str):
+    partners = records.partners.get(name)
+    return partners and [(h.name, h.type, h.price_range) for h in partners.hotels]
+
+
+def _dict_quiz(sections: tuple, place_name: str):
+    quiz = sections[2]
+    place_lower = place_name.lower()
+    for q in quiz:
+        if q["destination"].lower() in place_lower or place_lower in q["destination"].lower():
+            return q
+    first_word = place_lower.split()[0]
+    for q in quiz:
+        if first_word in q["destination"].lower():
+            return q
+    return None
+
+
+def _heap(build) -> tuple[object, int]:
+    """(build(), bytes it left allocated on the Python heap)."""
+    import gc
+    import tracemalloc
+
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return result, size
+
+
+def _per_call_us(function, arguments: list, repeat: int = 5) -> float:
+    import time
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for argument in arguments:
+            function(argument)
+    return (time.perf_counter() - start) * 1e6 / (repeat * len(arguments))
+
+
+def benchmark(factors: list[int]):
+    import json
+    import pathlib
+    import tempfile
+
+    from catalog.compiled import CompiledCatalog, write_catalog
+    from catalog.store import module_content
+
+    base = module_content()
+    for factor in factors:
+        content = _scaled_content(base, factor)
+        names = list(content["places"])
+        with tempfile.TemporaryDirectory() as directory:
+            path = pathlib.Path(directory) / "catalog.bin"
+            write_catalog(path, content)
+            root = CompiledCatalog(path).root
+            mapped = (root["places"], root["partners"], root["quiz"])
+            # A worker's copy of the plain catalog, as the data modules would hold it
+            plain_content, plain_bytes = _heap(lambda: json.loads(json.dumps(content)))
+            records, record_bytes = _heap(lambda: build_records(*mapped))
+
+            sample = names[:: max(1, len(names) // 50)]
+            print(f"{len(names):>6} places: plain dicts {plain_bytes / 1024:8.1f} KiB | records "
+                  f"{record_bytes / 1024:8.1f} KiB ({record_bytes / len(names):.0f} B/place incl. partners and quiz)")
+            plain_sections = (plain_content["places"], plain_content["partners"], plain_content["quiz"])
+            for label, before, after in (("place", _dict_place, _record_place),
+                                         ("partners", _dict_partners, _record_partners),
+                                         ("quiz", _dict_quiz, lambda r, name: r.quiz_for(name))):
+                plain_us = _per_call_us(lambda name: before(plain_sections, name), sample)
+                mapped_us = _per_call_us(lambda name: before(mapped, name), sample)
+                record_us = _per_call_us(lambda name: after(records, name), sample)
+                print(f"    {label:<8}: plain dicts {plain_us:7.2f} µs | mapped dicts {mapped_us:7.2f} µs | "
+                      f"records {record_us:5.2f} µs")
+
+if __name__ == "__main__":
+    benchmark([int(arg) for arg in sys.argv[1:]] or [1, 100])
@@ -0,0 +1,152 @@
+"""
+The live catalog: places, partners and quiz questions.
+
+Workers memory-map the compiled catalog at CATALOG_PATH (catalog/compiled.py)
+and fall back to the Python modules in data/ when it is missing or
+unreadable. Compile it from the modules, or from edited JSON content files:
+
+    python -m catalog.store export content/           # data/*.py → places.json, partners.json, quiz.json
+    python -m catalog.store build [--source content/]  # → CATALOG_PATH
+
+Every load also builds the validated records (catalog/records.py) the hot
+paths read; a catalog that fails validation is not loaded.
+
+reload() swaps in the current file without a restart (the API does it on
+SIGHUP). Modules that derive state from the catalog (indexes, precomputed
+responses) register a builder with on_reload(): every builder prepares its
+new state first and returns a commit; only when all succeeded are the
+commits applied and the catalog replaced, so a missing or broken file
+leaves the old catalog serving. build writes a new file and renames it
+over the old one; never rewrite a mapped catalog in place.
+"""
+
+import json
+import logging
+import pathlib
+import threading
+import time
+from collections.abc import Callable, Mapping, Sequence
+from typing import NamedTuple
+
+from catalog.compiled import CompiledCatalog, fingerprint, plain, write_catalog
+from catalog.records import Records, build_records
+from config.settings import CATALOG_PATH
+
+log = logging.getLogger(__name__)
+
+SECTIONS = ("places", "partners", "quiz")
+
+
+class Catalog(NamedTuple):
+    places: Mapping     # name → place
+    partners: Mapping   # place name → {"hotels": [...], "restaurants": [...]}
+    quiz: Sequence      # quiz questions
+    records: Records    # the same content as validated records with normalized fields
+    fingerprint: str
+    source: str         # compiled file path, or "modules"
+
+
+def module_content() -> dict:
+    from data.mock_partners import PARTNERS_DB
+    from data.places_db import PLACES_DB
+    from data.quiz_db import QUIZ_DATA
+
+    return {"places": PLACES_DB, "partners": PARTNERS_DB, "quiz": QUIZ_DATA}
+
+
+def source_content(directory: pathlib.Path) -> dict:
+    """Content from <section>.json files (as written by export)."""
+    return {
+        section: json.loads((directory / f"{section}.json").read_text(encoding="utf-8"))
+        for section in SECTIONS
+    }
+
+
+def load_catalog(path: pathlib.Path = CATALOG_PATH, fallback: bool = True) -> Catalog:
+    """The compiled catalog at path; without fallback, errors propagate instead of using the modules."""
+    try:
+        compiled = CompiledCatalog(path)
+        return _catalog(compiled.root, compiled.fingerprint, str(path))
+    except (OSError, LookupError, ValueError) as e:
+        if not fallback:
+            raise
+        if isinstance(e, FileNotFoundError):
+            log.info("No compiled catalog at %s; using the data modules (python -m catalog.store build)", path)
+        else:
+            log.warning("Cannot read compiled catalog at %s (%s); using the data modules", path, e)
+    content = module_content()
+    return _catalog(content, fingerprint(content), "modules")
+
+
+def _catalog(content: Mapping, digest: str, source: str) -> Catalog:
+    places, partners, quiz = content["places"], content["partners"], content["quiz"]
+    return Catalog(places, partners, quiz, build_records(places, partners, quiz), digest, source)
+
+
+_current = load_catalog()
+_builders: list[Callable[[Catalog], Callable[[], None]]] = []
+_reload_lock = threading.Lock()
+_counters = {"reloads": 0, "failed_reloads": 0, "loaded_at": time.time()}
+
+
+def current_catalog() -> Catalog:
+    return _current
+
+
+def on_reload(builder: Callable[[Catalog], Callable[[], None]]):
+    """Register builder(catalog) → commit, run for every catalog reload()ed after this."""
+    _builders.append(builder)
+
+
+def reload(path: pathlib.Path = CATALOG_PATH) -> bool:
+    """Load the catalog again and swap it in with everything derived from it; False if that failed."""
+    global _current
+    with _reload_lock:
+        try:
+            catalog = load_catalog(path, fallback=False)
+            commits = [builder(catalog) for builder in _builders]
+        except Exception:
+            _counters["failed_reloads"] += 1
+            log.exception("Catalog reload failed; still serving %s", _current.source)
+            return False
+        for commit in commits:
+            commit()
+        _current = catalog
+        _counters["reloads"] += 1
+        _counters["loaded_at"] = time.time()
+    log.info("Catalog reloaded from %s (%s)", catalog.source, catalog.fingerprint)
+    return True
+
+
+def stats() -> dict:
+    return {"source": _current.source, "fingerprint": _current.fingerprint, **_counters}
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Compile or export the Chouchane catalog.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="compile the catalog")
+    build.add_argument("--source", type=pathlib.Path, help="directory of places.json, partners.json, quiz.json "
+                                                           "(default: the data modules)")
+    build.add_argument("--out", type=pathlib.Path, default=CATALOG_PATH)
+    export = commands.add_parser("export", help="write the data modules as JSON content files")
+    export.add_argument("directory", type=pathlib.Path)
+    args = parser.parse_args()
+
+    if args.command == "build":
+        content = source_content(args.source) if args.source else module_content()
+        build_records(content["places"], content["partners"], content["quiz"])   # validate before writing
+        size = write_catalog(args.out, content)
+        compiled = CompiledCatalog(args.out)
+        assert plain(compiled.root) == json.loads(json.dumps(content)), "compiled catalog does not round-trip"
+        print(f"Compiled {len(content['places'])} places, {len(content['partners'])} partner listings and "
+              f"{len(content['quiz'])} quiz questions into {args.out} ({size} bytes, {compiled.fingerprint})")
+    else:
+        args.directory.mkdir(parents=True, exist_ok=True)
+        for section, value in module_content().items():
+            (args.directory / f"{section}.json").write_text(
+                json.dumps(value, ensure_ascii=False, indent=2) + "\n", encoding="utf-8"
+            )
+        print(f"Exported {', '.join(SECTIONS)} to {args.directory}")
@@ -9,4 +9,78 @@ GEMINI_MODEL = "gemini-2.5-flash"
 # ── Paths ────────────────────────────────────────────────────────────────────
 import pathlib
 ROOT_DIR = pathlib.Path(__file__).parent.parent
-SYSTEM_PROMPT_PATH = ROOT_DIR / "data" / "system_prompt.txt"
\ No newline at end of file
+SYSTEM_PROMPT_PATH = ROOT_DIR / "data" / "system_prompt.txt"
+
+# ── Sessions ─────────────────────────────────────────────────────────────────
+SESSIONS_DB_PATH = pathlib.Path(os.environ.get("CHOUCHANE_SESSIONS_DB", ROOT_DIR / "chouchane_sessions.db"))
+# Journaled turns a session accumulates before its snapshot is rebuilt
+SESSION_COMPACT_AFTER = int(os.environ.get("CHOUCHANE_SESSION_COMPACT_AFTER", "50"))
+# Seconds a request waits for another in-flight turn of the same session before failing with 409
+SESSION_LOCK_TIMEOUT = float(os.environ.get("CHOUCHANE_SESSION_LOCK_TIMEOUT", "0"))
+# In-process LRU of hot sessions with write-behind to SQLite (size 0 disables it)
+SESSION_CACHE_SIZE = int(os.environ.get("CHOUCHANE_SESSION_CACHE_SIZE", "1024"))
+SESSION_CACHE_TTL = float(os.environ.get("CHOUCHANE_SESSION_CACHE_TTL", "1800"))
+SESSION_FLUSH_INTERVAL = float(os.environ.get("CHOUCHANE_SESSION_FLUSH_INTERVAL", "2"))
+# Background expiry: unfinished sessions are deleted after SESSION_IDLE_TTL seconds without a turn,
+# finished ones (yasmine_done) are moved to compressed archive segments after SESSION_ARCHIVE_AFTER
+SESSION_IDLE_TTL = float(os.environ.get("CHOUCHANE_SESSION_IDLE_TTL", str(3 * 24 * 3600)))
+SESSION_ARCHIVE_AFTER = float(os.environ.get("CHOUCHANE_SESSION_ARCHIVE_AFTER", str(6 * 3600)))
+SESSION_SWEEP_INTERVAL = float(os.environ.get("CHOUCHANE_SESSION_SWEEP_INTERVAL", "300"))
+SESSION_ARCHIVE_DIR = pathlib.Path(os.environ.get("CHOUCHANE_SESSION_ARCHIVE_DIR", ROOT_DIR / "session_archive"))
+
+# ── Gemini HTTP connection pool (shared by all requests) ─────────────────────
+GEMINI_MAX_CONNECTIONS = int(os.environ.get("GEMINI_MAX_CONNECTIONS", "100"))
+GEMINI_MAX_KEEPALIVE = int(os.environ.get("GEMINI_MAX_KEEPALIVE", "20"))
+GEMINI_KEEPALIVE_EXPIRY = float(os.environ.get("GEMINI_KEEPALIVE_EXPIRY", "60"))
+
+# ── Greeting pool (pre-generated /session/start greetings; size 0 disables) ──
+GREETING_POOL_SIZE = int(os.environ.get("CHOUCHANE_GREETING_POOL_SIZE", "12"))
+GREETING_MAX_USES = int(os.environ.get("CHOUCHANE_GREETING_MAX_USES", "5"))
+
+# ── Q&A response cache (size 0 disables; similarity 0 = exact normalized match only) ──
+QA_CACHE_SIZE = int(os.environ.get("CHOUCHANE_QA_CACHE_SIZE", "2048"))
+QA_CACHE_TTL = float(os.environ.get("CHOUCHANE_QA_CACHE_TTL", str(24 * 3600)))
+QA_CACHE_SIMILARITY = float(os.environ.get("CHOUCHANE_QA_CACHE_SIMILARITY", "0"))
+# Key answers on the session's chosen place as well as the question
+QA_CACHE_BY_PLACE = os.environ.get("CHOUCHANE_QA_CACHE_BY_PLACE", "0") == "1"
+
+# ── History compaction: the last HISTORY_KEEP_MESSAGES messages are always sent verbatim;
+# older ones are folded into a running summary once the verbatim part exceeds
+# HISTORY_TOKEN_BUDGET estimated tokens (budget 0 disables summarization)
+HISTORY_KEEP_MESSAGES = int(os.environ.get("CHOUCHANE_HISTORY_KEEP_MESSAGES", "8"))
+HISTORY_TOKEN_BUDGET = int(os.environ.get("CHOUCHANE_HISTORY_TOKEN_BUDGET", "1500"))
+# Seconds a finished fold waits for the session's lock to save its summary
+HISTORY_FOLD_LOCK_TIMEOUT = float(os.environ.get("CHOUCHANE_HISTORY_FOLD_LOCK_TIMEOUT", "30"))
+
+# Structured Yasmine turns: replies before the first recommendation also return the
+# preferences gathered so far (JSON schema), so recommending needs no extra extraction call
+YASMINE_STRUCTURED_OUTPUT = os.environ.get("CHOUCHANE_YASMINE_STRUCTURED", "0") == "1"
+
+# Local rule-based extraction is used instead of Gemini once style, companions and budget
+# all reach this confidence (set above 1 to always ask Gemini)
+LOCAL_EXTRACTION_CONFIDENCE = float(os.environ.get("CHOUCHANE_LOCAL_EXTRACTION_CONFIDENCE", "0.75"))
+
+# Recommend as soon as style, companions, duration and budget are confidently known
+# instead of always waiting for the fifth user turn
+ADAPTIVE_RECOMMENDATION = os.environ.get("CHOUCHANE_ADAPTIVE_RECOMMENDATION", "1") == "1"
+
+# ── Retrieval ─────────────────────────────────────────────────────────────────
+# Semantic index over place descriptions (build with: python -m agent.semantic_index);
+# its cosine similarity, times SEMANTIC_WEIGHT, is added to the tag score (0 disables)
+SEMANTIC_INDEX_DIR = pathlib.Path(os.environ.get("CHOUCHANE_SEMANTIC_INDEX_DIR", ROOT_DIR / "data" / "semantic_index"))
+SEMANTIC_WEIGHT = float(os.environ.get("CHOUCHANE_SEMANTIC_WEIGHT", "6"))
+# Memoized retrieval results (ranked names + rendered context) per canonical preferences
+RETRIEVAL_CACHE_SIZE = int(os.environ.get("CHOUCHANE_RETRIEVAL_CACHE_SIZE", "512"))
+# Precomputed tag scores for every style/companions/budget/duration combination
+# (build with: python -m agent.retrieval_table; computed at startup when missing)
+RETRIEVAL_TABLE_DIR = pathlib.Path(os.environ.get("CHOUCHANE_RETRIEVAL_TABLE_DIR", ROOT_DIR / "data" / "retrieval_table"))
+
+# ── Catalog ──────────────────────────────────────────────────────────────────
+# Compiled, memory-mapped catalog (build with: python -m catalog.store build); the API
+# reloads it on SIGHUP and falls back to the data/ modules when it is missing
+CATALOG_PATH = pathlib.Path(os.environ.get("CHOUCHANE_CATALOG_PATH", ROOT_DIR / "data" / "catalog.bin"))
+# Largest /places page (limit=) and how many projected/paged bodies stay memoized
+PLACES_PAGE_LIMIT = int(os.environ.get("CHOUCHANE_PLACES_PAGE_LIMIT", "500"))
+PLACES_RESPONSE_CACHE_SIZE = int(os.environ.get("CHOUCHANE_PLACES_RESPONSE_CACHE_SIZE", "256"))
+# How many filtered/sorted /places/{name}/partners bodies stay memoized
+PARTNERS_RESPONSE_CACHE_SIZE = int(os.environ.get("CHOUCHANE_PARTNERS_RESPONSE_CACHE_SIZE", "1024"))
@@ -6,6 +6,7 @@ PARTNERS_DB = {
         "hotels": [
             {
                 "name": "Dar Sidi Bou Said",
+                "lat": 36.8702, "lon": 10.3475,
                 "type": "Boutique Riad",
                 "price_range": "$$",
                 "highlight": "Stunning sea-view terrace, authentic Tunisian décor",
@@ -13,6 +14,7 @@ PARTNERS_DB = {
             },
             {
                 "name": "Hotel Dar Said",
+                "lat": 36.8712, "lon": 10.3478,
                 "type": "Heritage Hotel",
                 "price_range": "$$$",
                 "highlight": "Restored 19th-century palace, rooftop pool overlooking the bay",
@@ -22,6 +24,7 @@ PARTNERS_DB = {
         "restaurants": [
             {
                 "name": "Café des Nattes",
+                "lat": 36.8705, "lon": 10.3466,
                 "cuisine": "Tunisian café",
                 "price_range": "$",
                 "highlight": "Iconic hillside café, mint tea and makroudh since 1920",
@@ -29,6 +32,7 @@ PARTNERS_DB = {
             },
             {
                 "name": "Au Bon Vieux Temps",
+                "lat": 36.8697, "lon": 10.3485,
                 "cuisine": "Traditional Tunisian",
                 "price_range": "$$",
                 "highlight": "Rooftop dining with panoramic sea views",
@@ -41,6 +45,7 @@ PARTNERS_DB = {
         "hotels": [
             {
                 "name": "Dar Ben Gacem",
+                "lat": 36.801, "lon": 10.1697,
                 "type": "Boutique Riad",
                 "price_range": "$$",
                 "highlight": "Hidden inside the medina, authentic architecture, rooftop terrace",
@@ -48,6 +53,7 @@ PARTNERS_DB = {
             },
             {
                 "name": "Hotel Majestic",
+                "lat": 36.803, "lon": 10.1793,
                 "type": "Historic Hotel",
                 "price_range": "$$",
                 "highlight": "Art deco building from 1914, central location near Bab El Bhar",
@@ -57,6 +63,7 @@ PARTNERS_DB = {
         "restaurants": [
             {
                 "name": "Dar El Jeld",
+                "lat": 36.798, "lon": 10.1688,
                 "cuisine": "Fine Tunisian",
                 "price_range": "$$$",
                 "highlight": "The most prestigious traditional restaurant in Tunis, inside a restored palace",
@@ -64,6 +71,7 @@ PARTNERS_DB = {
             },
             {
                 "name": "M'rabet",
+                "lat": 36.7978, "lon": 10.1712,
                 "cuisine": "Traditional Tunisian",
                 "price_range": "$$",
                 "highlight": "500-year-old café inside the souk, live Tunisian music on weekends",
@@ -76,6 +84,7 @@ PARTNERS_DB = {
         "hotels": [
             {
                 "name": "Dar Dhiafa",
+                "lat": 33.8197, "lon": 10.8283,
                 "type": "Luxury Riad",
                 "price_range": "$$$",
                 "highlight": "Award-winning boutique hotel in a traditional Djerbian house with pool",
@@ -83,6 +92,7 @@ PARTNERS_DB = {
             },
             {
                 "name": "Hotel Lotos",
+                "lat": 33.877, "lon": 10.859,
                 "type": "Beach Resort",
                 "price_range": "$$",
                 "highlight": "Right on the beach, family-friendly, direct sea access",
@@ -92,6 +102,7 @@ PARTNERS_DB = {
         "restaurants": [
             {
                 "name": "Restaurant Baccar",
+                "lat": 33.8755, "lon": 10.8572,
                 "cuisine": "Fresh Seafood",
                 "price_range": "$$",
                 "highlight": "Best fresh catch on the island, fishermen bring their haul directly here",
@@ -99,6 +110,7 @@ PARTNERS_DB = {
             },
             {
                 "name": "Chez Slim",
+                "lat": 33.874, "lon": 10.856,
                 "cuisine": "Traditional Djerbian",
                 "price_range": "$",
                 "highlight": "Local favorite, no tourists — this is where Djerbans eat",
@@ -111,6 +123,7 @@ PARTNERS_DB = {
         "hotels": [
             {
                 "name": "Sahara Douz Camp",
+                "lat": 33.43, "lon": 9.03,
                 "type": "Desert Camp",
                 "price_range": "$$",
                 "highlight": "Sleep under the stars in a Bedouin tent surrounded by dunes",
@@ -118,6 +131,7 @@ PARTNERS_DB = {
             },
             {
                 "name": "Hotel Sahara Douz",
+                "lat": 33.456, "lon": 9.025,
                 "type": "Desert Hotel",
                 "price_range": "$",
                 "highlight": "Comfortable base camp, organizes all desert excursions",
@@ -127,6 +141,7 @@ PARTNERS_DB = {
         "restaurants": [
             {
                 "name": "Restaurant El Mouradi",
+                "lat": 33.458, "lon": 9.028,
                 "cuisine": "Saharan Traditional",
                 "price_range": "$",
                 "highlight": "Authentic desert cooking — tagines slow-cooked in clay pots",
@@ -134,6 +149,7 @@ PARTNERS_DB = {
             },
             {
                 "name": "Chez Hassan Camp Dinner",
+                "lat": 33.42, "lon": 9.01,
                 "cuisine": "Bedouin",
                 "price_range": "$$",
                 "highlight": "Dinner by firelight in the desert, live Bedouin music included",
@@ -146,6 +162,7 @@ PARTNERS_DB = {
         "hotels": [
             {
                 "name": "Dar Chahma",
+                "lat": 33.918, "lon": 8.124,
                 "type": "Boutique Hotel",
                 "price_range": "$$",
                 "highlight": "Traditional Tozeurian brick architecture, beautiful courtyard with palm trees",
@@ -153,6 +170,7 @@ PARTNERS_DB = {
             },
             {
                 "name": "Ksar Bibi",
+                "lat": 33.925, "lon": 8.13,
                 "type": "Heritage Hotel",
                 "price_range": "$$$",
                 "highlight": "Converted fortified granary, unique architecture, desert views",
@@ -162,6 +180,7 @@ PARTNERS_DB = {
         "restaurants": [
             {
                 "name": "Restaurant La Palmeraie",
+                "lat": 33.914, "lon": 8.139,
                 "cuisine": "Oasis Cuisine",
                 "price_range": "$$",
                 "highlight": "Dining inside the palm grove, magical setting especially at night",
@@ -169,6 +188,7 @@ PARTNERS_DB = {
             },
             {
                 "name": "Café de la République",
+                "lat": 33.92, "lon": 8.134,
                 "cuisine": "Tunisian Café",
                 "price_range": "$",
                 "highlight": "Old-school local café in the medina, unchanged since the 1960s",
@@ -181,6 +201,7 @@ PARTNERS_DB = {
         "hotels": [
             {
                 "name": "Hotel Julius",
+                "lat": 35.295, "lon": 10.709,
                 "type": "City Hotel",
                 "price_range": "$",
                 "highlight": "Walking distance from the amphitheatre, rooftop view of the ruins",
@@ -188,6 +209,7 @@ PARTNERS_DB = {
             },
             {
                 "name": "Dar El Jem",
+                "lat": 35.298, "lon": 10.705,
                 "type": "Guesthouse",
                 "price_range": "$",
                 "highlight": "Family-run guesthouse, home-cooked meals, warm local hospitality",
@@ -197,6 +219,7 @@ PARTNERS_DB = {
         "restaurants": [
             {
                 "name": "Restaurant Le Bonheur",
+                "lat": 35.296, "lon": 10.708,
                 "cuisine": "Tunisian",
                 "price_range": "$",
                 "highlight": "Best couscous in town, loved by locals and archaeologists alike",
@@ -204,6 +227,7 @@ PARTNERS_DB = {
             },
             {
                 "name": "Café des Gladiateurs",
+                "lat": 35.2967, "lon": 10.706,
                 "cuisine": "Café & Snacks",
                 "price_range": "$",
                 "highlight": "Terrace facing the amphitheatre — perfect for a coffee before your visit",
@@ -216,6 +240,7 @@ PARTNERS_DB = {
         "hotels": [
             {
                 "name": "Hotel Amina",
+                "lat": 35.685, "lon": 10.09,
                 "type": "City Hotel",
                 "price_range": "$",
                 "highlight": "Clean, central, 5 min walk from the Great Mosque",
@@ -223,6 +248,7 @@ PARTNERS_DB = {
             },
             {
                 "name": "Dar Salam",
+                "lat": 35.679, "lon": 10.1,
                 "type": "Boutique Riad",
                 "price_range": "$$",
                 "highlight": "Restored medina house, tranquil courtyard, authentic atmosphere",
@@ -232,6 +258,7 @@ PARTNERS_DB = {
         "restaurants": [
             {
                 "name": "Restaurant Sabra",
+                "lat": 35.677, "lon": 10.098,
                 "cuisine": "Traditional Kairouani",
                 "price_range": "$",
                 "highlight": "The place locals send their guests — honest, generous portions",
@@ -239,6 +266,7 @@ PARTNERS_DB = {
             },
             {
                 "name": "Patisserie Makroudh El Amel",
+                "lat": 35.68, "lon": 10.101,
                 "cuisine": "Pastry Shop",
                 "price_range": "$",
                 "highlight": "The most famous makroudh shop in Tunisia — buy a box to take home",
@@ -251,6 +279,7 @@ PARTNERS_DB = {
         "hotels": [
             {
                 "name": "Hotel Les Aiguilles",
+                "lat": 36.955, "lon": 8.757,
                 "type": "Boutique Hotel",
                 "price_range": "$$",
                 "highlight": "Facing the famous rock formations, steps from the beach",
@@ -258,6 +287,7 @@ PARTNERS_DB = {
             },
             {
                 "name": "Dar Ismail Tabarka",
+                "lat": 36.96, "lon": 8.75,
                 "type": "Beach Resort",
                 "price_range": "$$$",
                 "highlight": "Private beach, diving center on-site, lush garden",
@@ -267,6 +297,7 @@ PARTNERS_DB = {
         "restaurants": [
             {
                 "name": "Restaurant Le Corail",
+                "lat": 36.956, "lon": 8.759,
                 "cuisine": "Fresh Seafood",
                 "price_range": "$$",
                 "highlight": "Best seafood in Tabarka, the lobster is legendary",
@@ -274,6 +305,7 @@ PARTNERS_DB = {
             },
             {
                 "name": "Café du Port",
+                "lat": 36.957, "lon": 8.76,
                 "cuisine": "Café & Seafood",
                 "price_range": "$",
                 "highlight": "Harbor-side café, fishermen's haul arrives here every morning",
@@ -286,6 +318,7 @@ PARTNERS_DB = {
         "hotels": [
             {
                 "name": "Hotel Sidi Driss",
+                "lat": 33.542, "lon": 9.969,
                 "type": "Troglodyte Hotel",
                 "price_range": "$",
                 "highlight": "The actual Star Wars Tatooine set — sleep where Luke Skywalker lived",
@@ -293,6 +326,7 @@ PARTNERS_DB = {
             },
             {
                 "name": "Hotel Diar Tataouine",
+                "lat": 32.929, "lon": 10.451,
                 "type": "Desert Hotel",
                 "price_range": "$",
                 "highlight": "Traditional ksar-style architecture, rooftop views of the south",
@@ -302,6 +336,7 @@ PARTNERS_DB = {
         "restaurants": [
             {
                 "name": "Restaurant Matmata",
+                "lat": 33.544, "lon": 9.967,
                 "cuisine": "Berber Traditional",
                 "price_range": "$",
                 "highlight": "Underground dining room carved into the earth — unique experience",
@@ -309,6 +344,7 @@ PARTNERS_DB = {
             },
             {
                 "name": "Chez Abdallah",
+                "lat": 32.93, "lon": 10.452,
                 "cuisine": "Southern Tunisian",
                 "price_range": "$",
                 "highlight": "Family kitchen, grandmother's recipes, no menu — they cook what's fresh",
@@ -321,6 +357,7 @@ PARTNERS_DB = {
         "hotels": [
             {
                 "name": "Hotel Sheraton Hammamet",
+                "lat": 36.39, "lon": 10.58,
                 "type": "Luxury Resort",
                 "price_range": "$$$",
                 "highlight": "Private beach, multiple pools, direct medina access",
@@ -328,6 +365,7 @@ PARTNERS_DB = {
             },
             {
                 "name": "Dar Hayet",
+                "lat": 36.395, "lon": 10.605,
                 "type": "Boutique Hotel",
                 "price_range": "$$",
                 "highlight": "Charming guesthouse inside the old medina walls, rooftop sea views",
@@ -337,6 +375,7 @@ PARTNERS_DB = {
         "restaurants": [
             {
                 "name": "Restaurant La Bella Vista",
+                "lat": 36.399, "lon": 10.615,
                 "cuisine": "Tunisian & Mediterranean",
                 "price_range": "$$",
                 "highlight": "Terrace directly on the beach, sunset views are extraordinary",
@@ -344,6 +383,7 @@ PARTNERS_DB = {
             },
             {
                 "name": "Chez Achour",
+                "lat": 36.401, "lon": 10.618,
                 "cuisine": "Traditional Tunisian",
                 "price_range": "$",
                 "highlight": "A Hammamet institution since 1970 — locals eat here, not tourists",
@@ -356,6 +396,7 @@ PARTNERS_DB = {
         "hotels": [
             {
                 "name": "Hotel Tej Marhaba",
+                "lat": 35.835, "lon": 10.638,
                 "type": "Beach Resort",
                 "price_range": "$$$",
                 "highlight": "Beachfront location, multiple pools, close to Port El Kantaoui nightlife",
@@ -363,6 +404,7 @@ PARTNERS_DB = {
             },
             {
                 "name": "Dar El Medina Sousse",
+                "lat": 35.827, "lon": 10.638,
                 "type": "Boutique Riad",
                 "price_range": "$$",
                 "highlight": "Intimate riad inside the medina walls, rooftop terrace with sea breeze",
@@ -372,6 +414,7 @@ PARTNERS_DB = {
         "restaurants": [
             {
                 "name": "Restaurant Le Lido",
+                "lat": 35.826, "lon": 10.641,
                 "cuisine": "Tunisian & Seafood",
                 "price_range": "$$",
                 "highlight": "Terrace on the corniche, popular for sunset dinners and fresh grilled fish",
@@ -379,6 +422,7 @@ PARTNERS_DB = {
             },
             {
                 "name": "Bar & Grill Port El Kantaoui",
+                "lat": 35.892, "lon": 10.598,
                 "cuisine": "International & Tunisian",
                 "price_range": "$$",
                 "highlight": "Marina-side venue, transitions from dinner to live music after 10pm",
@@ -391,6 +435,7 @@ PARTNERS_DB = {
         "hotels": [
             {
                 "name": "Hotel Les Sources",
+                "lat": 36.401, "lon": 10.144,
                 "type": "Nature Hotel",
                 "price_range": "$",
                 "highlight": "Surrounded by greenery near the springs, peaceful and refreshing",
@@ -398,6 +443,7 @@ PARTNERS_DB = {
             },
             {
                 "name": "Dar Zaghouan",
+                "lat": 36.38, "lon": 10.12,
                 "type": "Guesthouse",
                 "price_range": "$",
                 "highlight": "Family-run guesthouse in the medina, home-cooked breakfasts with local produce",
@@ -407,6 +453,7 @@ PARTNERS_DB = {
         "restaurants": [
             {
                 "name": "Restaurant Ain El Kebira",
+                "lat": 36.402, "lon": 10.142,
                 "cuisine": "Traditional Tunisian",
                 "price_range": "$",
                 "highlight": "Open-air dining next to the natural springs, locals' favorite for weekend lunches",
@@ -414,6 +461,7 @@ PARTNERS_DB = {
             },
             {
                 "name": "Café du Temple",
+                "lat": 36.398, "lon": 10.139,
                 "cuisine": "Tunisian Café",
                 "price_range": "$",
                 "highlight": "Charming café steps from the Roman Water Temple, great for a post-visit break",
@@ -426,6 +474,7 @@ PARTNERS_DB = {
         "hotels": [
             {
                 "name": "Hotel Cap Angela",
+                "lat": 37.34, "lon": 9.74,
                 "type": "Coastal Guesthouse",
                 "price_range": "$",
                 "highlight": "Simple and clean with sea-facing rooms, ideal base for cliff walks and sunsets",
@@ -433,6 +482,7 @@ PARTNERS_DB = {
             },
             {
                 "name": "Hotel Nador Bizerte",
+                "lat": 37.3, "lon": 9.86,
                 "type": "City Hotel",
                 "price_range": "$",
                 "highlight": "Budget-friendly hotel in nearby Bizerte, 20 min drive to the cape",
@@ -442,6 +492,7 @@ PARTNERS_DB = {
         "restaurants": [
             {
                 "name": "Restaurant Le Phare",
+                "lat": 37.345, "lon": 9.743,
                 "cuisine": "Seafood & Grills",
                 "price_range": "$",
                 "highlight": "Right on the coast, fishermen drop their catch here daily — ultra-fresh",
@@ -449,6 +500,7 @@ PARTNERS_DB = {
             },
             {
                 "name": "Café Bord de Mer",
+                "lat": 37.343, "lon": 9.745,
                 "cuisine": "Café & Snacks",
                 "price_range": "$",
                 "highlight": "Cliffside terrace café, perfect for watching the Mediterranean at sunset",
@@ -461,6 +513,7 @@ PARTNERS_DB = {
         "hotels": [
             {
                 "name": "Hotel Ribat Monastir",
+                "lat": 35.766, "lon": 10.83,
                 "type": "Heritage Hotel",
                 "price_range": "$$",
                 "highlight": "Steps from the Ribat fortress, rooftop with sea and medina views",
@@ -468,6 +521,7 @@ PARTNERS_DB = {
             },
             {
                 "name": "Dar Monastir",
+                "lat": 35.764, "lon": 10.827,
                 "type": "Boutique Riad",
                 "price_range": "$$",
                 "highlight": "Restored traditional house inside the medina walls, serene courtyard garden",
@@ -477,6 +531,7 @@ PARTNERS_DB = {
         "restaurants": [
             {
                 "name": "Restaurant La Marina",
+                "lat": 35.771, "lon": 10.832,
                 "cuisine": "Tunisian & Seafood",
                 "price_range": "$$",
                 "highlight": "Overlooking the marina, popular for long lunches with fresh fish and local wine",
@@ -484,6 +539,7 @@ PARTNERS_DB = {
             },
             {
                 "name": "Café du Ribat",
+                "lat": 35.7675, "lon": 10.831,
                 "cuisine": "Tunisian Café",
                 "price_range": "$",
                 "highlight": "Atmospheric café facing the fortress walls, great spot before or after the Ribat tour",
@@ -1,6 +1,7 @@
 PLACES_DB = {
     "Sidi Bou Said": {
         "region": "North / Tunis",
+        "lat": 36.8707, "lon": 10.3469,
         "vibe": "romantic, artistic, peaceful",
         "best_for": ["couple", "solo", "photographer"],
         "styles": ["culture", "relaxation", "photography"],
@@ -15,6 +16,7 @@ PLACES_DB = {
     },
     "Medina of Tunis": {
         "region": "North / Tunis",
+        "lat": 36.7992, "lon": 10.1706,
         "vibe": "vibrant, historic, sensory",
         "best_for": ["solo", "couple", "friends"],
         "styles": ["culture", "history", "food"],
@@ -29,6 +31,7 @@ PLACES_DB = {
     },
     "Djerba Island": {
         "region": "South-East",
+        "lat": 33.875, "lon": 10.8575,
         "vibe": "laid-back, diverse, sunny",
         "best_for": ["family", "couple", "solo"],
         "styles": ["beach", "relaxation", "culture"],
@@ -43,6 +46,7 @@ PLACES_DB = {
     },
     "Sahara / Douz": {
         "region": "South-West",
+        "lat": 33.4667, "lon": 9.0203,
         "vibe": "epic, raw, unforgettable",
         "best_for": ["solo", "couple", "friends"],
         "styles": ["adventure", "nature", "photography"],
@@ -57,6 +61,7 @@ PLACES_DB = {
     },
     "Tozeur & Chebika": {
         "region": "South-West",
+        "lat": 33.9197, "lon": 8.1335,
         "vibe": "cinematic, exotic, layered",
         "best_for": ["solo", "couple", "friends"],
         "styles": ["adventure", "culture", "photography", "nature"],
@@ -71,6 +76,7 @@ PLACES_DB = {
     },
     "El Jem": {
         "region": "Central",
+        "lat": 35.2964, "lon": 10.7069,
         "vibe": "monumental, dramatic, ancient",
         "best_for": ["solo", "couple", "friends"],
         "styles": ["history", "culture", "photography"],
@@ -85,6 +91,7 @@ PLACES_DB = {
     },
     "Kairouan": {
         "region": "Central",
+        "lat": 35.6781, "lon": 10.0963,
         "vibe": "spiritual, timeless, authentic",
         "best_for": ["solo", "couple", "family"],
         "styles": ["history", "culture", "religion"],
@@ -99,6 +106,7 @@ PLACES_DB = {
     },
     "Tabarka & AinDrahem": {
         "region": "North-West",
+        "lat": 36.9544, "lon": 8.758,
         "vibe": "wild, natural, undiscovered",
         "best_for": ["solo", "couple", "friends"],
         "styles": ["nature", "adventure", "relaxation"],
@@ -113,6 +121,7 @@ PLACES_DB = {
     },
     "Matmata & Tataouine": {
         "region": "South-East",
+        "lat": 33.5428, "lon": 9.9676,
         "vibe": "surreal, cinematic, Berber",
         "best_for": ["solo", "friends", "couple"],
         "styles": ["adventure", "culture", "photography"],
@@ -127,6 +136,7 @@ PLACES_DB = {
     },
     "Hammamet": {
         "region": "North-East / Cap Bon",
+        "lat": 36.4, "lon": 10.6167,
         "vibe": "lively, family-friendly, convenient",
         "best_for": ["family", "couple"],
         "styles": ["beach", "relaxation", "culture"],
@@ -141,6 +151,7 @@ PLACES_DB = {
     },
     "Sousse": {
         "region": "Central / Coast",
+        "lat": 35.8256, "lon": 10.6084,
         "vibe": "lively, energetic, vibrant",
         "best_for": ["friends", "couple", "solo"],
         "styles": ["nightlife", "entertainment", "music", "culture"],
@@ -156,6 +167,7 @@ PLACES_DB = {
 
     "Zaghouan": {
         "region": "North / Inland",
+        "lat": 36.4029, "lon": 10.1429,
         "vibe": "serene, natural, historic",
         "best_for": ["solo", "couple", "family", "nature lovers"],
         "styles": ["nature", "history", "hiking", "culture"],
@@ -170,6 +182,7 @@ PLACES_DB = {
     },
     "Ras Angela": {
         "region": "North / Bizerte",
+        "lat": 37.3464, "lon": 9.7425,
         "vibe": "natural, scenic, peaceful",
         "best_for": ["photographer", "nature lover", "couple"],
         "styles": ["nature", "photography", "relaxation"],
@@ -184,6 +197,7 @@ PLACES_DB = {
     },
     "Monastir Medina": {
         "region": "Central / Monastir",
+        "lat": 35.7643, "lon": 10.8113,
         "vibe": "historic, coastal, relaxing",
         "best_for": ["couple", "family", "solo"],
         "styles": ["history", "beach", "culture", "relaxation"],
@@ -0,0 +1,132 @@
+"""
+Load benchmark for the chat endpoints against a stubbed Gemini.
+
+Every Gemini call is replaced by a stub that waits a fixed latency, so the
+numbers measure how many conversations one worker can keep waiting on the
+LLM at once, not the model. Each run starts N sessions concurrently, then
+sends one /yasmine turn to every session concurrently, in-process through
+httpx's ASGITransport.
+
+Two stubs are compared:
+  async       the stub awaits asyncio.sleep — the async endpoints as they are
+  threadpool  the stub blocks a worker thread from anyio's default pool
+              (40 threads), as the former sync endpoints did through
+              Starlette's run_in_threadpool
+
+    python -m loadtest 400 0.5     # conversations, stub latency in seconds
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+_STUB_REPLY = "Ahla! Tell me who you are travelling with and what kind of trip you dream of."
+_STUB_PREFERENCES = '{"style": "beach", "companions": "couple", "budget": "mid-range", "duration_days": 4, "interests": []}'
+
+
+def _stub_client(latency: float, blocking: bool):
+    """A genai.Client stand-in whose every call takes latency seconds."""
+    import anyio
+
+    def text_for(config) -> str:
+        instruction = (config.system_instruction or "") if config is not None else ""
+        return _STUB_PREFERENCES if "extract" in instruction else _STUB_REPLY
+
+    def generate_content(model=None, contents=None, config=None):
+        time.sleep(latency)
+        return SimpleNamespace(text=text_for(config))
+
+    async def agenerate_content(model=None, contents=None, config=None):
+        if blocking:
+            await anyio.to_thread.run_sync(time.sleep, latency)
+        else:
+            await asyncio.sleep(latency)
+        return SimpleNamespace(text=text_for(config))
+
+    async def agenerate_content_stream(**kwargs):
+        response = await agenerate_content(**kwargs)
+
+        async def chunks():
+            yield response
+        return chunks()
+
+    async def aclose():
+        pass
+
+    class StubClient:
+        def __init__(self, *args, **kwargs):
+            self.models = SimpleNamespace(generate_content=generate_content)
+            self.aio = SimpleNamespace(
+                models=SimpleNamespace(generate_content=agenerate_content,
+                                       generate_content_stream=agenerate_content_stream),
+                aclose=aclose,
+            )
+
+        def close(self):
+            pass
+
+    return StubClient
+
+
+def _percentile(values: list[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+async def _timed(request) -> tuple[float, object]:
+    start = time.perf_counter()
+    response = await request
+    return time.perf_counter() - start, response
+
+
+async def _run(app, conversations: int) -> dict:
+    import httpx
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=None) as http:
+        results = {}
+        start = time.perf_counter()
+        started = await asyncio.gather(*(_timed(http.post("/session/start")) for _ in range(conversations)))
+        results["/session/start"] = (time.perf_counter() - start, started)
+
+        session_ids = [response.json()["session_id"] for _, response in started if response.status_code == 200]
+        start = time.perf_counter()
+        turns = await asyncio.gather(*(
+            _timed(http.post("/yasmine", json={"session_id": session_id, "message": "a couple, beach and good food"}))
+            for session_id in session_ids
+        ))
+        results["/yasmine"] = (time.perf_counter() - start, turns)
+    return results
+
+
+def benchmark(conversations: int, latency: float):
+    directory = tempfile.mkdtemp(prefix="chouchane-loadtest-")
+    os.environ["CHOUCHANE_SESSIONS_DB"] = os.path.join(directory, "sessions.db")
+    os.environ["CHOUCHANE_SESSION_ARCHIVE_DIR"] = os.path.join(directory, "session_archive")
+    os.environ["CHOUCHANE_GREETING_POOL_SIZE"] = "0"
+
+    import agent.clients as clients
+    import api
+
+    print(f"{conversations} conversations, stub latency {latency * 1000:.0f} ms per Gemini call")
+    for mode in ("async", "threadpool"):
+        stub = _stub_client(latency, blocking=mode == "threadpool")
+        clients.genai.Client = stub
+        clients._clients.clear()
+        api.gemini_client = api.history_compactor.client = stub()
+
+        for endpoint, (elapsed, timed) in asyncio.run(_run(api.app, conversations)).items():
+            latencies = [seconds for seconds, _ in timed]
+            failed = sum(response.status_code != 200 for _, response in timed)
+            print(f"  {mode:<10} {endpoint:<15} {len(timed) / elapsed:8.1f} req/s | wall {elapsed:6.2f} s | "
+                  f"p50 {_percentile(latencies, 0.5):6.2f} s | p95 {_percentile(latencies, 0.95):6.2f} s"
+                  + (f" | {failed} failed" if failed else ""))
+    api.session_store.close()
+
+
+if __name__ == "__main__":
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 400,
+              float(sys.argv[2]) if len(sys.argv) > 2 else 0.5)
@@ -23,9 +23,8 @@ import re
 from agent.conversation import TunisiaTourismAgent
 from config.settings import API_KEY, GEMINI_MODEL
 from config.content import WELCOMING
-from data.quiz_db import QUIZ_DATA
-
-data = QUIZ_DATA
+from catalog.records import QuizQuestion
+from catalog.store import current_catalog
 
 # ─────────────────────────────────────────────────────────────────
 # TUNISIA Q&A SYSTEM PROMPT
@@ -48,16 +47,8 @@ Do not use markdown, asterisks, or emojis.
 # HELPER — find quiz question for a chosen place
 # ─────────────────────────────────────────────────────────────────
 
-def get_quiz_for_place(place_name: str) -> Optional[dict]:
-    place_lower = place_name.lower()
-    for q in data:
-        if q["destination"].lower() in place_lower or place_lower in q["destination"].lower():
-            return q
-    first_word = place_lower.split()[0]
-    for q in data:
-        if first_word in q["destination"].lower():
-            return q
-    return None
+def get_quiz_for_place(place_name: str) -> Optional[QuizQuestion]:
+    return current_catalog().records.quiz_for(place_name)
 
 # ─────────────────────────────────────────────────────────────────
 # SHARED STATE
@@ -124,19 +115,19 @@ def rag_loader_node(state: AppState) -> AppState:
 
     msg = (
         f"\n{'═' * 55}\n"
-        f"  QUIZ TIME!  |  {q['destination']}\n"
+        f"  QUIZ TIME!  |  {q.destination}\n"
         f"{'═' * 55}\n\n"
-        f"  {q['question']}\n\n"
+        f"  {q.question}\n\n"
         f"  Type your answer, or type 'hint' for a clue.\n"
-        f"  (You have {len(q['hints'])} hint(s) available)\n"
+        f"  (You have {len(q.hints)} hint(s) available)\n"
     )
 
     return {
         **state,
-        "destination":    q["destination"],
-        "question":       q["question"],
-        "hints":          q["hints"],
-        "correct_answer": q["answer"],
+        "destination":    q.destination,
+        "question":       q.question,
+        "hints":          list(q.hints),
+        "correct_answer": q.answer,
         "hints_used":     0,
         "waiting_for":    "hint_or_answer",
         "quiz_message":   msg,
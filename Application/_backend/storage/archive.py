@@ -0,0 +1,100 @@
+"""
+Cold storage for finished sessions.
+
+Sessions are appended to zlib-compressed, append-only segment files:
+
+    segment-00001.log, segment-00002.log, ...
+
+Each record is a fixed header (session_id length, payload length), the
+UTF-8 session_id and the compressed JSON payload. Records are never
+rewritten; a new segment is started once the current one passes
+segment_bytes. The in-memory index (session_id → segment, offset) is
+rebuilt at startup by walking the headers, without decompressing anything.
+"""
+
+import json
+import struct
+import threading
+import zlib
+from pathlib import Path
+
+_HEADER = struct.Struct(">HI")
+
+
+class SessionArchive:
+    def __init__(self, directory: Path | str, segment_bytes: int = 64 * 1024 * 1024):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.segment_bytes = segment_bytes
+        self._lock = threading.Lock()
+        self._index: dict[str, tuple[Path, int, int]] = {}  # session_id -> (segment, offset, length)
+        self._segments = sorted(self.directory.glob("segment-*.log"))
+        for segment in self._segments:
+            self._scan(segment)
+
+    def append(self, session_id: str, data: dict):
+        """Append a session snapshot. A later append for the same id supersedes earlier ones."""
+        payload = zlib.compress(json.dumps(
+            {k: v for k, v in data.items() if k != "version"}, ensure_ascii=False
+        ).encode("utf-8"))
+        key = session_id.encode("utf-8")
+        record = _HEADER.pack(len(key), len(payload)) + key + payload
+
+        with self._lock:
+            segment = self._current_segment()
+            with segment.open("ab") as f:
+                offset = f.tell()
+                f.write(record)
+                f.flush()
+            self._index[session_id] = (segment, offset + _HEADER.size + len(key), len(payload))
+
+    def get(self, session_id: str) -> dict | None:
+        with self._lock:
+            location = self._index.get(session_id)
+        if location is None:
+            return None
+        segment, offset, length = location
+        with segment.open("rb") as f:
+            f.seek(offset)
+            return json.loads(zlib.decompress(f.read(length)))
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._index
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "sessions": len(self._index),
+                "segments": len(self._segments),
+                "bytes": sum(s.stat().st_size for s in self._segments),
+            }
+
+    def _current_segment(self) -> Path:
+        # Caller holds _lock
+        if not self._segments or self._segments[-1].stat().st_size >= self.segment_bytes:
+            number = int(self._segments[-1].stem.split("-")[1]) + 1 if self._segments else 1
+            segment = self.directory / f"segment-{number:05d}.log"
+            segment.touch()
+            self._segments.append(segment)
+        return self._segments[-1]
+
+    def _scan(self, segment: Path):
+        size = segment.stat().st_size
+        good = 0
+        with segment.open("rb") as f:
+            while True:
+                header = f.read(_HEADER.size)
+                if len(header) < _HEADER.size:
+                    break
+                key_len, payload_len = _HEADER.unpack(header)
+                key = f.read(key_len)
+                offset = f.tell()
+                if len(key) < key_len or offset + payload_len > size:
+                    break
+                f.seek(payload_len, 1)
+                good = f.tell()
+                self._index[key.decode("utf-8")] = (segment, offset, payload_len)
+        if good < size:
+            # Torn write from a crash — cut it off so new records stay reachable
+            with segment.open("r+b") as f:
+                f.truncate(good)
@@ -0,0 +1,250 @@
+"""
+In-process LRU cache with write-behind persistence in front of a SessionStore.
+
+Hot sessions are served from memory and writes only mark them dirty. A
+background thread flushes dirty sessions every flush_interval seconds,
+evicted or expired sessions are flushed before they are dropped, and
+close() flushes everything that is left.
+
+The cache is the source of truth for the sessions it holds, so a
+deployment using it must route every request for a session to the same
+worker process.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from storage.sessions import SessionStore, VersionConflict
+
+log = logging.getLogger(__name__)
+
+
+class _Entry:
+    __slots__ = ("data", "version", "dirty", "last_access", "written_at")
+
+    def __init__(self, data: dict, version: int, dirty: bool):
+        self.data = data
+        self.version = version
+        self.dirty = dirty
+        self.last_access = time.monotonic()
+        self.written_at = time.time() if dirty else 0.0
+
+
+class CachedSessionStore(SessionStore):
+    def __init__(self, backend: SessionStore, max_size: int = 1024, ttl: float = 1800.0,
+                 flush_interval: float = 2.0):
+        self.backend = backend
+        self.max_size = max_size
+        self.ttl = ttl
+        self.flush_interval = flush_interval
+
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._pending: dict[str, _Entry] = {}  # dropped, backend write still in progress
+        self._lock = threading.Lock()        # guards _entries and counters
+        self._flush_lock = threading.Lock()  # serializes every write to the backend
+        self._counters = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0,
+                          "flushes": 0, "flush_errors": 0}
+
+        self._stop = threading.Event()
+        self._flusher = threading.Thread(target=self._flush_loop, name="session-flusher", daemon=True)
+        self._flusher.start()
+
+    # ── SessionStore interface ───────────────────────────────────────────────
+
+    def get(self, session_id: str) -> dict | None:
+        hit = self._get_cached(session_id)
+        if hit is not None:
+            return hit
+        return self._load(session_id)
+
+    async def aget(self, session_id: str) -> dict | None:
+        # Hits never leave the event loop; only misses touch the backend
+        hit = self._get_cached(session_id)
+        if hit is not None:
+            return hit
+        return await asyncio.to_thread(self._load, session_id)
+
+    async def aput(self, session_id: str, data: dict, expected_version: int | None = None) -> int:
+        with self._lock:
+            cached = self._lookup(session_id) is not None
+            full = len(self._entries) >= self.max_size
+        if not cached and (full or expected_version not in (None, 0)):
+            # Needs the backend (version check or a flushing eviction)
+            return await asyncio.to_thread(self.put, session_id, data, expected_version)
+        return self.put(session_id, data, expected_version)
+
+    def _get_cached(self, session_id: str) -> dict | None:
+        with self._lock:
+            entry = self._lookup(session_id)
+            if entry is not None and not self._expired(entry):
+                self._counters["hits"] += 1
+                entry.last_access = time.monotonic()
+                self._entries.move_to_end(session_id)
+                return {**entry.data, "version": entry.version}
+            self._counters["misses"] += 1
+        return None
+
+    def _load(self, session_id: str) -> dict | None:
+        with self._lock:
+            entry = self._entries.get(session_id)
+        if entry is not None:
+            self._drop(session_id, "expirations")
+
+        data = self.backend.get(session_id)
+        if data is None:
+            return None
+        with self._lock:
+            # Another thread may have loaded (and even modified) it meanwhile
+            entry = self._lookup(session_id)
+            if entry is None:
+                entry = _Entry(data, data["version"], dirty=False)
+                self._entries[session_id] = entry
+            self._entries.move_to_end(session_id)
+            result = {**entry.data, "version": entry.version}
+        self._evict_overflow()
+        return result
+
+    def put(self, session_id: str, data: dict, expected_version: int | None = None,
+            version: int | None = None, updated_at: float | None = None) -> int:
+        with self._lock:
+            entry = self._lookup(session_id)
+        if entry is None and expected_version not in (None, 0):
+            # Not cached (evicted mid-turn): check against the persisted copy
+            self.get(session_id)
+
+        with self._lock:
+            entry = self._lookup(session_id)
+            current = entry.version if entry is not None else None
+            if expected_version is not None and expected_version != (current or 0):
+                raise VersionConflict(session_id, expected_version, current)
+
+            new_version = version if version is not None else (current or 0) + 1
+            stored = {k: v for k, v in data.items() if k != "version"}
+            if entry is None:
+                entry = _Entry(stored, new_version, dirty=True)
+                self._entries[session_id] = entry
+            else:
+                entry.data, entry.version, entry.dirty = stored, new_version, True
+                entry.last_access = time.monotonic()
+            entry.written_at = time.time() if updated_at is None else updated_at
+            self._entries.move_to_end(session_id)
+
+        data["version"] = new_version
+        self._evict_overflow()
+        return new_version
+
+    def delete(self, session_id: str):
+        with self._flush_lock:
+            with self._lock:
+                self._entries.pop(session_id, None)
+                self._pending.pop(session_id, None)
+            self.backend.delete(session_id)
+
+    def idle_sessions(self, before: float) -> list[tuple[str, bool]]:
+        self.flush()
+        return self.backend.idle_sessions(before)
+
+    def last_write(self, session_id: str) -> float | None:
+        with self._lock:
+            entry = self._entries.get(session_id) or self._pending.get(session_id)
+        if entry is not None and entry.dirty:
+            return entry.written_at
+        return self.backend.last_write(session_id)
+
+    def compact(self):
+        self.backend.compact()
+
+    def close(self):
+        self._stop.set()
+        self._flusher.join(timeout=self.flush_interval + 5)
+        self.flush()
+        self.backend.close()
+
+    # ── Write-behind ─────────────────────────────────────────────────────────
+
+    def flush(self):
+        """Write every dirty session to the backend and drop expired ones."""
+        with self._flush_lock:
+            with self._lock:
+                dirty = []
+                for session_id, entry in self._entries.items():
+                    if entry.dirty:
+                        entry.dirty = False
+                        dirty.append((session_id, entry, entry.data, entry.version, entry.written_at))
+            for session_id, entry, data, version, written_at in dirty:
+                self._write(session_id, entry, data, version, written_at)
+
+        with self._lock:
+            expired = [sid for sid, entry in self._entries.items() if self._expired(entry)]
+        for session_id in expired:
+            self._drop(session_id, "expirations")
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                **self._counters,
+                "size": len(self._entries),
+                "dirty": sum(1 for e in self._entries.values() if e.dirty),
+                "max_size": self.max_size,
+                "ttl": self.ttl,
+            }
+
+    def _flush_loop(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def _write(self, session_id: str, entry: _Entry, data: dict, version: int, written_at: float):
+        # Caller holds _flush_lock. A failed write leaves the entry dirty for the next flush.
+        try:
+            self.backend.put(session_id, dict(data), version=version, updated_at=written_at)
+        except Exception:
+            log.exception("Failed to flush session %s", session_id)
+            with self._lock:
+                self._counters["flush_errors"] += 1
+                entry.dirty = True
+                self._entries.setdefault(session_id, entry)
+            return
+        with self._lock:
+            self._counters["flushes"] += 1
+
+    def _lookup(self, session_id: str) -> _Entry | None:
+        # Caller holds _lock. Entries that are being flushed out are put back.
+        entry = self._entries.get(session_id)
+        if entry is None:
+            entry = self._pending.get(session_id)
+            if entry is not None:
+                self._entries[session_id] = entry
+        return entry
+
+    def _drop(self, session_id: str, counter: str):
+        """Flush a session if needed and remove it from the cache."""
+        with self._flush_lock:
+            with self._lock:
+                entry = self._entries.get(session_id)
+                if entry is None:
+                    return
+                if counter == "expirations" and not self._expired(entry):
+                    return  # touched again since it was picked
+                del self._entries[session_id]
+                self._counters[counter] += 1
+                dirty, entry.dirty = entry.dirty, False
+                if dirty:
+                    self._pending[session_id] = entry
+            if dirty:
+                self._write(session_id, entry, entry.data, entry.version, entry.written_at)
+                with self._lock:
+                    self._pending.pop(session_id, None)
+
+    def _evict_overflow(self):
+        while True:
+            with self._lock:
+                if len(self._entries) <= self.max_size:
+                    return
+                session_id = next(iter(self._entries))
+            self._drop(session_id, "evictions")
+
+    def _expired(self, entry: _Entry) -> bool:
+        return self.ttl > 0 and time.monotonic() - entry.last_access > self.ttl
@@ -0,0 +1,83 @@
+"""
+Background expiry of idle sessions.
+
+Every sweep_interval seconds:
+  - finished sessions (yasmine_done) idle for archive_after seconds are
+    moved to the SessionArchive and removed from the live store
+  - unfinished sessions idle for idle_ttl seconds are deleted
+  - the store compacts its turn journal into fresh snapshots
+
+Each session is handled under its SessionLocks lock, so a sweep never
+races an in-flight turn; busy sessions are simply left for the next sweep.
+"""
+
+import logging
+import threading
+import time
+
+from storage.archive import SessionArchive
+from storage.locks import SessionBusy, SessionLocks
+from storage.sessions import SessionStore
+
+log = logging.getLogger(__name__)
+
+
+class SessionExpiry:
+    def __init__(self, store: SessionStore, archive: SessionArchive, locks: SessionLocks,
+                 idle_ttl: float, archive_after: float, sweep_interval: float = 300.0):
+        self.store = store
+        self.archive = archive
+        self.locks = locks
+        self.idle_ttl = idle_ttl
+        self.archive_after = archive_after
+        self.sweep_interval = sweep_interval
+        self._counters = {"sweeps": 0, "archived": 0, "expired": 0}
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._loop, name="session-expiry", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=30)
+
+    def sweep(self, now: float | None = None):
+        """Run one expiry pass."""
+        now = time.time() if now is None else now
+        archive_before = now - self.archive_after
+        expire_before = now - self.idle_ttl
+
+        for session_id, done in self.store.idle_sessions(max(archive_before, expire_before)):
+            cutoff = archive_before if done else expire_before
+            try:
+                with self.locks.hold(session_id, timeout=0):
+                    # Re-check under the lock: a turn may have finished since the scan
+                    last_write = self.store.last_write(session_id)
+                    if last_write is None or last_write >= cutoff:
+                        continue
+                    if done:
+                        data = self.store.get(session_id)
+                        if data is None:
+                            continue
+                        self.archive.append(session_id, data)
+                        self._counters["archived"] += 1
+                    else:
+                        self._counters["expired"] += 1
+                    self.store.delete(session_id)
+            except SessionBusy:
+                continue
+        self.store.compact()
+        self._counters["sweeps"] += 1
+
+    def stats(self) -> dict:
+        return {**self._counters, **self.archive.stats()}
+
+    def _loop(self):
+        while not self._stop.wait(self.sweep_interval):
+            try:
+                self.sweep()
+            except Exception:
+                log.exception("Session expiry sweep failed")
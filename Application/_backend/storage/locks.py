@@ -0,0 +1,81 @@
+"""
+Per-session mutual exclusion.
+
+A turn holds its session's lock for the whole load → LLM → persist cycle,
+so two requests for the same session can never interleave. Locks for
+different sessions are independent, and a lock is dropped from the
+registry as soon as nobody holds or waits for it.
+
+The locks are plain threading locks so background threads and request
+handlers share them; ahold() acquires them without blocking the event loop.
+"""
+
+import asyncio
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+
+
+class SessionBusy(Exception):
+    """Another request is already working on this session."""
+
+
+class SessionLocks:
+    def __init__(self, timeout: float = 0.0):
+        self.timeout = timeout
+        self._guard = threading.Lock()
+        self._locks: dict[str, list] = {}   # session_id -> [lock, users]
+
+    @contextmanager
+    def hold(self, session_id: str, timeout: float | None = None):
+        """
+        Hold the lock for session_id for the duration of the block.
+        Raises SessionBusy if it cannot be acquired within timeout seconds
+        (self.timeout by default).
+        """
+        timeout = self.timeout if timeout is None else timeout
+        entry = self._enter(session_id)
+        acquired = entry[0].acquire(timeout=timeout) if timeout > 0 else entry[0].acquire(blocking=False)
+        try:
+            if not acquired:
+                raise SessionBusy(session_id)
+            yield
+        finally:
+            self._exit(session_id, entry, acquired)
+
+    @asynccontextmanager
+    async def ahold(self, session_id: str, timeout: float | None = None):
+        """Async variant of hold(): waits by polling so the event loop keeps running."""
+        timeout = self.timeout if timeout is None else timeout
+        entry = self._enter(session_id)
+        deadline = time.monotonic() + timeout
+        acquired = entry[0].acquire(blocking=False)
+        try:
+            while not acquired and time.monotonic() < deadline:
+                await asyncio.sleep(0.01)
+                acquired = entry[0].acquire(blocking=False)
+            if not acquired:
+                raise SessionBusy(session_id)
+            yield
+        finally:
+            self._exit(session_id, entry, acquired)
+
+    def busy(self, session_id: str) -> bool:
+        """Whether a turn currently holds session_id (a hint — it may change right after)."""
+        with self._guard:
+            entry = self._locks.get(session_id)
+        return entry is not None and entry[0].locked()
+
+    def _enter(self, session_id: str) -> list:
+        with self._guard:
+            entry = self._locks.setdefault(session_id, [threading.Lock(), 0])
+            entry[1] += 1
+            return entry
+
+    def _exit(self, session_id: str, entry: list, acquired: bool):
+        if acquired:
+            entry[0].release()
+        with self._guard:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._locks[session_id]
@@ -0,0 +1,43 @@
+"""
+Import a legacy JSON session file into the SQLite session store.
+
+Usage:
+    python -m storage.migrate [chouchane_sessions.json] [--db chouchane_sessions.db]
+
+Existing rows with the same session_id are overwritten, so the import
+can be re-run safely.
+"""
+
+import argparse
+import json
+from pathlib import Path
+
+from config.settings import SESSIONS_DB_PATH
+from storage.sessions import SQLiteSessionStore
+
+
+def migrate_json_file(json_path: Path, store: SQLiteSessionStore) -> int:
+    """Copy every session from json_path into store. Returns the number imported."""
+    sessions = json.loads(Path(json_path).read_text(encoding="utf-8"))
+    for session_id, data in sessions.items():
+        data.setdefault("session_id", session_id)
+        # Sessions written before the yasmine_done flag existed
+        data.setdefault("yasmine_done", bool(data.get("yasmine_partners_shown")))
+    store.put_many(sessions)
+    return len(sessions)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import JSON sessions into the SQLite session store.")
+    parser.add_argument("json_path", nargs="?", default="chouchane_sessions.json")
+    parser.add_argument("--db", default=str(SESSIONS_DB_PATH))
+    args = parser.parse_args()
+
+    store = SQLiteSessionStore(args.db)
+    imported = migrate_json_file(Path(args.json_path), store)
+    print(f"Imported {imported} sessions into {args.db} ({store.count()} total).")
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,445 @@
+"""
+Session persistence for the Chouchane API.
+
+SessionStore is the interface api.py talks to: one session dict in,
+one session dict out, addressed by session_id. SQLiteSessionStore is the
+default backend — an embedded SQLite database in WAL mode where every
+session is its own row, so a turn only reads and writes that row.
+
+Every stored session carries a "version" counter. A write that passes
+expected_version only succeeds if nobody else wrote the session in the
+meantime; otherwise VersionConflict is raised and nothing is changed.
+
+History turns are journaled: when a write only appends to yasmine_history
+or qa_history, the new turns go to the session_turns table and the row
+keeps just the small non-history state. Large non-history fields (the RAG
+context, rankings, summaries) go to session_fields and are only rewritten
+when they change. Full snapshots are rebuilt by compact(), so a turn's
+write cost does not grow with the conversation.
+"""
+
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+# Session fields journaled turn by turn, and the phase each belongs to
+HISTORY_FIELDS = {"yasmine_history": "yasmine", "qa_history": "qa"}
+# Between snapshots, other fields whose JSON is at least this long are kept in
+# session_fields and only written when they change
+DETACH_BYTES = 256
+
+
+def _dumps(data: dict) -> str:
+    # The version lives in its own column, not in the JSON blob
+    return json.dumps({k: v for k, v in data.items() if k != "version"}, ensure_ascii=False)
+
+
+def _hash(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def _chain(turns: list, digest: str = "") -> str:
+    """Rolling hash of a history: each turn is hashed together with the digest of the turns before it."""
+    for turn in turns:
+        digest = _hash(digest + json.dumps(turn, ensure_ascii=False, sort_keys=True))
+    return digest
+
+
+def _tails(data: dict) -> dict:
+    """{field: [length, rolling hash of the whole history]} — enough to tell an append from a rewrite."""
+    return {
+        field: [len(data[field]), _chain(data[field])]
+        for field in HISTORY_FIELDS if isinstance(data.get(field), list)
+    }
+
+
+def _appended_turns(data: dict, tails: dict | None) -> dict[str, list] | None:
+    """
+    The turns data adds on top of what tails describes, per history field,
+    or None if data is not a pure append (reset, rewritten or unknown history).
+    """
+    if tails is None:
+        return None
+    appended = {}
+    for field in HISTORY_FIELDS:
+        history = data.get(field)
+        if field not in tails:
+            if history is None:
+                continue
+            return None
+        if not isinstance(history, list):
+            return None
+        length, digest = tails[field]
+        if len(history) < length or _chain(history[:length]) != digest:
+            return None
+        new = history[length:]
+        if any(set(turn) != {"role", "text"} for turn in new):
+            return None
+        appended[field] = new
+    return appended
+
+
+class VersionConflict(Exception):
+    """The session was written by someone else since it was read."""
+
+    def __init__(self, session_id: str, expected: int | None, actual: int | None):
+        super().__init__(f"Session '{session_id}' is at version {actual}, expected {expected}.")
+        self.session_id = session_id
+        self.expected = expected
+        self.actual = actual
+
+
+class SessionStore:
+    """Key-value store of session dicts, addressed by session_id."""
+
+    def get(self, session_id: str) -> dict | None:
+        """Return the session dict (with its "version"), or None if it does not exist."""
+        raise NotImplementedError
+
+    def put(self, session_id: str, data: dict, expected_version: int | None = None,
+            version: int | None = None, updated_at: float | None = None) -> int:
+        """
+        Insert or replace a session and return its new version, which is
+        also written back into data["version"].
+
+        expected_version=None writes unconditionally; 0 means "must not
+        exist yet"; any other value must match the stored version.
+        version and updated_at pin the stored version and write time instead
+        of incrementing / using now (for caching layers that write behind).
+        """
+        raise NotImplementedError
+
+    def delete(self, session_id: str):
+        """Remove a session. Missing sessions are ignored."""
+        raise NotImplementedError
+
+    def idle_sessions(self, before: float) -> list[tuple[str, bool]]:
+        """(session_id, yasmine_done) for every session last written before the given epoch time."""
+        raise NotImplementedError
+
+    def last_write(self, session_id: str) -> float | None:
+        """Epoch time of the last write to a session, or None if it does not exist."""
+        raise NotImplementedError
+
+    def compact(self):
+        """Fold journaled writes back into full snapshots. Optional."""
+
+    # Async variants for the event loop. By default they run the blocking
+    # call on a worker thread; stores that can answer from memory override them.
+
+    async def aget(self, session_id: str) -> dict | None:
+        return await asyncio.to_thread(self.get, session_id)
+
+    async def aput(self, session_id: str, data: dict, expected_version: int | None = None) -> int:
+        return await asyncio.to_thread(self.put, session_id, data, expected_version)
+
+    async def adelete(self, session_id: str):
+        await asyncio.to_thread(self.delete, session_id)
+
+    def close(self):
+        pass
+
+
+class SQLiteSessionStore(SessionStore):
+    """
+    One row per session in an SQLite database running in WAL mode.
+
+    Readers never block the writer and each write is a single-row
+    transaction, so the cost of a turn no longer depends on how many
+    sessions exist. Connections are kept per thread: the async endpoints
+    reach the store from asyncio.to_thread executor threads, and the
+    flusher and expiry sweeps from their own. close() closes all of them.
+
+    Row layout:
+      data        — full session snapshot as of the last rewrite/compaction
+      state       — NULL, or the latest session with each history list
+                    replaced by its length (when turns are journaled)
+      tails       — length and rolling hash of each history field, and under
+                    "detached" the hash of each field kept in session_fields
+      journal_len — turns in session_turns not yet folded into data
+    """
+
+    def __init__(self, path: Path | str, compact_after: int = 50):
+        self.path = Path(path)
+        self.compact_after = compact_after
+        self._local = threading.local()
+        self._connections: list[sqlite3.Connection] = []   # every thread's, for close()
+        self._connections_lock = threading.Lock()
+        self._init_schema()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Only its own thread uses it; close() may close it from another one
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def _init_schema(self):
+        conn = self._conn()
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS sessions (
+                session_id  TEXT PRIMARY KEY,
+                data        TEXT NOT NULL,
+                updated_at  REAL NOT NULL,
+                version     INTEGER NOT NULL DEFAULT 1,
+                state       TEXT,
+                tails       TEXT,
+                journal_len INTEGER NOT NULL DEFAULT 0
+            )
+            """
+        )
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(sessions)")}
+        if "version" not in columns:
+            conn.execute("ALTER TABLE sessions ADD COLUMN version INTEGER NOT NULL DEFAULT 1")
+        if "state" not in columns:
+            conn.execute("ALTER TABLE sessions ADD COLUMN state TEXT")
+            conn.execute("ALTER TABLE sessions ADD COLUMN tails TEXT")
+            conn.execute("ALTER TABLE sessions ADD COLUMN journal_len INTEGER NOT NULL DEFAULT 0")
+        conn.execute("CREATE INDEX IF NOT EXISTS sessions_updated_at ON sessions (updated_at)")
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS session_turns (
+                session_id TEXT NOT NULL,
+                seq        INTEGER NOT NULL,
+                field      TEXT NOT NULL,
+                role       TEXT NOT NULL,
+                text       TEXT NOT NULL,
+                phase      TEXT NOT NULL,
+                ts         REAL NOT NULL,
+                PRIMARY KEY (session_id, seq)
+            ) WITHOUT ROWID
+            """
+        )
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS session_fields (
+                session_id TEXT NOT NULL,
+                field      TEXT NOT NULL,
+                value      TEXT NOT NULL,
+                PRIMARY KEY (session_id, field)
+            ) WITHOUT ROWID
+            """
+        )
+
+    def get(self, session_id: str) -> dict | None:
+        conn = self._conn()
+        row = conn.execute(
+            "SELECT data, version, state, tails FROM sessions WHERE session_id = ?", (session_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        data = json.loads(row[0])
+        if row[2] is not None:
+            data = self._replay(conn, session_id, data, json.loads(row[2]), json.loads(row[3] or "{}"))
+        data["version"] = row[1]
+        return data
+
+    def _replay(self, conn: sqlite3.Connection, session_id: str, snapshot: dict, state: dict,
+                tails: dict) -> dict:
+        """Rebuild the session from its snapshot, latest state, detached fields and journaled turns."""
+        histories = {
+            field: list(snapshot.get(field, []))
+            for field in HISTORY_FIELDS if isinstance(state.get(field), int)
+        }
+        for field, role, text in conn.execute(
+            "SELECT field, role, text FROM session_turns WHERE session_id = ? ORDER BY seq",
+            (session_id,),
+        ):
+            histories[field].append({"role": role, "text": text})
+        detached = {}
+        if tails.get("detached"):
+            detached = {
+                field: json.loads(value) for field, value in conn.execute(
+                    "SELECT field, value FROM session_fields WHERE session_id = ?", (session_id,)
+                )
+            }
+        # state keeps the key order; its history entries are only lengths, detached ones None
+        return {
+            key: histories[key][:value] if key in histories else detached[key] if key in detached else value
+            for key, value in state.items()
+        }
+
+    def put(self, session_id: str, data: dict, expected_version: int | None = None,
+            version: int | None = None, updated_at: float | None = None) -> int:
+        now = time.time() if updated_at is None else updated_at
+
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT version, tails, journal_len FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+            current = row[0] if row else None
+            if expected_version is not None and expected_version != (current or 0):
+                raise VersionConflict(session_id, expected_version, current)
+            new_version = version if version is not None else (current or 0) + 1
+
+            tails = json.loads(row[1]) if row and row[1] else None
+            appended = _appended_turns(data, tails)
+            if appended is None:
+                self._write_snapshot(conn, session_id, data, now, new_version)
+            else:
+                self._append(conn, session_id, data, appended, tails, row[2], now, new_version)
+
+        data["version"] = new_version
+        return new_version
+
+    def _write_snapshot(self, conn: sqlite3.Connection, session_id: str, data: dict,
+                        now: float, version: int):
+        conn.execute("DELETE FROM session_turns WHERE session_id = ?", (session_id,))
+        conn.execute("DELETE FROM session_fields WHERE session_id = ?", (session_id,))
+        conn.execute(
+            """
+            INSERT INTO sessions (session_id, data, updated_at, version, state, tails, journal_len)
+            VALUES (?, ?, ?, ?, NULL, ?, 0)
+            ON CONFLICT(session_id) DO UPDATE SET
+                data = excluded.data, updated_at = excluded.updated_at, version = excluded.version,
+                state = NULL, tails = excluded.tails, journal_len = 0
+            """,
+            (session_id, _dumps(data), now, version, json.dumps(_tails(data))),
+        )
+
+    def _append(self, conn: sqlite3.Connection, session_id: str, data: dict, appended: dict[str, list],
+                tails: dict, journal_len: int, now: float, version: int):
+        turns = [
+            (field, turn) for field, new in appended.items() for turn in new
+        ]
+        conn.executemany(
+            """
+            INSERT INTO session_turns (session_id, seq, field, role, text, phase, ts)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            [
+                (session_id, journal_len + i, field, turn["role"], turn["text"], HISTORY_FIELDS[field], now)
+                for i, (field, turn) in enumerate(turns)
+            ],
+        )
+        new_tails = {field: [len(data[field]), _chain(new, tails[field][1])] for field, new in appended.items()}
+
+        # Large fields live in session_fields and are only rewritten when they change
+        stored = tails.get("detached", {})
+        state, detached, changed = {}, {}, []
+        for key, value in data.items():
+            if key == "version":
+                continue
+            if key in HISTORY_FIELDS and isinstance(value, list):
+                state[key] = len(value)
+                continue
+            encoded = json.dumps(value, ensure_ascii=False)
+            if len(encoded) < DETACH_BYTES:
+                state[key] = value
+                continue
+            state[key] = None
+            detached[key] = _hash(encoded)
+            if stored.get(key) != detached[key]:
+                changed.append((session_id, key, encoded))
+        if changed:
+            conn.executemany(
+                "INSERT OR REPLACE INTO session_fields (session_id, field, value) VALUES (?, ?, ?)", changed
+            )
+        dropped = [(session_id, key) for key in stored if key not in detached]
+        if dropped:
+            conn.executemany("DELETE FROM session_fields WHERE session_id = ? AND field = ?", dropped)
+        if detached:
+            new_tails["detached"] = detached
+
+        conn.execute(
+            """
+            UPDATE sessions SET state = ?, tails = ?, journal_len = ?, updated_at = ?, version = ?
+            WHERE session_id = ?
+            """,
+            (json.dumps(state, ensure_ascii=False), json.dumps(new_tails),
+             journal_len + len(turns), now, version, session_id),
+        )
+
+    def compact(self, min_turns: int | None = None):
+        """Rewrite the snapshot of every session with at least min_turns journaled turns."""
+        min_turns = self.compact_after if min_turns is None else min_turns
+        session_ids = [
+            row[0] for row in self._conn().execute(
+                "SELECT session_id FROM sessions WHERE state IS NOT NULL AND journal_len >= ?",
+                (max(min_turns, 1),),
+            )
+        ]
+        for session_id in session_ids:
+            with self._transaction() as conn:
+                row = conn.execute(
+                    "SELECT data, state, tails FROM sessions WHERE session_id = ?", (session_id,)
+                ).fetchone()
+                if row is None or row[1] is None:
+                    continue
+                tails = json.loads(row[2] or "{}")
+                data = self._replay(conn, session_id, json.loads(row[0]), json.loads(row[1]), tails)
+                tails.pop("detached", None)
+                conn.execute("DELETE FROM session_turns WHERE session_id = ?", (session_id,))
+                conn.execute("DELETE FROM session_fields WHERE session_id = ?", (session_id,))
+                conn.execute(
+                    "UPDATE sessions SET data = ?, state = NULL, tails = ?, journal_len = 0 WHERE session_id = ?",
+                    (_dumps(data), json.dumps(tails), session_id),
+                )
+        return len(session_ids)
+
+    def put_many(self, sessions: dict[str, dict]):
+        """Insert or replace several sessions in a single transaction."""
+        now = time.time()
+        with self._transaction() as conn:
+            for session_id, data in sessions.items():
+                row = conn.execute(
+                    "SELECT version FROM sessions WHERE session_id = ?", (session_id,)
+                ).fetchone()
+                self._write_snapshot(conn, session_id, data, now, (row[0] if row else 0) + 1)
+
+    def delete(self, session_id: str):
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM session_turns WHERE session_id = ?", (session_id,))
+            conn.execute("DELETE FROM session_fields WHERE session_id = ?", (session_id,))
+            conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+
+    def idle_sessions(self, before: float) -> list[tuple[str, bool]]:
+        rows = self._conn().execute(
+            """
+            SELECT session_id, COALESCE(json_extract(state, '$.yasmine_done'),
+                                        json_extract(data, '$.yasmine_done'), 0)
+            FROM sessions WHERE updated_at < ?
+            """,
+            (before,),
+        ).fetchall()
+        return [(session_id, bool(done)) for session_id, done in rows]
+
+    def last_write(self, session_id: str) -> float | None:
+        row = self._conn().execute(
+            "SELECT updated_at FROM sessions WHERE session_id = ?", (session_id,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def count(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+    def close(self):
+        """Close the connection of every thread that used the store (at shutdown)."""
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+            # Threads that touch the store afterwards open a fresh connection
+            self._local = threading.local()
+        for conn in connections:
+            conn.close()
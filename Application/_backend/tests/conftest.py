@@ -0,0 +1,118 @@
+"""
+Shared test setup.
+
+The API is imported against a throwaway session database and archive, with
+the greeting pool off and google-genai's Client replaced by FakeGemini, so
+the suite needs neither network access nor an API key.
+
+Run from Application/_backend:  python -m pytest -q
+"""
+
+import asyncio
+import json
+import os
+import pathlib
+import sys
+import tempfile
+from types import SimpleNamespace
+
+import pytest
+
+BACKEND_DIR = pathlib.Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+_tmp = pathlib.Path(tempfile.mkdtemp(prefix="chouchane-tests-"))
+os.environ["CHOUCHANE_SESSIONS_DB"] = str(_tmp / "sessions.db")
+os.environ["CHOUCHANE_SESSION_ARCHIVE_DIR"] = str(_tmp / "session_archive")
+os.environ["CHOUCHANE_GREETING_POOL_SIZE"] = "0"
+os.environ.setdefault("GEMINI_API_KEY", "test-key")
+
+PREFERENCES = {"style": "beach", "companions": "couple", "budget": "luxury", "duration_days": 4, "interests": ["beach"]}
+
+
+class FakeGemini:
+    """
+    Stands in for genai.Client. Behaviour is set on the class by the gemini
+    fixture, so the clients the API built at import time pick it up too.
+    """
+    reply = "Hello there, friend."
+    delay = 0.0               # seconds every async call takes
+    fail_after = None         # stream chunks sent before the stream raises
+    before_reply = None       # async hook awaited inside every async call
+    calls = 0
+    open_streams = 0          # streams started and not yet finished or closed
+
+    def __init__(self, *args, **kwargs):
+        self.models = SimpleNamespace(generate_content=self._generate)
+        self.aio = SimpleNamespace(
+            models=SimpleNamespace(generate_content=self._agenerate,
+                                   generate_content_stream=self._agenerate_stream),
+            aclose=self._aclose,
+        )
+
+    @classmethod
+    def reset(cls):
+        cls.reply, cls.delay, cls.fail_after, cls.before_reply = "Hello there, friend.", 0.0, None, None
+        cls.calls = cls.open_streams = 0
+
+    def _generate(self, model=None, contents=None, config=None):
+        type(self).calls += 1
+        instruction = (config.system_instruction or "") if config is not None else ""
+        if "extract" in instruction:
+            return SimpleNamespace(text=json.dumps(PREFERENCES))
+        return SimpleNamespace(text=self.reply)
+
+    async def _agenerate(self, **kwargs):
+        hook = type(self).before_reply
+        if hook is not None:
+            await hook()
+        await asyncio.sleep(self.delay)
+        return self._generate(**kwargs)
+
+    async def _agenerate_stream(self, **kwargs):
+        text = (await self._agenerate(**kwargs)).text
+        fail_after = self.fail_after
+
+        async def chunks():
+            type(self).open_streams += 1
+            try:
+                for i, start in enumerate(range(0, len(text), 4)):
+                    if fail_after is not None and i == fail_after:
+                        raise ConnectionError("upstream stream reset")
+                    yield SimpleNamespace(text=text[start:start + 4])
+            finally:
+                type(self).open_streams -= 1
+        return chunks()
+
+    async def _aclose(self):
+        pass
+
+    def close(self):
+        pass
+
+
+import agent.clients as clients  # noqa: E402
+
+clients.genai.Client = FakeGemini
+clients._clients.clear()
+
+import api  # noqa: E402
+
+
+@pytest.fixture
+def gemini():
+    FakeGemini.reset()
+    yield FakeGemini
+    FakeGemini.reset()
+
+
+def run(coroutine):
+    """Run a test coroutine on a fresh event loop."""
+    return asyncio.run(coroutine)
+
+
+def client():
+    """An HTTP client that calls the app in-process."""
+    import httpx
+
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=api.app), base_url="http://test")
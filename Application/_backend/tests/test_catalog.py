@@ -0,0 +1,88 @@
+"""The compiled catalog reads back exactly what was compiled, and a bad reload keeps the old catalog."""
+
+import json
+
+import pytest
+
+from catalog import store
+from catalog.compiled import CatalogFormatError, CompiledCatalog, fingerprint, plain, write_catalog
+
+EDGE_CASES = {
+    "scalars": {"none": None, "true": True, "false": False, "zero": 0, "negative": -3, "float": 2.5,
+                "big": 2 ** 40, "empty": "", "unicode": "Sidi Bou Saïd — سيدي بوسعيد"},
+    "empty": {"dict": {}, "list": []},
+    "nested": [[1, [2, [3]]], {"a": {"b": {"c": "d"}}}, ["repeated", "repeated"]],
+    "many keys": {f"key {i}": i for i in range(300)},
+}
+
+
+@pytest.mark.parametrize("content", [store.module_content(), EDGE_CASES], ids=["modules", "edge cases"])
+def test_compiled_catalog_round_trips(tmp_path, content):
+    path = tmp_path / "catalog.bin"
+    write_catalog(path, content)
+    compiled = CompiledCatalog(path)
+    assert plain(compiled.root) == json.loads(json.dumps(content))
+    assert list(compiled.root) == list(content)
+    assert compiled.fingerprint == fingerprint(content)
+
+
+def test_key_lookup_miss(tmp_path):
+    path = tmp_path / "catalog.bin"
+    write_catalog(path, EDGE_CASES)
+    root = CompiledCatalog(path).root
+    keys = root["many keys"]
+    assert all(keys[f"key {i}"] == i for i in range(300))
+    for missing in ("key 300", "key", "", "KEY 1", 1, None):
+        assert missing not in keys
+        assert keys.get(missing) is None
+    with pytest.raises(KeyError):
+        keys["key 300"]
+    with pytest.raises(KeyError):
+        root["empty"]["dict"]["anything"]
+
+
+def test_not_a_catalog(tmp_path):
+    path = tmp_path / "catalog.bin"
+    path.write_bytes(b"not a catalog" * 20)
+    with pytest.raises(CatalogFormatError):
+        CompiledCatalog(path)
+
+
+@pytest.fixture
+def builders():
+    """Builders registered in a test are unregistered after it."""
+    registered = list(store._builders)
+    yield
+    store._builders[:] = registered
+
+
+def test_reload_of_a_corrupt_file_keeps_the_old_catalog(tmp_path, builders):
+    before, committed = store.current_catalog(), []
+    store.on_reload(lambda catalog: lambda: committed.append(catalog))
+    path = tmp_path / "catalog.bin"
+    write_catalog(path, store.module_content())
+    path.write_bytes(path.read_bytes()[:200])
+
+    assert store.reload(path) is False
+    assert store.reload(tmp_path / "missing.bin") is False
+    assert store.current_catalog() is before
+    assert committed == []
+
+
+def test_reload_with_a_failing_builder_keeps_the_old_catalog(tmp_path, builders):
+    before, committed = store.current_catalog(), []
+    store.on_reload(lambda catalog: lambda: committed.append(catalog))
+
+    def failing(catalog):
+        raise ValueError("cannot index this catalog")
+
+    store.on_reload(failing)
+    path = tmp_path / "catalog.bin"
+    write_catalog(path, store.module_content())
+
+    failures = store.stats()["failed_reloads"]
+    assert store.reload(path) is False
+    assert store.stats()["failed_reloads"] == failures + 1
+    assert store.current_catalog() is before
+    # No builder's commit runs unless every builder succeeded
+    assert committed == []
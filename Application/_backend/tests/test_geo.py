@@ -0,0 +1,71 @@
+"""GeoIndex.nearby() returns exactly what a full scan finds."""
+
+import numpy as np
+import pytest
+
+from catalog.geo import GeoIndex, Point, _synthetic_points, catalog_points, haversine_km
+from catalog.store import current_catalog
+
+
+def _brute_force(points: list[Point], lat: float, lon: float, radius_km: float, k: int, kinds=None):
+    lats = np.array([p.lat for p in points])
+    lons = np.array([p.lon for p in points])
+    distances = haversine_km(lat, lon, lats, lons)
+    order = np.argsort(distances, kind="stable").tolist()
+    found = [(points[i], float(distances[i])) for i in order
+             if distances[i] <= radius_km and (kinds is None or points[i].kind in kinds)]
+    return found[:k]
+
+
+def _assert_same(got: list, expected: list):
+    assert [p.name for p, _ in got] == [p.name for p, _ in expected]
+    assert [d for _, d in got] == pytest.approx([d for _, d in expected])
+
+
+def _centers(count: int, lat_range: tuple, lon_range: tuple, seed: int = 3) -> list[tuple[float, float]]:
+    rng = np.random.default_rng(seed)
+    return list(zip(rng.uniform(*lat_range, count).tolist(), rng.uniform(*lon_range, count).tolist()))
+
+
+@pytest.mark.parametrize("cell_deg", [0.01, 0.05, 1.0])
+def test_synthetic_queries_match_a_full_scan(cell_deg):
+    points = _synthetic_points(20000)
+    index = GeoIndex(points, cell_deg=cell_deg)
+    # Includes centers outside the points' box
+    for lat, lon in _centers(25, (29.5, 38.0), (7.0, 12.0)):
+        for radius in (0.5, 5, 25, 150):
+            expected = _brute_force(points, lat, lon, radius, 60)
+            for k in (1, 10, 60):
+                _assert_same(index.nearby(lat, lon, radius, k), expected[:k])
+
+
+def test_kind_filter_matches_a_full_scan():
+    points = _synthetic_points(5000)
+    index = GeoIndex(points)
+    for lat, lon in _centers(40, (30.2, 37.5), (7.5, 11.6)):
+        for kinds in ({"hotel"}, {"place", "restaurant"}):
+            _assert_same(index.nearby(lat, lon, 40, 15, kinds), _brute_force(points, lat, lon, 40, 15, kinds))
+
+
+def test_high_latitudes_match_a_full_scan():
+    rng = np.random.default_rng(8)
+    points = [Point("place", f"north-{i}", f"north-{i}", float(lat), float(lon))
+              for i, (lat, lon) in enumerate(zip(rng.uniform(60, 85, 3000), rng.uniform(-20, 20, 3000)))]
+    index = GeoIndex(points, cell_deg=0.5)
+    for lat, lon in _centers(30, (60, 85), (-20, 20)):
+        for radius in (10, 100, 500):
+            _assert_same(index.nearby(lat, lon, radius, 25), _brute_force(points, lat, lon, radius, 25))
+
+
+def test_catalog_queries_match_a_full_scan():
+    catalog = current_catalog()
+    points = catalog_points(catalog.places, catalog.partners)
+    index = GeoIndex(points)
+    assert len(index) == len(points) > 0
+    for point in points:
+        for radius in (1, 20, 300):
+            expected = _brute_force(points, point.lat, point.lon, radius, 10)
+            got = index.nearby(point.lat, point.lon, radius, 10)
+            # Partners can share coordinates; tied points may come in either order
+            assert [d for _, d in got] == pytest.approx([d for _, d in expected])
+            assert {p for p, d in got if d < expected[-1][1]} == {p for p, d in expected if d < expected[-1][1]}
@@ -0,0 +1,101 @@
+"""History folds run after the response and save their summary under the session lock."""
+
+import asyncio
+
+import api
+from conftest import client, run
+
+
+def _long_history(turns: int) -> list:
+    history = []
+    for i in range(turns):
+        history += [{"role": "user", "text": f"question {i} " * 10}, {"role": "model", "text": f"answer {i} " * 10}]
+    return history
+
+
+async def _qa_session(http) -> str:
+    session_id = (await http.post("/session/start")).json()["session_id"]
+    session = await api.session_store.aget(session_id)
+    session.update(yasmine_done=True, yasmine_chosen_place="Tozeur", qa_history=_long_history(6))
+    await api.session_store.aput(session_id, session, expected_version=session["version"])
+    return session_id
+
+
+def _slow_fold(monkeypatch) -> asyncio.Event:
+    """Make every fold wait for the returned event; the compactor folds at every turn."""
+    release = asyncio.Event()
+
+    async def fold(turns, summary, cut):
+        await release.wait()
+        return f"{len(turns)} turns folded", cut
+
+    monkeypatch.setattr(api.history_compactor, "keep_last", 2)
+    monkeypatch.setattr(api.history_compactor, "token_budget", 10)
+    monkeypatch.setattr(api.history_compactor, "_fold", fold)
+    return release
+
+
+async def _folds_finished():
+    await asyncio.gather(*list(api._history_folds.values()))
+
+
+def test_fold_is_saved_after_the_response(gemini, monkeypatch):
+    async def scenario():
+        release = _slow_fold(monkeypatch)
+        async with client() as http:
+            session_id = await _qa_session(http)
+            response = await http.post("/qa", json={"session_id": session_id, "message": "and the oases?"})
+            assert response.status_code == 200
+            assert (session_id, "qa") in api._history_folds
+            before = (await http.get(f"/session/{session_id}")).json()
+            assert before["qa_summary"] == ""
+
+            release.set()
+            await _folds_finished()
+            after = (await http.get(f"/session/{session_id}")).json()
+
+        assert after["qa_summary"] == "10 turns folded"
+        assert after["qa_summarized_upto"] == 10
+        assert after["qa_history"] == before["qa_history"]
+        assert after["version"] == before["version"] + 1
+
+    run(scenario())
+
+
+def test_fold_waits_for_the_running_turn(gemini, monkeypatch):
+    async def scenario():
+        release = _slow_fold(monkeypatch)
+        async with client() as http:
+            session_id = await _qa_session(http)
+            first = await http.post("/qa", json={"session_id": session_id, "message": "first"})
+            gemini.delay = 0.3
+            second = asyncio.create_task(http.post("/qa", json={"session_id": session_id, "message": "second"}))
+            await asyncio.sleep(0.1)
+            release.set()
+            assert (await second).status_code == 200
+            await _folds_finished()
+            after = (await http.get(f"/session/{session_id}")).json()
+
+        assert first.status_code == 200
+        assert after["qa_summary"] == "10 turns folded"
+        assert [turn["text"] for turn in after["qa_history"][-4::2]] == ["first", "second"]
+
+    run(scenario())
+
+
+def test_fold_is_dropped_after_a_reset(gemini, monkeypatch):
+    async def scenario():
+        release = _slow_fold(monkeypatch)
+        async with client() as http:
+            session_id = await _qa_session(http)
+            await http.post("/qa", json={"session_id": session_id, "message": "and the oases?"})
+            reset = await http.post("/session/reset", json={"session_id": session_id, "message": ""})
+            assert reset.status_code == 200
+
+            release.set()
+            await _folds_finished()
+            after = (await http.get(f"/session/{session_id}")).json()
+
+        assert after["qa_summary"] == "" and after["qa_history"] == []
+
+    run(scenario())
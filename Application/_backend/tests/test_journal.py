@@ -0,0 +1,144 @@
+"""The turn journal replays to exactly the session that was written."""
+
+import random
+
+from storage.sessions import SQLiteSessionStore
+
+
+def _session() -> dict:
+    return {
+        "session_id": "s", "workflow": "chouchane", "yasmine_done": False,
+        "yasmine_history": [], "yasmine_prefs": {}, "yasmine_summary": "",
+        "qa_history": [],
+    }
+
+
+def _read(store: SQLiteSessionStore) -> dict:
+    data = store.get("s")
+    data.pop("version")
+    return data
+
+
+def _journaled(store: SQLiteSessionStore) -> int:
+    return store._conn().execute("SELECT COUNT(*) FROM session_turns").fetchone()[0]
+
+
+def _assert_same(store: SQLiteSessionStore, reference: dict):
+    data = _read(store)
+    assert data == reference
+    assert list(data) == list(reference)
+
+
+def test_replay_matches_every_write(tmp_path):
+    path = tmp_path / "sessions.db"
+    store = SQLiteSessionStore(path, compact_after=3)
+    reference = _session()
+    store.put("s", dict(reference), expected_version=0)
+    rng = random.Random(5)
+
+    for i in range(40):
+        phase = "qa" if i >= 20 else "yasmine"
+        reference["yasmine_done"] = i >= 20
+        reference[f"{phase}_history"] = reference[f"{phase}_history"] + [
+            {"role": "user", "text": f"user {i} " + "é" * rng.randrange(3)},
+            {"role": "model", "text": f"model {i}"},
+        ]
+        reference["yasmine_prefs"] = {"turn": i}
+        if i % 7 == 6:
+            reference["yasmine_summary"] = f"summary up to {i}"
+        store.put("s", dict(reference), expected_version=store.get("s")["version"])
+        _assert_same(store, reference)
+        if i == 13:
+            assert _journaled(store) > 0
+            store.compact(1)
+            assert _journaled(store) == 0
+            _assert_same(store, reference)
+
+    store.close()
+    store = SQLiteSessionStore(path, compact_after=3)
+    try:
+        _assert_same(store, reference)
+
+        # A rewritten history cannot be appended, so it is stored as a snapshot
+        reference["yasmine_history"] = reference["yasmine_history"][:3]
+        store.put("s", dict(reference))
+        _assert_same(store, reference)
+    finally:
+        store.close()
+
+
+def test_replay_matches_a_store_without_journal(tmp_path):
+    journaled = SQLiteSessionStore(tmp_path / "journaled.db", compact_after=1000)
+    snapshots = SQLiteSessionStore(tmp_path / "snapshots.db", compact_after=1000)
+    reference = _session()
+    try:
+        for store in (journaled, snapshots):
+            store.put("s", dict(reference))
+        for i in range(12):
+            reference["yasmine_history"] = reference["yasmine_history"] + [{"role": "user", "text": str(i)}]
+            journaled.put("s", dict(reference))
+            snapshots.put("s", dict(reference))
+            snapshots.compact(0)
+            assert journaled.get("s") == snapshots.get("s")
+        assert _journaled(journaled) == 12 and _journaled(snapshots) == 0
+    finally:
+        journaled.close()
+        snapshots.close()
+
+
+def test_an_earlier_turn_edit_is_not_lost(tmp_path):
+    store = SQLiteSessionStore(tmp_path / "sessions.db", compact_after=1000)
+    reference = _session()
+    reference["yasmine_history"] = [{"role": "user", "text": str(i)} for i in range(4)]
+    try:
+        store.put("s", dict(reference))
+        reference["yasmine_history"] = reference["yasmine_history"] + [{"role": "model", "text": "4"}]
+        store.put("s", dict(reference))
+        # Same length and same last turn, but an earlier turn is rewritten
+        edited = [dict(turn) for turn in reference["yasmine_history"]]
+        edited[1]["text"] = "edited"
+        reference["yasmine_history"] = edited
+        store.put("s", dict(reference))
+        _assert_same(store, reference)
+    finally:
+        store.close()
+
+
+def test_large_fields_are_only_written_when_they_change(tmp_path):
+    path = tmp_path / "sessions.db"
+    store = SQLiteSessionStore(path, compact_after=1000)
+    reference = _session()
+    reference["yasmine_rag_context"] = "place " * 200
+    store.put("s", dict(reference))
+
+    def stored_context():
+        row = store._conn().execute(
+            "SELECT value FROM session_fields WHERE session_id = 's' AND field = 'yasmine_rag_context'"
+        ).fetchone()
+        return row
+
+    try:
+        writes = []
+        store._conn().set_trace_callback(lambda sql: writes.append(sql) if "session_fields" in sql else None)
+        for i in range(6):
+            reference["yasmine_history"] = reference["yasmine_history"] + [{"role": "user", "text": str(i)}]
+            if i == 4:
+                reference["yasmine_rag_context"] = "other " * 200
+            store.put("s", dict(reference))
+            _assert_same(store, reference)
+        store._conn().set_trace_callback(None)
+        inserts = [sql for sql in writes if sql.lstrip().startswith("INSERT")]
+        # The first append detaches the field, only the change at i == 4 rewrites it
+        assert len(inserts) == 2
+        assert stored_context() is not None
+
+        store.compact(0)
+        assert stored_context() is None
+        _assert_same(store, reference)
+    finally:
+        store.close()
+    store = SQLiteSessionStore(path)
+    try:
+        _assert_same(store, reference)
+    finally:
+        store.close()
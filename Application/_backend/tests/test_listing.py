@@ -0,0 +1,116 @@
+"""/places: pages join to the full listing, projections, ETag revalidation per encoding and bad requests."""
+
+import importlib.util
+
+import pytest
+
+from catalog.listing import PLACE_FIELDS, encode_cursor
+from conftest import client, run
+
+ENCODINGS = ["identity", "gzip"] + (["br"] if importlib.util.find_spec("brotli") else [])
+
+
+async def _get(http, **params):
+    response = await http.get("/places", params=params, headers={"Accept-Encoding": "identity"})
+    assert response.status_code == 200
+    return response.json()
+
+
+async def _walk(http, limit: int, fields: str | None = None) -> tuple[list, int]:
+    """Every place, following next_cursor page by page; and the number of pages."""
+    places, cursor, pages = [], None, 0
+    while True:
+        params = {"limit": limit, **({"cursor": cursor} if cursor else {}), **({"fields": fields} if fields else {})}
+        page = await _get(http, **params)
+        assert 0 < len(page["places"]) <= limit
+        places += page["places"]
+        pages += 1
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return places, pages
+
+
+@pytest.mark.parametrize("limit", [1, 2, 5, 13, 14, 100])
+def test_pages_join_to_the_full_listing(limit):
+    async def scenario():
+        async with client() as http:
+            full = (await _get(http))["places"]
+            places, pages = await _walk(http, limit)
+            assert places == full
+            assert pages == max(1, -(-len(full) // limit))
+            projected, _ = await _walk(http, limit, fields="region,name")
+            assert projected == [{"name": p["name"], "region": p["region"]} for p in full]
+
+    run(scenario())
+
+
+def test_fields_projection():
+    async def scenario():
+        async with client() as http:
+            full = (await _get(http))["places"]
+            assert all(list(place) == list(PLACE_FIELDS) for place in full)
+            projected = (await _get(http, fields=" lat,name ,, lat"))["places"]
+            # Response order is fixed, whatever order and repeats the request used
+            assert projected == [{"name": p["name"], "lat": p["lat"]} for p in full]
+            assert all(list(place) == ["name", "lat"] for place in projected)
+
+    run(scenario())
+
+
+@pytest.mark.parametrize("encoding", ENCODINGS)
+def test_if_none_match_gives_304_per_encoding(encoding):
+    async def scenario():
+        async with client() as http:
+            headers = {"Accept-Encoding": encoding}
+            response = await http.get("/places", headers=headers)
+            assert response.status_code == 200
+            assert response.headers.get("content-encoding", "identity") == encoding
+            assert "Accept-Encoding" in response.headers["vary"]
+            etag = response.headers["etag"]
+            assert etag.endswith(f"-{encoding}\"") == (encoding != "identity")
+
+            for if_none_match in (etag, f"W/{etag}", f'"stale", {etag}', "*"):
+                revalidated = await http.get("/places", headers={**headers, "If-None-Match": if_none_match})
+                assert revalidated.status_code == 304 and revalidated.content == b""
+                assert revalidated.headers["etag"] == etag
+            stale = await http.get("/places", headers={**headers, "If-None-Match": '"stale"'})
+            assert stale.status_code == 200 and stale.content == response.content
+
+            # A page has its own ETag, so the full listing's does not revalidate it
+            page = await http.get("/places", params={"limit": 2}, headers={**headers, "If-None-Match": etag})
+            assert page.status_code == 200 and page.headers["etag"] != etag
+
+    run(scenario())
+
+
+def test_encodings_have_distinct_etags_for_the_same_body():
+    async def scenario():
+        async with client() as http:
+            responses = [await http.get("/places", headers={"Accept-Encoding": e}) for e in ENCODINGS]
+        assert len({r.headers["etag"] for r in responses}) == len(ENCODINGS)
+        assert len({r.content for r in responses}) == 1
+        # An ETag from one encoding still revalidates a client that now accepts another
+        async with client() as http:
+            revalidated = await http.get("/places", headers={"Accept-Encoding": "identity",
+                                                             "If-None-Match": responses[-1].headers["etag"]})
+        assert revalidated.status_code == 304
+
+    run(scenario())
+
+
+@pytest.mark.parametrize("params", [
+    {"fields": "name,bogus"},
+    {"fields": "Name"},
+    {"cursor": encode_cursor("Atlantis")},
+    {"cursor": "!!!"},
+    {"cursor": "__79"},         # base64 of bytes that are not utf-8
+    {"cursor": encode_cursor("Atlantis"), "limit": 2},
+])
+def test_unknown_field_or_bad_cursor_is_422(params):
+    async def scenario():
+        async with client() as http:
+            response = await http.get("/places", params=params)
+        assert response.status_code == 422
+        assert ("field" if "fields" in params else "cursor") in response.json()["detail"].lower()
+
+    run(scenario())
@@ -0,0 +1,41 @@
+"""Loose words and negations do not make the local extractor confident about the wrong thing."""
+
+import pytest
+
+from agent.local_extractor import extract_local
+from config.settings import LOCAL_EXTRACTION_CONFIDENCE
+
+
+def _read(text: str) -> tuple[dict, dict]:
+    return extract_local([{"role": "user", "text": text}])
+
+
+def test_ambiguous_words_are_not_confident():
+    preferences, confidence = _read("travelling with my business partner, we love the sun, 4 days, luxury")
+    assert preferences["companions"] != "couple" or confidence["companions"] < LOCAL_EXTRACTION_CONFIDENCE
+    assert confidence["style"] < LOCAL_EXTRACTION_CONFIDENCE
+    assert (preferences["budget"], preferences["duration_days"]) == ("luxury", 4)
+    assert confidence["budget"] >= LOCAL_EXTRACTION_CONFIDENCE
+
+
+@pytest.mark.parametrize("text, field, value", [
+    ("my partner and I", "companions", "couple"),
+    ("a bit of everything", "style", "mix"),
+    ("sea and sun", "style", "beach"),
+])
+def test_unambiguous_phrases_stay_confident(text, field, value):
+    preferences, confidence = _read(text)
+    assert preferences[field] == value
+    assert confidence[field] >= LOCAL_EXTRACTION_CONFIDENCE
+
+
+def test_negation_stops_at_the_end_of_its_clause():
+    preferences, confidence = _read("not sure about the budget, no idea, couple, beach, 3 days")
+    assert (preferences["companions"], preferences["style"], preferences["duration_days"]) == ("couple", "beach", 3)
+    assert min(confidence["companions"], confidence["style"]) >= LOCAL_EXTRACTION_CONFIDENCE
+    assert confidence["budget"] == 0.0
+
+
+def test_negation_within_the_clause_still_applies():
+    preferences, _ = _read("couple, luxury, no beach please")
+    assert preferences["style"] == ""
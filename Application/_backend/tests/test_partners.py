@@ -0,0 +1,91 @@
+"""Filtered, sorted partner listings match a plain filter and sort over the partner data."""
+
+import json
+
+import pytest
+
+from catalog.partners import PartnersDirectory, _synthetic_partners
+from conftest import client, run
+from data.mock_partners import PARTNERS_DB
+
+SECTIONS = {
+    "hotels": ("hotel", "type", ("name", "type", "price_range", "highlight", "address", "lat", "lon")),
+    "restaurants": ("restaurant", "cuisine", ("name", "cuisine", "price_range", "highlight", "must_try", "lat", "lon")),
+}
+
+QUERIES = [
+    {},
+    {"kind": "hotel"},
+    {"kind": "restaurant,hotel"},
+    {"price_range": "$$"},
+    {"price_range": "$, $$$"},
+    {"type": "boutique RIAD"},
+    {"type": "Beach Resort,city hotel,resort"},
+    {"cuisine": "TRADITIONAL tunisian,Fresh Seafood,seafood"},
+    {"type": "beach resort", "cuisine": "fresh seafood"},
+    {"kind": "hotel", "cuisine": "seafood"},
+    {"sort": "name"},
+    {"sort": "-name"},
+    {"sort": "price_range"},
+    {"sort": "-price_range"},
+    {"sort": "-type", "kind": "hotel"},
+    {"sort": "-cuisine"},
+    {"sort": "-price_range", "limit": 1},
+    {"price_range": "$$,$$$", "sort": "-name", "limit": 3},
+    {"kind": "restaurant", "cuisine": "FRENCH", "sort": "-price_range", "limit": 5},
+]
+
+
+def _split(text: str | None) -> set[str]:
+    return {value.strip() for value in (text or "").split(",") if value.strip()}
+
+
+def _scan(place: str, partners: dict, query: dict) -> dict:
+    """The listing computed the obvious way: filter every entry, then sort and cut."""
+    price_range, sort, limit = query.get("price_range"), query.get("sort"), query.get("limit")
+    hotel_type, cuisine = query.get("type"), query.get("cuisine")
+    kinds = _split(query.get("kind")) or (
+        {"hotel"} if hotel_type and not cuisine else {"restaurant"} if cuisine and not hotel_type
+        else {"hotel", "restaurant"}
+    )
+    wanted = {"type": {v.lower() for v in _split(hotel_type)}, "cuisine": {v.lower() for v in _split(cuisine)}}
+    listing = {"place": place}
+    for section, (section_kind, key, fields) in SECTIONS.items():
+        if section_kind not in kinds:
+            continue
+        entries = [
+            entry for entry in partners.get(section, [])
+            if (not price_range or entry["price_range"] in _split(price_range))
+            and (not wanted[key] or entry[key].lower() in wanted[key])
+        ]
+        field = sort.removeprefix("-") if sort else None
+        if field in ("name", key):
+            entries.sort(key=lambda entry: entry[field].lower(), reverse=sort.startswith("-"))
+        elif field == "price_range":
+            entries.sort(key=lambda entry: len(entry["price_range"].strip()), reverse=sort.startswith("-"))
+        listing[section] = [{f: entry[f] for f in fields} for entry in entries[:limit]]
+    return listing
+
+
+def _arguments(query: dict) -> dict:
+    return {("type_" if name == "type" else name): value for name, value in query.items()}
+
+
+@pytest.mark.parametrize("query", QUERIES, ids=lambda query: "&".join(f"{k}={v}" for k, v in query.items()) or "all")
+def test_endpoint_matches_a_scan_of_the_partner_data(query):
+    async def scenario():
+        async with client() as http:
+            for place, partners in PARTNERS_DB.items():
+                response = await http.get(f"/places/{place}/partners", params=query)
+                assert response.status_code == 200
+                assert response.json() == _scan(place, partners, query), place
+
+    run(scenario())
+
+
+@pytest.mark.parametrize("query", QUERIES, ids=lambda query: "&".join(f"{k}={v}" for k, v in query.items()) or "all")
+def test_index_matches_a_scan_with_many_ties(query):
+    synthetic = _synthetic_partners(300)
+    partners = {section: [entry._asdict() for entry in getattr(synthetic, section)] for section in SECTIONS}
+    directory = PartnersDirectory([], {"Synthetic": synthetic})
+    assert json.loads(directory.query("Synthetic", **_arguments(query)).body) == _scan("Synthetic", partners, query)
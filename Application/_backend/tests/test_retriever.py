@@ -0,0 +1,95 @@
+"""The vectorized scorer ranks exactly like the original Python loop."""
+
+import pytest
+
+from agent import retriever
+from agent.retriever import PlaceIndex, _loop_ranking, _sample_preferences, _synthetic_catalog
+
+SAMPLES = _sample_preferences(300)
+
+
+def _names(index: PlaceIndex, indices: list[int]) -> list[str]:
+    return [index.names[i] for i in indices]
+
+
+def test_catalog_rankings_match_the_loop():
+    index = retriever._state.index
+    for preferences in SAMPLES:
+        expected = _loop_ranking(index.places, preferences, len(index.names))
+        assert _names(index, index.top(preferences, len(index.names))) == expected, preferences
+
+
+@pytest.mark.parametrize("size", [7, 500, 5000])
+def test_synthetic_rankings_match_the_loop(size):
+    catalog = _synthetic_catalog(size)
+    index = PlaceIndex(catalog)
+    for preferences in SAMPLES[:60]:
+        for k in (1, 2, 10):
+            assert _names(index, index.top(preferences, k)) == _loop_ranking(catalog, preferences, k), preferences
+
+
+def test_table_and_precomputed_results_match_the_loop():
+    state = retriever._state
+    index, table = state.index, state.table
+    checked = 0
+    for preferences in SAMPLES:
+        row = table.row(preferences)
+        if row is None:
+            continue
+        checked += 1
+        expected = _loop_ranking(index.places, preferences, retriever.TOP_N)
+        assert _names(index, index.top(preferences, retriever.TOP_N, tag_scores=table.scores[row])) == expected
+        assert list(retriever.retrieve(preferences).names) == expected
+        if not preferences["interests"]:
+            assert list(state.precomputed[row].names) == expected
+    assert checked > 0
+
+
+def test_memo_key_uses_the_semantic_terms_of_the_query():
+    preferences = {"style": "beach", "companions": "couple", "budget": "luxury", "duration_days": 4, "interests": []}
+    key = retriever.preferences_key(preferences, "Quiet beaches!")
+    assert key == retriever.preferences_key(preferences, "quiet beaches")
+    assert key == retriever.preferences_key(preferences, "We would just like the QUIET beaches.")
+    assert key != retriever.preferences_key(preferences, "star wars film sets")
+    assert retriever.preferences_key(preferences, "the of and") == retriever.preferences_key(preferences)
+
+
+def test_query_terms_score_like_the_query():
+    index = retriever._state.index
+    preferences = {"style": "history", "companions": "solo", "budget": "budget", "duration_days": 10, "interests": []}
+    for query in ("star wars film sets", "canyon oases", "roman amphitheatre and mosaics"):
+        terms = index.query_terms(query)
+        assert terms
+        assert index.top(preferences, 10, query) == index.top(preferences, 10, terms)
+        assert list(retriever.retrieve(preferences, query).names) == _names(index, index.top(preferences, 2, query))
+
+
+def test_conversations_told_in_vocabulary_only_use_precomputed_results():
+    from agent.local_extractor import extract_local, free_text
+
+    text = "Just me!\nmid range please\nsomewhere relaxing\nA week"
+    preferences, _ = extract_local([{"role": "user", "text": line} for line in text.split("\n")])
+    assert preferences["interests"] == [] and retriever._state.table.row(preferences) is not None
+    assert free_text(text).split() == ["!", "somewhere"]
+
+    before = retriever.stats()
+    retriever._state.memo.clear()
+    result = retriever.retrieve(preferences, free_text(text))
+    after = retriever.stats()
+    assert after["precomputed"] == before["precomputed"] + 1 and after["table"] == before["table"]
+    assert list(result.names) == _loop_ranking(retriever._state.index.places, preferences, retriever.TOP_N)
+
+
+def test_saved_table_is_memory_mapped(tmp_path):
+    import numpy as np
+
+    from agent.retrieval_table import RetrievalTable
+
+    table = retriever.build_table()
+    table.save(tmp_path / "table")
+    loaded = RetrievalTable.load(tmp_path / "table", table.fingerprint)
+    assert isinstance(loaded.scores, np.memmap) and isinstance(loaded.top, np.memmap)
+    assert loaded.keys == table.keys
+    assert np.array_equal(loaded.scores, table.scores) and np.array_equal(loaded.top, table.top)
+    assert RetrievalTable.load(tmp_path / "table", "another catalog") is None
+    assert RetrievalTable.load(tmp_path / "missing", table.fingerprint) is None
@@ -0,0 +1,148 @@
+"""Concurrent turns on one session: one wins, the rest get 409, history stays whole."""
+
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+
+import api
+from conftest import client, run
+from storage.sessions import SQLiteSessionStore, VersionConflict
+
+TURNS = 8
+
+
+async def _start(http) -> tuple[str, dict]:
+    response = await http.post("/session/start")
+    assert response.status_code == 200
+    session_id = response.json()["session_id"]
+    return session_id, (await http.get(f"/session/{session_id}")).json()
+
+
+async def _concurrent_turns(http, session_id: str) -> list:
+    return await asyncio.gather(*(
+        http.post("/yasmine", json={"session_id": session_id, "message": f"message {i}"})
+        for i in range(TURNS)
+    ))
+
+
+def _assert_one_turn_applied(before: dict, after: dict, responses: list):
+    winners = [r for r in responses if r.status_code == 200]
+    assert len(winners) == 1
+    assert sorted(r.status_code for r in responses) == [200] + [409] * (TURNS - 1)
+
+    history = after["yasmine_history"]
+    assert history[:len(before["yasmine_history"])] == before["yasmine_history"]
+    assert len(history) == len(before["yasmine_history"]) + 2
+    assert history[-2]["role"] == "user" and history[-1]["role"] == "model"
+    sent = {f"message {i}" for i in range(TURNS)}
+    assert history[-2]["text"] in sent
+    assert history[-1]["text"] == winners[0].json()["reply"]
+    assert after["version"] == before["version"] + 1
+
+
+class _NoLocks:
+    """Lets every turn through, leaving the version check as the only guard."""
+
+    @asynccontextmanager
+    async def ahold(self, session_id, timeout=None):
+        yield
+
+    def busy(self, session_id):
+        return False
+
+
+def test_concurrent_turns_are_serialized_by_the_session_lock(gemini):
+    gemini.delay = 0.2
+
+    async def scenario():
+        async with client() as http:
+            session_id, before = await _start(http)
+            responses = await _concurrent_turns(http, session_id)
+            after = (await http.get(f"/session/{session_id}")).json()
+        _assert_one_turn_applied(before, after, responses)
+        assert all("already handling" in r.json()["detail"] for r in responses if r.status_code == 409)
+
+    run(scenario())
+
+
+def test_concurrent_turns_conflict_on_version_without_the_lock(gemini, monkeypatch):
+    gemini.delay = 0.2
+    monkeypatch.setattr(api, "session_locks", _NoLocks())
+
+    async def scenario():
+        async with client() as http:
+            session_id, before = await _start(http)
+            responses = await _concurrent_turns(http, session_id)
+            after = (await http.get(f"/session/{session_id}")).json()
+        _assert_one_turn_applied(before, after, responses)
+        conflicts = [r.json()["detail"] for r in responses if r.status_code == 409]
+        assert all(f"expected {before['version']}" in detail for detail in conflicts)
+
+    run(scenario())
+
+
+def test_write_during_a_turn_is_a_conflict(gemini):
+    async def scenario():
+        async with client() as http:
+            session_id, before = await _start(http)
+
+            async def concurrent_write():
+                gemini.before_reply = None
+                session = await api.session_store.aget(session_id)
+                session["yasmine_prefs"] = {"style": "desert"}
+                await api.session_store.aput(session_id, session, expected_version=session["version"])
+
+            gemini.before_reply = concurrent_write
+            response = await http.post("/yasmine", json={"session_id": session_id, "message": "couple"})
+            after = (await http.get(f"/session/{session_id}")).json()
+
+        assert response.status_code == 409
+        assert after["yasmine_prefs"] == {"style": "desert"}
+        assert after["yasmine_history"] == before["yasmine_history"]
+        assert after["version"] == before["version"] + 1
+
+    run(scenario())
+
+
+def test_store_rejects_stale_versions(tmp_path):
+    store = SQLiteSessionStore(tmp_path / "sessions.db")
+    try:
+        assert store.put("s", {"n": 1}, expected_version=0) == 1
+        with pytest.raises(VersionConflict):
+            store.put("s", {"n": 2}, expected_version=0)
+        assert store.put("s", {"n": 2}, expected_version=1) == 2
+        with pytest.raises(VersionConflict) as conflict:
+            store.put("s", {"n": 3}, expected_version=1)
+        assert (conflict.value.expected, conflict.value.actual) == (1, 2)
+        assert store.get("s") == {"n": 2, "version": 2}
+    finally:
+        store.close()
+
+
+def test_close_closes_every_threads_connection(tmp_path):
+    import sqlite3
+    import threading
+
+    store = SQLiteSessionStore(tmp_path / "sessions.db")
+    store.put("s", {"n": 1})
+    connections = []
+
+    def worker():
+        assert store.get("s")["n"] == 1
+        connections.append(store._conn())
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    connections.append(store._conn())
+
+    store.close()
+    for conn in connections:
+        with pytest.raises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
+    # Usable again afterwards, on a new connection
+    assert store.get("s")["n"] == 1
+    store.close()
@@ -0,0 +1,35 @@
+"""The threshold turn reuses the speculative extraction without losing the newest answer."""
+
+import pytest
+
+from agent import extractor
+from agent.conversation import EXTRACTION_TURN_THRESHOLD, TunisiaTourismAgent
+from conftest import PREFERENCES, FakeGemini, run
+
+VAGUE = ["hmm, hard to say", "something memorable", "we want good memories"]
+
+
+@pytest.mark.parametrize("answer, changed", [
+    ("actually we are on a tight budget", {"budget": "budget"}),
+    ("oh and we are bringing the kids", {"companions": "family"}),
+    ("a week, on a tight budget with my friends", {"budget": "budget", "companions": "friends", "duration_days": 7}),
+    ("sounds good", {}),
+])
+def test_threshold_turn_merges_the_newest_answer(gemini, answer, changed):
+    assert len(VAGUE) == EXTRACTION_TURN_THRESHOLD - 2
+
+    async def scenario():
+        agent = TunisiaTourismAgent(api_key="test-key", client=FakeGemini(), structured=False)
+        await agent.astart()
+        for message in VAGUE:
+            await agent.achat(message)
+        # The turn before the threshold speculated on everything said so far
+        assert extractor.is_pending(agent.history)
+        await agent.achat(answer)
+        # The speculation was reused: the history with the newest answer was never extracted
+        assert not extractor.is_pending(agent.history[:-1])
+        return agent
+
+    agent = run(scenario())
+    assert agent.recommendations_given
+    assert agent.preferences == {**PREFERENCES, **changed}
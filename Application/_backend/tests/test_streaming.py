@@ -0,0 +1,106 @@
+"""A stream that breaks after the response started still ends with an error event and frees the session."""
+
+import json
+
+import api
+from conftest import client, run
+
+
+def _events(body: str) -> list[tuple[str, dict]]:
+    events = []
+    for block in body.strip().split("\n\n"):
+        name, data = block.split("\n", 1)
+        events.append((name.removeprefix("event: "), json.loads(data.removeprefix("data: "))))
+    return events
+
+
+async def _start(http, qa: bool = False) -> str:
+    session_id = (await http.post("/session/start")).json()["session_id"]
+    if qa:
+        session = await api.session_store.aget(session_id)
+        session["yasmine_done"] = True
+        session["yasmine_chosen_place"] = "Djerba"
+        await api.session_store.aput(session_id, session, expected_version=session["version"])
+    return session_id
+
+
+def _assert_failed_cleanly(events: list, session_id: str, gemini):
+    names = [name for name, _ in events]
+    assert names[0] == "token" and names[-1] == "error" and "done" not in names
+    assert events[-1][1]["status_code"] == 502
+    assert not api.session_locks.busy(session_id)
+    assert gemini.open_streams == 0
+
+
+def test_yasmine_stream_failing_midway(gemini):
+    gemini.reply = "Djerba has long beaches, warm water and quiet villages."
+    gemini.fail_after = 2
+
+    async def scenario():
+        async with client() as http:
+            session_id = await _start(http)
+            before = (await http.get(f"/session/{session_id}")).json()
+            response = await http.post("/yasmine/stream", json={"session_id": session_id, "message": "couple"})
+            _assert_failed_cleanly(_events(response.text), session_id, gemini)
+            after = (await http.get(f"/session/{session_id}")).json()
+            assert after["yasmine_history"] == before["yasmine_history"]
+
+            gemini.fail_after = None
+            retry = await http.post("/yasmine/stream", json={"session_id": session_id, "message": "couple"})
+            assert _events(retry.text)[-1][0] == "done"
+
+    run(scenario())
+
+
+def test_qa_stream_failing_midway(gemini):
+    gemini.reply = "Lablabi is a chickpea soup eaten for breakfast."
+    gemini.fail_after = 2
+
+    async def scenario():
+        async with client() as http:
+            session_id = await _start(http, qa=True)
+            response = await http.post("/qa/stream", json={"session_id": session_id, "message": "and the harissa there?"})
+            _assert_failed_cleanly(_events(response.text), session_id, gemini)
+            assert (await http.get(f"/session/{session_id}")).json()["qa_history"] == []
+
+            gemini.fail_after = None
+            retry = await http.post("/qa/stream", json={"session_id": session_id, "message": "and the harissa there?"})
+            assert _events(retry.text)[-1][0] == "done"
+
+    run(scenario())
+
+
+def test_qa_stream_failing_after_the_reply(gemini, monkeypatch):
+    gemini.reply = "Sidi Bou Said is best just before sunset."
+
+    async def broken_finish(session, message, reply):
+        raise RuntimeError("disk full")
+
+    async def scenario():
+        async with client() as http:
+            session_id = await _start(http, qa=True)
+            monkeypatch.setattr(api, "_finish_qa_turn", broken_finish)
+            response = await http.post("/qa/stream", json={"session_id": session_id, "message": "when should I go?"})
+            _assert_failed_cleanly(_events(response.text), session_id, gemini)
+
+    run(scenario())
+
+
+def test_stream_precheck_does_not_restore_an_archived_session(gemini):
+    async def scenario():
+        async with client() as http:
+            session_id = await _start(http)
+            session = await api.session_store.aget(session_id)
+            api.session_archive.append(session_id, session)
+            await api.session_store.adelete(session_id)
+
+            async with api.session_locks.ahold(session_id):
+                busy = await http.post("/yasmine/stream", json={"session_id": session_id, "message": "couple"})
+            assert busy.status_code == 409
+            assert await api.session_store.aget(session_id) is None
+
+            response = await http.post("/yasmine/stream", json={"session_id": session_id, "message": "couple"})
+            assert _events(response.text)[-1][0] == "done"
+            assert await api.session_store.aget(session_id) is not None
+
+    run(scenario())